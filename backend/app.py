@@ -1,18 +1,33 @@
 # Import Libraries
 import time
 import os
-from flask import Flask, request, jsonify
+import json
+import hashlib
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 import threading
-from translator import UniversalTranslator
+from concurrent.futures import ThreadPoolExecutor
+from translator import UniversalTranslator, DECODING_PROFILES
+from batching import BatchScheduler
+from result_cache import TranslationCache, make_cache_key
+from registry import ModelRegistry, model_fingerprint
+from quantization import configure_threads
+from workers import WorkerPool, parse_cores
+from metrics import translation_metrics, merge_snapshots, render_prometheus, resident_memory
+from tokenization import encoder_stats
+from routing import TranslationGraph, route_hops
+from translation_memory import TranslationMemory
+from coalescing import SingleFlight
 import torch
 
+# Process start, for the startup timings in /api/health
+PROCESS_START = time.time()
+
 # Flask API Setup
 app = Flask(__name__)
 CORS(app)
 
 # Global Variables
-translator_cache = {}
 LANGUAGES = {'en': 'English', 'hi': 'Hindi', 'kn': 'Kannada'}
 MODEL_PATHS = {
     'en_hi': 'results/marian_en_hi_finetuned',
@@ -20,6 +35,89 @@ MODEL_PATHS = {
     'en_kn': 'results/marian_en_kn_finetuned',
     'kn_en': 'results/marian_kn_en_finetuned'
 }
+# Micro-batching window for concurrent requests
+BATCH_MAX_SIZE = int(os.environ.get('NMT_BATCH_MAX_SIZE', 16))
+BATCH_MAX_WAIT_MS = float(os.environ.get('NMT_BATCH_MAX_WAIT_MS', 10))
+batch_scheduler = BatchScheduler(BATCH_MAX_SIZE, BATCH_MAX_WAIT_MS)
+# Translation modes: one sentence, or a long document split into sentence chunks
+TRANSLATION_MODES = ['sentence', 'document']
+# Limit on texts per /api/translate/batch request
+BATCH_MAX_TEXTS = int(os.environ.get('NMT_BATCH_MAX_TEXTS', 500))
+
+# Translation result cache, NMT_CACHE_DB enables the persistent SQLite tier,
+# which keeps at most NMT_CACHE_DB_SIZE rows
+CACHE_MAX_SIZE = int(os.environ.get('NMT_CACHE_SIZE', 10000))
+CACHE_TTL = float(os.environ.get('NMT_CACHE_TTL', 86400))
+CACHE_DB_PATH = os.environ.get('NMT_CACHE_DB') or None
+CACHE_DB_MAX_SIZE = int(os.environ.get('NMT_CACHE_DB_SIZE', 100000))
+result_cache = TranslationCache(CACHE_MAX_SIZE, CACHE_TTL, CACHE_DB_PATH, CACHE_DB_MAX_SIZE)
+
+# Identical translations in progress, shared by concurrent requests; a request waits
+# at most NMT_COALESCE_TIMEOUT seconds for another's translation
+in_flight = SingleFlight()
+COALESCE_TIMEOUT = float(os.environ.get('NMT_COALESCE_TIMEOUT', 60))
+
+# Translation memory checked before the model, NMT_MEMORY_DB enables it: exact and
+# number-only matches are returned, other matches scoring at least NMT_MEMORY_THRESHOLD
+# are returned with NMT_MEMORY_FUZZY=return or else sent as a hint beside the model's
+# translation. NMT_MEMORY_RECORD=1 adds model translations to the memory.
+MEMORY_DB_PATH = os.environ.get('NMT_MEMORY_DB') or None
+MEMORY_THRESHOLD = float(os.environ.get('NMT_MEMORY_THRESHOLD', 0.85))
+MEMORY_FUZZY = os.environ.get('NMT_MEMORY_FUZZY', 'hint')
+MEMORY_RECORD = os.environ.get('NMT_MEMORY_RECORD', '0') == '1'
+translation_memory = (
+    TranslationMemory(MEMORY_DB_PATH, MEMORY_THRESHOLD, MEMORY_FUZZY == 'return') if MEMORY_DB_PATH else None
+)
+
+# Decoding profiles chosen per request, bounded by server-side limits
+DEFAULT_PROFILE = os.environ.get('NMT_DEFAULT_PROFILE', 'quality')
+MAX_BEAMS = int(os.environ.get('NMT_MAX_BEAMS', 4))
+MAX_OUTPUT_LENGTH = int(os.environ.get('NMT_MAX_OUTPUT_LENGTH', 128))
+
+# Function to resolve a request's decoding profile and overrides into generate parameters
+def get_decoding_params(data):
+    profile = data.get('profile', DEFAULT_PROFILE)
+    if profile not in DECODING_PROFILES:
+        raise ValueError(f'Unsupported profile. Use one of: {", ".join(DECODING_PROFILES)}.')
+    
+    params = dict(DECODING_PROFILES[profile])
+    for name in ['num_beams', 'max_length']:
+        if name in data:
+            value = data[name]
+            if isinstance(value, bool) or not isinstance(value, int) or value < 1:
+                raise ValueError(f'Invalid {name}, expected a positive integer.')
+            params[name] = value
+    # Clamp to the server limits
+    params['num_beams'] = min(params['num_beams'], MAX_BEAMS)
+    params['max_length'] = min(params['max_length'], MAX_OUTPUT_LENGTH)
+    return profile, params
+
+# Function to validate a single-text translation request
+def parse_translate_request(data):
+    text = data.get('text', '').strip()
+    src_lang = data.get('src_lang', 'en')
+    tgt_lang = data.get('tgt_lang', 'hi')
+    mode = data.get('mode', 'sentence')
+
+    if not text:
+        raise ValueError('No text provided for translation.')
+    if src_lang not in LANGUAGES or tgt_lang not in LANGUAGES:
+        raise ValueError('Unsupported language selected.')
+    if src_lang == tgt_lang:
+        raise ValueError('Source and target languages are the same.')
+    if mode not in TRANSLATION_MODES:
+        raise ValueError(f'Unsupported mode. Use one of: {", ".join(TRANSLATION_MODES)}.')
+    profile, params = get_decoding_params(data)
+    return text, src_lang, tgt_lang, mode, profile, params
+
+# Function to format one Server-Sent Event
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+# Function to build the result cache key for a translator
+def get_cache_key(translator, text, src_lang, tgt_lang, mode='sentence', params=None):
+    params = dict(params or translator.decoding_params, mode=mode)
+    return make_cache_key(text, src_lang, tgt_lang, translator.model_id, params)
 
 # Function to get model path
 def get_model_path(src_lang, tgt_lang):
@@ -27,112 +125,756 @@ def get_model_path(src_lang, tgt_lang):
     
     if language_pair in MODEL_PATHS and os.path.exists(MODEL_PATHS[language_pair]):
         return MODEL_PATHS[language_pair]
-    
-    for path in MODEL_PATHS.values():
-        if os.path.exists(path):
-            return path
         
     return None
 
-# Function to get translator
-def get_translator(src_lang, tgt_lang):
-    cache_key = f"{src_lang}_{tgt_lang}"
+# CPU inference profile: dynamic int8 quantization and torch thread counts
+QUANTIZE = os.environ.get('NMT_QUANTIZE', '0') == '1'
+TORCH_THREADS = int(os.environ.get('NMT_TORCH_THREADS', 0))
+TORCH_INTEROP_THREADS = int(os.environ.get('NMT_TORCH_INTEROP_THREADS', 0))
+# Inference engine: 'eager' or 'torchscript' (graphs written by export_model.py)
+ENGINE = os.environ.get('NMT_ENGINE', 'eager')
+
+# Draft models per pair for the 'speculative' profile, by default the ones
+# train.py --draft writes; NMT_DRAFT_MODELS="en_hi=path,hi_en=path" overrides
+# them and an empty value turns speculative decoding off
+if 'NMT_DRAFT_MODELS' in os.environ:
+    DRAFT_MODELS = dict(entry.split('=', 1) for entry in os.environ['NMT_DRAFT_MODELS'].split(',') if entry)
+else:
+    DRAFT_MODELS = {pair: path.replace('_finetuned', '_draft') for pair, path in MODEL_PATHS.items()}
+
+# Function to get the drafts of the pairs a model path serves
+def get_draft_models(model_path):
+    drafts = {}
+    for pair, draft_path in DRAFT_MODELS.items():
+        src_lang, tgt_lang = pair.split('_')
+        if os.path.exists(draft_path) and get_model_path(src_lang, tgt_lang) and resolve_model(src_lang, tgt_lang) == model_path:
+            drafts[pair] = draft_path
+    return drafts
+
+# Function to load the translator for a model path
+def load_translator(model_path):
+    try:
+        draft_models = get_draft_models(model_path) if ENGINE == 'eager' else None
+        return UniversalTranslator(model_path, quantize=QUANTIZE, engine=ENGINE, draft_models=draft_models)
+    except Exception as e:
+        raise Exception(f"Failed to load translator: {str(e)}")
+
+# Loaded translators keyed by model: lazy loading, per-model load locks and LRU eviction
+# once NMT_MODEL_MEMORY_MB is exceeded or a translator idles past NMT_MODEL_IDLE_TTL
+MODEL_MEMORY_MB = float(os.environ.get('NMT_MODEL_MEMORY_MB', 0))
+MODEL_IDLE_TTL = float(os.environ.get('NMT_MODEL_IDLE_TTL', 0))
+model_registry = ModelRegistry(load_translator, MODEL_MEMORY_MB, MODEL_IDLE_TTL)
+# Server: 'flask' (development server) or 'asgi' (asgi.py under uvicorn)
+SERVER = os.environ.get('NMT_SERVER', 'flask')
+# Pairs loaded at startup, by default every pair with a model; NMT_WARM_PAIRS
+# picks some ("en_hi,hi_en") or none (""), the rest load on first use. They are
+# loaded by NMT_LOAD_THREADS threads and warmed up with a dummy generate unless NMT_WARMUP=0
+if 'NMT_WARM_PAIRS' in os.environ:
+    WARM_PAIRS = [pair for pair in os.environ['NMT_WARM_PAIRS'].split(',') if pair]
+else:
+    WARM_PAIRS = [pair for pair, path in MODEL_PATHS.items() if os.path.exists(path)]
+LOAD_THREADS = int(os.environ.get('NMT_LOAD_THREADS', 4))
+WARMUP = os.environ.get('NMT_WARMUP', '1') == '1'
+# Startup phase timings
+startup_timings = {}
+# Pre-fork mode: NMT_PROCESSES inference workers forked after the models are loaded,
+# pinned to core sets (NMT_WORKER_CORES, e.g. "0-3;4-7", default an even split)
+# and running NMT_WORKER_CONCURRENCY requests at a time
+PROCESSES = int(os.environ.get('NMT_PROCESSES', 0))
+WORKER_CORES = parse_cores(os.environ['NMT_WORKER_CORES']) if os.environ.get('NMT_WORKER_CORES') else None
+WORKER_CONCURRENCY = int(os.environ.get('NMT_WORKER_CONCURRENCY', 4))
+worker_pool = None
+
+# Resolved model per pair, and the first path seen per checkpoint fingerprint
+pair_models = {}
+canonical_paths = {}
+
+# Function to resolve the model a pair uses, shared across identical checkpoints
+def resolve_model(src_lang, tgt_lang):
+    language_pair = f"{src_lang}_{tgt_lang}"
     
-    if cache_key in translator_cache:
-        return translator_cache[cache_key]
+    if language_pair not in pair_models:
+        model_path = get_model_path(src_lang, tgt_lang)
+        if not model_path:
+            raise Exception(f"No model available for {src_lang} -> {tgt_lang} translation")
+        fingerprint = model_fingerprint(model_path)
+        pair_models[language_pair] = canonical_paths.setdefault(fingerprint, model_path)
     
-    model_path = get_model_path(src_lang, tgt_lang)
+    return pair_models[language_pair]
+
+# Routes found so far per pair, e.g. hi_kn -> ['hi', 'en', 'kn']
+pair_routes = {}
+
+# Function to get the languages a pair is translated through, a direct model when
+# there is one, otherwise a pivot through English
+def get_route(src_lang, tgt_lang):
+    language_pair = f"{src_lang}_{tgt_lang}"
     
-    if not model_path:
-        raise Exception(f"No model available for {src_lang} -> {tgt_lang} translation")
+    if language_pair not in pair_routes:
+        route = TranslationGraph(MODEL_PATHS).route(src_lang, tgt_lang)
+        if not route:
+            raise Exception(f"No model available for {src_lang} -> {tgt_lang} translation")
+        pair_routes[language_pair] = route
     
+    return pair_routes[language_pair]
+
+# Function to get translator, the wait covers loading and registry lock contention
+def get_translator(src_lang, tgt_lang):
+    start_time = time.perf_counter()
+    translator = model_registry.get(resolve_model(src_lang, tgt_lang), owner=f"{src_lang}_{tgt_lang}")
+    translation_metrics.observe(
+        'nmt_stage_seconds', time.perf_counter() - start_time, pair=f"{src_lang}_{tgt_lang}", stage='model_wait'
+    )
+    return translator
+
+# Function to identify the model and decoding parameters of a translator's outputs,
+# recorded model outputs only serve lookups with the same version
+def memory_version(translator, params=None):
+    version = json.dumps([translator.model_id, params or translator.decoding_params], sort_keys=True)
+    return hashlib.sha256(version.encode('utf-8')).hexdigest()[:16]
+
+# Function to look a sentence up in the translation memory, None without a memory
+# or a match. Documents are not looked up, the memory holds single segments.
+def memory_lookup(translator, text, src_lang, tgt_lang, mode='sentence', params=None):
+    if translation_memory is None or mode != 'sentence':
+        return None
+    return translation_memory.lookup(text, src_lang, tgt_lang, memory_version(translator, params))
+
+# Function to run the model on texts, a single sentence through the micro-batching
+# scheduler; returns the translations and per-text seconds
+def run_model(translator, texts, src_lang, tgt_lang, mode='sentence', params=None):
+    if mode == 'document':
+        results, timings = [], []
+        for text in texts:
+            start_time = time.perf_counter()
+            results.append(translator.translate_document(
+                text, src_lang, tgt_lang, batch_size=BATCH_MAX_SIZE, params=params
+            ))
+            timings.append(time.perf_counter() - start_time)
+        return results, timings
+    if len(texts) == 1:
+        start_time = time.perf_counter()
+        results = [batch_scheduler.translate(translator, texts[0], src_lang, tgt_lang, params)]
+        return results, [time.perf_counter() - start_time]
+    return translator.translate_batch(
+        texts, src_lang, tgt_lang, batch_size=BATCH_MAX_SIZE, return_timings=True, params=params
+    )
+
+# Function to translate texts with one model: cache hits and translation memory matches
+# are reused, identical in-flight translations are shared and the rest go to the model
+# together. Returns the translations, their cache hits, per-text seconds and memory matches.
+def translate_hop(translator, texts, src_lang, tgt_lang, mode='sentence', params=None):
+    cache_keys = [get_cache_key(translator, text, src_lang, tgt_lang, mode, params) for text in texts]
+    results = [result_cache.get(key) for key in cache_keys]
+    timings = [0.0] * len(texts)
+    cached = [result is not None for result in results]
+    matches = [None] * len(texts)
+    for j, hit in enumerate(cached):
+        if not hit:
+            matches[j] = memory_lookup(translator, texts[j], src_lang, tgt_lang, mode, params)
+            if matches[j] and matches[j]['match'] != 'hint':
+                results[j] = matches[j]['translation']
+    # Only texts without a cached or memory translation go to the model
+    missing = [j for j, result in enumerate(results) if result is None]
+    if not missing:
+        return results, cached, timings, matches
+    # Texts already being translated, by another request or earlier in this batch,
+    # wait for that translation instead of running their own
+    owned, futures = in_flight.begin([cache_keys[j] for j in missing])
+    running = [j for j in missing if owned.pop(cache_keys[j], None) is not None]
+    finished = set()
+    error = None
     try:
-        translator = UniversalTranslator(model_path)
-        translator_cache[cache_key] = translator
-        return translator
+        new_results, new_timings = run_model(
+            translator, [texts[j] for j in running], src_lang, tgt_lang, mode, params
+        ) if running else ([], [])
+        for j, translation, elapsed in zip(running, new_results, new_timings):
+            results[j] = translation
+            timings[j] = elapsed
+            # Cached before the waiters are released, so later requests hit the cache
+            result_cache.set(cache_keys[j], translation)
+            in_flight.finish(cache_keys[j], translation)
+            finished.add(j)
     except Exception as e:
-        raise Exception(f"Failed to load translator: {str(e)}")
+        error = e
+        raise
+    finally:
+        # Every owned key is resolved, or its waiters and later requests would hang on it
+        for j in running:
+            if j not in finished:
+                in_flight.finish(cache_keys[j], error=error or RuntimeError('Translation was interrupted.'))
+    waiting = [j for j in missing if results[j] is None]
+    if waiting:
+        translation_metrics.inc('nmt_coalesced_translations_total', len(waiting), pair=f"{src_lang}_{tgt_lang}")
+    for j in waiting:
+        start_time = time.perf_counter()
+        try:
+            results[j] = futures[cache_keys[j]].result(timeout=COALESCE_TIMEOUT)
+        except TimeoutError:
+            raise RuntimeError('Timed out waiting for an identical translation in progress.')
+        timings[j] = time.perf_counter() - start_time
+    if MEMORY_RECORD and translation_memory is not None and mode == 'sentence':
+        translation_memory.add_many(
+            [(texts[j], results[j]) for j in running], src_lang, tgt_lang,
+            origin='model', version=memory_version(translator, params)
+        )
+    return results, cached, timings, matches
 
-# API Endpoints
-@app.route('/api/health', methods=['GET'])
-def health_check():
-    try:
-        device_info = 'cuda' if torch.cuda.is_available() else 'cpu'
-    except Exception:
-        device_info = 'cpu'
+# Function to translate texts along a route, one batched hop after another. A pivot's
+# intermediate English is cached like any direct result, so a repeated source skips
+# the first hop. Returns the translations, whether each was cached on every hop,
+# the per-text seconds, each text's last memory match and a report of each hop.
+def translate_route(route, texts, mode='sentence', params=None):
+    cached = [True] * len(texts)
+    timings = [0.0] * len(texts)
+    matches = [None] * len(texts)
+    hops = []
+    for src_lang, tgt_lang in route_hops(route):
+        start_time = time.time()
+        translator = get_translator(src_lang, tgt_lang)
+        texts, hop_cached, hop_timings, hop_matches = translate_hop(
+            translator, texts, src_lang, tgt_lang, mode, params
+        )
+        cached = [a and b for a, b in zip(cached, hop_cached)]
+        timings = [a + b for a, b in zip(timings, hop_timings)]
+        matches = [b or a for a, b in zip(matches, hop_matches)]
+        hops.append({
+            'pair': f"{src_lang}_{tgt_lang}",
+            'model': translator.model_path,
+            'cached': all(hop_cached),
+            'memory_matches': sum(match is not None for match in hop_matches),
+            'processing_time': round(time.time() - start_time, 3)
+        })
+    return texts, cached, timings, matches, hops
+
+# Function to add up the result cache stats of all workers
+def merge_cache_stats(all_stats):
+    merged = dict(all_stats[0])
+    for name in ['size', 'max_size', 'hits', 'memory_hits', 'disk_hits', 'misses', 'evictions']:
+        merged[name] = sum(stats[name] for stats in all_stats)
+    lookups = merged['hits'] + merged['misses']
+    merged['hit_rate'] = round(merged['hits'] / lookups, 3) if lookups else 0.0
+    return merged
+
+# Function to collect the stats of every worker: one entry per worker, None for
+# one that did not answer in time, and the ones that did
+def collect_worker_stats():
+    worker_stats = [result[0] if result else None for result in worker_pool.call_all('stats')]
+    return worker_stats, [stats for stats in worker_stats if stats is not None]
+
+# Function to add up the translation memory counters of all workers, they share one database
+def merge_memory_stats(all_stats):
+    merged = dict(all_stats[0])
+    for name in ['exact_hits', 'fuzzy_hits', 'hints', 'misses', 'added']:
+        merged[name] = sum(stats[name] for stats in all_stats)
+    lookups = merged['exact_hits'] + merged['fuzzy_hits'] + merged['hints'] + merged['misses']
+    merged['hit_rate'] = round((merged['exact_hits'] + merged['fuzzy_hits']) / lookups, 3) if lookups else 0.0
+    return merged
+
+# Request handlers shared by the Flask app and the ASGI app (asgi.py),
+# each returns the response body and HTTP status
+def handle_health():
+    cache_stats = result_cache.stats()
+    memory_stats = translation_memory.stats() if translation_memory else None
+    coalescing_stats = in_flight.stats()
+    batching_stats = batch_scheduler.stats()
+    startup = dict(startup_timings)
+    unknown_workers = []
+    if worker_pool:
+        # Caches and batching queues live in the workers, counters cover the ones that answered
+        worker_stats, answered = collect_worker_stats()
+        unknown_workers = [i for i, stats in enumerate(worker_stats) if stats is None]
+        if answered:
+            cache_stats = merge_cache_stats([stats['result_cache'] for stats in answered])
+            if memory_stats:
+                memory_stats = merge_memory_stats([stats['translation_memory'] for stats in answered])
+        coalescing_stats = {
+            name: sum(stats['coalescing'][name] for stats in answered) for name in coalescing_stats
+        }
+        batching_stats['queues'] = {
+            f"{pair}@worker{i}": queue
+            for i, stats in enumerate(worker_stats) if stats is not None
+            for pair, queue in stats['batching']['queues'].items()
+        }
+        startup['workers'] = [stats['startup'] if stats is not None else None for stats in worker_stats]
+    if memory_stats:
+        memory_stats['record'] = MEMORY_RECORD
     model_status = {}
     # Check model paths
     for pair, path in MODEL_PATHS.items():
         model_status[pair] = {
             'path': path,
             'exists': os.path.exists(path),
-            'cached': pair in translator_cache
+            'cached': model_registry.has_owner(pair),
+            'draft': DRAFT_MODELS[pair] if os.path.exists(DRAFT_MODELS.get(pair, '')) else None
         }
     # Check translator cache
-    return jsonify({
+    return {
         'status': 'healthy',
         'supported_languages': LANGUAGES,
         'model_status': model_status,
-        'cached_translators': list(translator_cache.keys()),
+        'cached_translators': model_registry.owners(),
+        'routes': TranslationGraph(MODEL_PATHS).routes(LANGUAGES),
+        'model_registry': model_registry.stats(),
+        'batching': batching_stats,
+        'result_cache': cache_stats,
+        'translation_memory': memory_stats,
+        'coalescing': coalescing_stats,
+        'quantized': QUANTIZE,
+        'engine': ENGINE,
+        'torch_threads': torch.get_num_threads(),
+        'startup': startup,
+        # unknown lists workers that did not answer in time, left out of the counters
+        'workers': dict(worker_pool.stats(), unknown=unknown_workers) if worker_pool else None,
         'device': 'cuda' if torch.cuda.is_available() else 'cpu'
-    })
+    }, 200
 
-@app.route('/api/translate', methods=['POST'])
-def translate_text():
+def handle_translate(data):
     try:
-        data = request.json
         if not data:
-            return jsonify({'error': 'No JSON data provided.'}), 400
+            return {'error': 'No JSON data provided.'}, 400
             
-        text = data.get('text', '').strip()
-        src_lang = data.get('src_lang', 'en')
-        tgt_lang = data.get('tgt_lang', 'hi')
-
-        if not text:
-            return jsonify({'error': 'No text provided for translation.'}), 400
-        if src_lang not in LANGUAGES or tgt_lang not in LANGUAGES:
-            return jsonify({'error': 'Unsupported language selected.'}), 400
-        if src_lang == tgt_lang:
-            return jsonify({'error': 'Source and target languages are the same.'}), 400
+        try:
+            text, src_lang, tgt_lang, mode, profile, params = parse_translate_request(data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
 
         start_time = time.time()
         
         try:
-            translator = get_translator(src_lang, tgt_lang)
-            translation = translator.translate(text, src_lang, tgt_lang)
+            route = get_route(src_lang, tgt_lang)
+            translations, cached, _, matches, hops = translate_route(route, [text], mode, params)
         except Exception as e:
-            return jsonify({'error': f'Translation failed: {str(e)}'}), 503
+            return {'error': f'Translation failed: {str(e)}'}, 503
         
         end_time = time.time()
 
-        return jsonify({
+        return {
             'source_text': text,
             'source_language': src_lang,
             'source_language_name': LANGUAGES[src_lang],
             'target_language': tgt_lang,
             'target_language_name': LANGUAGES[tgt_lang],
-            'translation': translation,
-            'model_used': get_model_path(src_lang, tgt_lang),
+            'translation': translations[0],
+            'mode': mode,
+            'profile': profile,
+            'decoding_params': params,
+            'cached': cached[0],
+            'memory': matches[0],
+            'model_used': ' -> '.join(hop['model'] for hop in hops),
+            'route': route,
+            'hops': hops,
             'processing_time': round(end_time - start_time, 3)
-        })
+        }, 200
 
     except Exception as e:
-        return jsonify({'error': 'An internal server error occurred.'}), 500
+        return {'error': 'An internal server error occurred.'}, 500
+
+# Returns an error body and status, or (None, 200, events) where events(cancel)
+# yields the Server-Sent Events and stops generating once cancel is set
+def handle_translate_stream(data):
+    try:
+        if not data:
+            return {'error': 'No JSON data provided.'}, 400, None
+
+        try:
+            text, src_lang, tgt_lang, mode, profile, params = parse_translate_request(data)
+        except ValueError as e:
+            return {'error': str(e)}, 400, None
+
+        start_time = time.time()
+
+        try:
+            route = get_route(src_lang, tgt_lang)
+            # A pivot's first hops run before streaming, the last hop streams
+            hops = []
+            match = None
+            source_text = text
+            if len(route) > 2:
+                [source_text], _, _, [match], hops = translate_route(route[:-1], [text], mode, params)
+            hop_start = time.time()
+            hop_src = route[-2]
+            translator = get_translator(hop_src, tgt_lang)
+            cache_key = get_cache_key(translator, source_text, hop_src, tgt_lang, mode, params)
+            cached_translation = result_cache.get(cache_key)
+            # A memory translation is sent whole, like a cached one
+            hop_match = (
+                memory_lookup(translator, source_text, hop_src, tgt_lang, mode, params)
+                if cached_translation is None else None
+            )
+            match = hop_match or match
+            ready_translation = cached_translation
+            if hop_match and hop_match['match'] != 'hint':
+                ready_translation = hop_match['translation']
+        except Exception as e:
+            return {'error': f'Translation failed: {str(e)}'}, 503, None
 
-def initialize_translators():
+        # Sentence mode streams 'token' events, document mode one 'sentence' event per
+        # sentence chunk, then a 'done' event carries the full translation
+        def events(cancel):
+            pieces = []
+            try:
+                if ready_translation is not None:
+                    pieces.append(ready_translation)
+                    if mode == 'document':
+                        yield sse_event('sentence', {'index': 0, 'text': ready_translation, 'separator': ''})
+                    else:
+                        yield sse_event('token', {'text': ready_translation})
+                elif mode == 'document':
+                    chunks = translator.stream_document(
+                        source_text, hop_src, tgt_lang, batch_size=BATCH_MAX_SIZE, params=params, cancel=cancel
+                    )
+                    for index, (translation, separator) in enumerate(chunks):
+                        pieces.append(separator + translation)
+                        yield sse_event('sentence', {'index': index, 'text': translation, 'separator': separator})
+                else:
+                    for piece in translator.stream(source_text, hop_src, tgt_lang, params=params, cancel=cancel):
+                        pieces.append(piece)
+                        yield sse_event('token', {'text': piece})
+
+                # A cancelled stream stopped early, its partial translation is not kept
+                if cancel.is_set():
+                    return
+                translation = ''.join(pieces).strip()
+                if ready_translation is None:
+                    result_cache.set(cache_key, translation)
+                    if MEMORY_RECORD and translation_memory is not None and mode == 'sentence':
+                        translation_memory.add(
+                            source_text, translation, hop_src, tgt_lang,
+                            origin='model', version=memory_version(translator, params)
+                        )
+                translation_metrics.observe(
+                    'nmt_stage_seconds', time.time() - start_time, pair=f"{src_lang}_{tgt_lang}", stage='total'
+                )
+                yield sse_event('done', {
+                    'translation': translation,
+                    'source_language': src_lang,
+                    'target_language': tgt_lang,
+                    'mode': mode,
+                    'profile': profile,
+                    'cached': cached_translation is not None and all(hop['cached'] for hop in hops),
+                    'memory': match,
+                    'model_used': ' -> '.join([hop['model'] for hop in hops] + [translator.model_path]),
+                    'route': route,
+                    'hops': hops + [{
+                        'pair': f"{hop_src}_{tgt_lang}",
+                        'model': translator.model_path,
+                        'cached': cached_translation is not None,
+                        'memory_matches': int(hop_match is not None),
+                        'processing_time': round(time.time() - hop_start, 3)
+                    }],
+                    'processing_time': round(time.time() - start_time, 3)
+                })
+            except Exception as e:
+                yield sse_event('error', {'error': f'Translation failed: {str(e)}'})
+
+        return None, 200, events
+
+    except Exception as e:
+        return {'error': 'An internal server error occurred.'}, 500, None
+
+def handle_translate_batch(data):
+    try:
+        if not data:
+            return {'error': 'No JSON data provided.'}, 400
+            
+        texts = data.get('texts', [])
+        src_lang = data.get('src_lang', 'en')
+        tgt_lang = data.get('tgt_lang', 'hi')
+        
+        if not texts or not isinstance(texts, list):
+            return {'error': 'No texts array provided.'}, 400
+        if len(texts) > BATCH_MAX_TEXTS:
+            return {'error': f'Maximum {BATCH_MAX_TEXTS} texts allowed per batch.'}, 400
+        if src_lang not in LANGUAGES or tgt_lang not in LANGUAGES:
+            return {'error': 'Unsupported language selected.'}, 400
+        if src_lang == tgt_lang:
+            return {'error': 'Source and target languages are the same.'}, 400
+        try:
+            profile, params = get_decoding_params(data)
+        except ValueError as e:
+            return {'error': str(e)}, 400
+
+        start_time = time.time()
+        
+        # Only valid texts go to the model, invalid ones are reported per item
+        valid_indices = [i for i, text in enumerate(texts) if isinstance(text, str) and text.strip()]
+        valid_texts = [texts[i].strip() for i in valid_indices]
+        
+        try:
+            route = get_route(src_lang, tgt_lang)
+            results, cached, timings, matches, hops = translate_route(route, valid_texts, params=params)
+        except Exception as e:
+            return {'error': f'Translation failed: {str(e)}'}, 503
+        
+        translations = [{
+            'source': text,
+            'translation': None,
+            'success': False,
+            'error': 'Invalid text format'
+        } for text in texts]
+        for i, text, translation, hit, match, elapsed in zip(
+            valid_indices, valid_texts, results, cached, matches, timings
+        ):
+            translations[i] = {
+                'source': text,
+                'translation': translation,
+                'success': True,
+                'cached': hit,
+                'memory': match,
+                'processing_time': round(elapsed, 3)
+            }
+        
+        end_time = time.time()
+        
+        return {
+            'translations': translations,
+            'source_language': src_lang,
+            'target_language': tgt_lang,
+            'profile': profile,
+            'model_used': ' -> '.join(hop['model'] for hop in hops),
+            'route': route,
+            'hops': hops,
+            'total_count': len(translations),
+            'success_count': len(valid_indices),
+            'processing_time': round(end_time - start_time, 3)
+        }, 200
+        
+    except Exception as e:
+        return {'error': 'An internal server error occurred.'}, 500
+
+# Cache, batching and metrics of this process
+def handle_stats(data=None):
+    return {
+        'result_cache': result_cache.stats(),
+        'translation_memory': translation_memory.stats() if translation_memory else None,
+        'coalescing': in_flight.stats(),
+        'batching': batch_scheduler.stats(),
+        'tokenization': encoder_stats(),
+        'startup': startup_timings,
+        'metrics': translation_metrics.snapshot(),
+        'resident_memory': resident_memory(),
+    }, 200
+
+# Prometheus metrics of this process and its workers
+def handle_metrics():
+    snapshots = [translation_metrics.snapshot()]
+    cache_stats = result_cache.stats()
+    memory_stats = translation_memory.stats() if translation_memory else None
+    encoders = encoder_stats()
+    gauges = [('nmt_process_resident_memory_bytes', [('process', 'main')], resident_memory())]
+    if worker_pool:
+        worker_stats, answered = collect_worker_stats()
+        snapshots += [stats['metrics'] for stats in answered]
+        encoders = [encoder for stats in answered for encoder in stats['tokenization']]
+        if answered:
+            cache_stats = merge_cache_stats([stats['result_cache'] for stats in answered])
+            if memory_stats:
+                memory_stats = merge_memory_stats([stats['translation_memory'] for stats in answered])
+        gauges += [
+            ('nmt_process_resident_memory_bytes', [('process', f'worker{i}')], stats['resident_memory'])
+            for i, stats in enumerate(worker_stats) if stats is not None
+        ]
+        gauges += [
+            ('nmt_worker_stats_up', [('process', f'worker{i}')], int(stats is not None))
+            for i, stats in enumerate(worker_stats)
+        ]
+    snapshot = merge_snapshots(snapshots)
+
+    # Throughput from the token and generate time counters
+    counters = {(name, tuple(map(tuple, labels))): value for name, labels, value in snapshot['counters']}
+    for (name, labels), seconds in counters.items():
+        if name == 'nmt_generate_seconds_total' and seconds > 0:
+            tokens = counters.get(('nmt_output_tokens_total', labels), 0)
+            gauges.append(('nmt_output_tokens_per_second', list(labels), round(tokens / seconds, 2)))
+    for result, name in [('memory_hit', 'memory_hits'), ('disk_hit', 'disk_hits'), ('miss', 'misses')]:
+        gauges.append(('nmt_cache_lookups_total', [('result', result)], cache_stats[name]))
+    for result, name in [('hit', 'hits'), ('miss', 'misses')]:
+        gauges.append(('nmt_encoding_cache_lookups_total', [('result', result)], sum(e[name] for e in encoders)))
+    if memory_stats:
+        for result, name in [('exact', 'exact_hits'), ('fuzzy', 'fuzzy_hits'), ('hint', 'hints'), ('miss', 'misses')]:
+            gauges.append(('nmt_memory_lookups_total', [('result', result)], memory_stats[name]))
+    for model, entry in model_registry.stats()['loaded'].items():
+        gauges.append(('nmt_model_load_seconds', [('model', model)], entry['load_time']))
+        gauges.append(('nmt_model_memory_bytes', [('model', model)], entry['memory_bytes']))
+    return render_prometheus(snapshot, gauges), 200
+
+# Handlers a worker process can run
+HANDLERS = {
+    'stats': handle_stats,
+    'translate': handle_translate,
+    'translate_batch': handle_translate_batch,
+    'translate_stream': handle_translate_stream,
+}
+
+# Function to get the language pair a request is routed by
+def request_pair(data):
+    if not isinstance(data, dict):
+        return 'en_hi'
+    return f"{data.get('src_lang', 'en')}_{data.get('tgt_lang', 'hi')}"
+
+# Function to count a request and time it per language pair
+def record_request(endpoint, data, status, elapsed=None):
+    pair = request_pair(data)
+    if pair.split('_')[0] not in LANGUAGES or pair.split('_')[-1] not in LANGUAGES:
+        pair = 'invalid'
+    translation_metrics.inc('nmt_requests_total', endpoint=endpoint, pair=pair, status=status)
+    if elapsed is not None and status == 200:
+        translation_metrics.observe('nmt_stage_seconds', elapsed, pair=pair, stage='total')
+
+# Function to run a handler in this process, or on a worker serving the request's pair
+def dispatch(name, data):
+    start_time = time.perf_counter()
+    if worker_pool is None:
+        body, status = HANDLERS[name](data)
+    else:
+        try:
+            body, status = worker_pool.call(name, request_pair(data), data)
+        except Exception as e:
+            body, status = {'error': f'Translation failed: {str(e)}'}, 503
+    record_request(name, data, status, time.perf_counter() - start_time)
+    return body, status
+
+# Function to open a translation stream in this process or on a worker
+def dispatch_stream(data):
+    if worker_pool is None:
+        body, status, events = handle_translate_stream(data)
+    else:
+        try:
+            body, status, events = worker_pool.stream('translate_stream', request_pair(data), data)
+        except Exception as e:
+            body, status, events = {'error': f'Translation failed: {str(e)}'}, 503, None
+    # Stream totals are recorded when the stream completes
+    record_request('translate_stream', data, status)
+    return body, status, events
+
+# Function to read a request's JSON body, None when missing or malformed
+def get_request_json():
+    return request.get_json(silent=True)
+
+# API Endpoints
+@app.route('/api/health', methods=['GET'])
+def health_check():
+    body, status = handle_health()
+    return jsonify(body), status
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    text, status = handle_metrics()
+    return Response(text, status=status, content_type='text/plain; version=0.0.4; charset=utf-8')
+
+@app.route('/api/translate', methods=['POST'])
+def translate_text():
+    body, status = dispatch('translate', get_request_json())
+    return jsonify(body), status
+
+@app.route('/api/translate/stream', methods=['POST'])
+def translate_stream():
+    body, status, events = dispatch_stream(get_request_json())
+    if events is None:
+        return jsonify(body), status
+
+    def generate():
+        # Set when the client disconnects, stops generation at the next step
+        cancel = threading.Event()
+        try:
+            yield from events(cancel)
+        finally:
+            cancel.set()
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/translate/batch', methods=['POST'])
+def translate_batch():
+    body, status = dispatch('translate_batch', get_request_json())
+    return jsonify(body), status
+
+# Load pairs concurrently, pairs sharing a checkpoint wait for a single load
+def initialize_translators(pairs=None, warmup=WARMUP):
+    pairs = WARM_PAIRS if pairs is None else pairs
+    if not pairs:
+        print("No warm pairs configured, translators load on first use")
+        return
     print("Initializing translators...")
+    phase_start = time.time()
     
-    common_pairs = [('en', 'hi'), ('hi', 'en'), ('en', 'kn'), ('kn', 'en')]
-    
-    for src_lang, tgt_lang in common_pairs:
+    def load(pair):
+        src_lang, tgt_lang = pair.split('_')
+        start_time = time.time()
         try:
             get_translator(src_lang, tgt_lang)
             print(f"✓ Initialized {src_lang} -> {tgt_lang} translator")
+            return pair, time.time() - start_time
         except Exception as e:
             print(f"✗ Failed to initialize {src_lang} -> {tgt_lang}: {e}")
+            return pair, None
+    
+    with ThreadPoolExecutor(max(1, min(LOAD_THREADS, len(pairs)))) as executor:
+        load_times = dict(executor.map(load, pairs))
+    startup_timings['load_seconds'] = round(time.time() - phase_start, 3)
+    startup_timings['pairs'] = {
+        pair: {'load_seconds': round(elapsed, 3)} for pair, elapsed in load_times.items() if elapsed is not None
+    }
+    if warmup:
+        warmup_translators([pair for pair in pairs if load_times[pair] is not None])
+
+# Run one dummy generate per loaded model, one after another so they don't compete for cores
+def warmup_translators(pairs):
+    phase_start = time.time()
+    warmed = set()
+    for pair in pairs:
+        src_lang, tgt_lang = pair.split('_')
+        translator = get_translator(src_lang, tgt_lang)
+        if id(translator) in warmed:
+            continue
+        warmed.add(id(translator))
+        elapsed = translator.warmup(src_lang, tgt_lang)
+        startup_timings.setdefault('pairs', {}).setdefault(pair, {})['warmup_seconds'] = round(elapsed, 3)
+    startup_timings['warmup_seconds'] = round(time.time() - phase_start, 3)
+
+# Prepare a forked worker: its own SQLite connections, then warm its pairs' models
+def start_worker(pairs):
+    result_cache.reopen()
+    if translation_memory:
+        translation_memory.reopen()
+    if WARMUP:
+        warmup_translators(pairs)
+
+# Load every available pair, then fork the workers so they share the weights
+def start_worker_pool():
+    global worker_pool
+    pairs = WARM_PAIRS or [pair for pair, path in MODEL_PATHS.items() if os.path.exists(path)]
+    # Workers warm up their own models after the fork
+    initialize_translators(pairs, warmup=False)
+    phase_start = time.time()
+    worker_pool = WorkerPool(
+        PROCESSES, HANDLERS, pairs, core_sets=WORKER_CORES, num_threads=TORCH_THREADS,
+        concurrency=WORKER_CONCURRENCY, on_start=start_worker
+    )
+    startup_timings['fork_seconds'] = round(time.time() - phase_start, 3)
+    for worker in worker_pool.workers:
+        print(f"✓ Worker {worker.index} (pid {worker.process.pid}) on cores {worker.cores}")
+
+# Load models for the configured serving mode
+def initialize_serving():
+    if PROCESSES > 0:
+        start_worker_pool()
+    else:
+        initialize_translators()
+    startup_timings['ready_seconds'] = round(time.time() - PROCESS_START, 3)
 
 def start_api_server():
-    initialize_translators()
+    if SERVER == 'asgi':
+        # asgi.py loads the models and serves the same endpoints on a bounded worker pool
+        import uvicorn
+        uvicorn.run('asgi:app', host='0.0.0.0', port=5005)
+        return
+    configure_threads(TORCH_THREADS, TORCH_INTEROP_THREADS)
+    initialize_serving()
     app.run(debug=False, use_reloader=False, host='0.0.0.0', port=5005, threaded=True)
 
 
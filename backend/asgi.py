@@ -0,0 +1,119 @@
+# ASGI serving mode with the same API as app.py, inference runs on a bounded
+# worker pool: cd backend && uvicorn asgi:app --port 5005 (or NMT_SERVER=asgi python app.py)
+import json
+import os
+from contextlib import asynccontextmanager
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+import app as nmt
+from serving import InferencePool, QueueFullError, OverloadedError
+
+# Worker pool size, requests allowed to wait for a worker, and seconds a request may take
+WORKERS = int(os.environ.get('NMT_WORKERS', 4))
+QUEUE_LIMIT = int(os.environ.get('NMT_QUEUE_LIMIT', 64))
+REQUEST_TIMEOUT = float(os.environ.get('NMT_REQUEST_TIMEOUT', 30))
+inference_pool = InferencePool(WORKERS, QUEUE_LIMIT, REQUEST_TIMEOUT)
+
+
+# Read a request's JSON body, None when missing or malformed
+async def get_request_json(request):
+    try:
+        return json.loads(await request.body())
+    except ValueError:
+        return None
+
+
+# Response for a request shed by the pool
+def shed_response(error, status):
+    return JSONResponse({'error': str(error)}, status_code=status, headers={'Retry-After': '1'})
+
+
+# Run a handler on the pool, shedding load with 429/503
+async def run_handler(handler, *args):
+    try:
+        body, status = await inference_pool.run(handler, *args)
+    except QueueFullError as e:
+        return shed_response(e, 429)
+    except OverloadedError as e:
+        return shed_response(e, 503)
+    return JSONResponse(body, status_code=status)
+
+
+# API Endpoints
+async def health_check(request):
+    # Collecting worker stats blocks, so keep it off the event loop
+    body, status = await run_in_threadpool(nmt.handle_health)
+    body['serving'] = dict(inference_pool.stats(), server='asgi')
+    return JSONResponse(body, status_code=status)
+
+
+async def metrics(request):
+    text, status = await run_in_threadpool(nmt.handle_metrics)
+    return PlainTextResponse(text, status_code=status, media_type='text/plain; version=0.0.4')
+
+
+async def translate_text(request):
+    return await run_handler(nmt.dispatch, 'translate', await get_request_json(request))
+
+
+async def translate_batch(request):
+    return await run_handler(nmt.dispatch, 'translate_batch', await get_request_json(request))
+
+
+async def translate_stream(request):
+    data = await get_request_json(request)
+    # Validation, model loading and the cache lookup run on the pool as well
+    try:
+        body, status, events = await inference_pool.run(nmt.dispatch_stream, data)
+    except QueueFullError as e:
+        return shed_response(e, 429)
+    except OverloadedError as e:
+        return shed_response(e, 503)
+    if events is None:
+        return JSONResponse(body, status_code=status)
+    try:
+        # A stream holds a worker until it ends or the client disconnects
+        stream = inference_pool.iterate(events)
+        first = await stream.__anext__()
+    except QueueFullError as e:
+        return shed_response(e, 429)
+    except OverloadedError as e:
+        return shed_response(e, 503)
+
+    async def generate():
+        yield first
+        async for event in stream:
+            yield event
+
+    return StreamingResponse(generate(), media_type='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+
+# Load the configured models on startup and stop the workers on shutdown
+@asynccontextmanager
+async def lifespan(app):
+    nmt.configure_threads(nmt.TORCH_THREADS, nmt.TORCH_INTEROP_THREADS)
+    nmt.initialize_serving()
+    yield
+    inference_pool.shutdown()
+    if nmt.worker_pool:
+        nmt.worker_pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/health', health_check, methods=['GET']),
+        Route('/api/metrics', metrics, methods=['GET']),
+        Route('/api/translate', translate_text, methods=['POST']),
+        Route('/api/translate/stream', translate_stream, methods=['POST']),
+        Route('/api/translate/batch', translate_batch, methods=['POST']),
+    ],
+    middleware=[Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])],
+    lifespan=lifespan,
+)
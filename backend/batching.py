@@ -0,0 +1,138 @@
+# Import Libraries
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from metrics import translation_metrics
+
+
+# Micro-batching queue for one language pair
+class BatchQueue:
+    # Initialize the queue and start its worker thread
+    def __init__(self, src_lang, tgt_lang, max_batch_size=16, max_wait_ms=10):
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._pending = deque()
+        self._condition = threading.Condition()
+        # Metrics
+        self.total_requests = 0
+        self.total_batches = 0
+        self.max_batch_seen = 0
+        self.total_wait = 0.0
+        self.batch_size_counts = {}
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    # Queue a text and return a future for its translation
+    def submit(self, translator, text, params=None):
+        future = Future()
+        with self._condition:
+            self._pending.append((translator, text, params, future, time.time()))
+            self._condition.notify()
+        return future
+
+    # Collect the next batch once it is full or the wait window closes
+    def _collect(self):
+        with self._condition:
+            while not self._pending:
+                self._condition.wait()
+            deadline = self._pending[0][4] + self.max_wait
+            while len(self._pending) < self.max_batch_size:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            count = min(len(self._pending), self.max_batch_size)
+            return [self._pending.popleft() for _ in range(count)]
+
+    # Worker loop: run one generate call per batch and hand back results
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.time()
+            self._record(batch, started)
+            # Requests queued across a model reload may hold different translators,
+            # and only requests with the same decoding parameters share a generate call
+            groups = {}
+            for item in batch:
+                params_key = tuple(sorted(item[2].items())) if item[2] else None
+                groups.setdefault((id(item[0]), params_key), []).append(item)
+            for items in groups.values():
+                self._translate_group(items)
+
+    # Run one generate call for requests sharing a translator and parameters
+    def _translate_group(self, items):
+        translator, _, params, _, _ = items[0]
+        texts = [text for _, text, _, _, _ in items]
+        try:
+            translations = translator.generate_batch(texts, self.src_lang, self.tgt_lang, params)
+        except Exception as e:
+            for _, _, _, future, _ in items:
+                future.set_exception(e)
+            return
+        for (_, _, _, future, _), translation in zip(items, translations):
+            future.set_result(translation)
+
+    # Record batch size and queue wait metrics
+    def _record(self, batch, started):
+        size = len(batch)
+        pair = f"{self.src_lang}_{self.tgt_lang}"
+        for _, _, _, _, queued in batch:
+            translation_metrics.observe('nmt_stage_seconds', started - queued, pair=pair, stage='queue_wait')
+        with self._condition:
+            self.total_requests += size
+            self.total_batches += 1
+            self.max_batch_seen = max(self.max_batch_seen, size)
+            self.total_wait += sum(started - queued for _, _, _, _, queued in batch)
+            self.batch_size_counts[size] = self.batch_size_counts.get(size, 0) + 1
+
+    # Get queue metrics
+    def stats(self):
+        with self._condition:
+            return {
+                'queue_depth': len(self._pending),
+                'total_requests': self.total_requests,
+                'total_batches': self.total_batches,
+                'avg_batch_size': round(self.total_requests / self.total_batches, 2) if self.total_batches else 0.0,
+                'max_batch_size': self.max_batch_seen,
+                'avg_wait_ms': round(self.total_wait / self.total_requests * 1000, 2) if self.total_requests else 0.0,
+                'batch_size_counts': {str(size): count for size, count in sorted(self.batch_size_counts.items())},
+            }
+
+
+# Scheduler holding one batching queue per language pair
+class BatchScheduler:
+    # Initialize the scheduler
+    def __init__(self, max_batch_size=16, max_wait_ms=10):
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.queues = {}
+        self._lock = threading.Lock()
+
+    # Get the queue for a language pair, creating it on first use
+    def get_queue(self, src_lang, tgt_lang):
+        pair = f"{src_lang}_{tgt_lang}"
+        with self._lock:
+            queue = self.queues.get(pair)
+            if queue is None:
+                queue = BatchQueue(src_lang, tgt_lang, self.max_batch_size, self.max_wait_ms)
+                self.queues[pair] = queue
+            return queue
+
+    # Translate a text through the pair's queue and wait for the result
+    def translate(self, translator, text, src_lang, tgt_lang, params=None, timeout=None):
+        if self.max_batch_size <= 1:
+            return translator.translate(text, src_lang, tgt_lang, params)
+        return self.get_queue(src_lang, tgt_lang).submit(translator, text, params).result(timeout)
+
+    # Get metrics for all queues
+    def stats(self):
+        with self._lock:
+            queues = dict(self.queues)
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'queues': {pair: queue.stats() for pair, queue in queues.items()},
+        }
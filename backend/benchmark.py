@@ -0,0 +1,287 @@
+# Load test of the translation engine in-process or of a running server:
+#   python benchmark.py --tiny --synthetic 200 --concurrency 4 --output tiny.json
+#   python benchmark.py --server http://127.0.0.1:5005 --samanantar --rate 10 --baseline baseline.json
+# A server answers repeated sentences from its result cache, so compare runs
+# against freshly started servers (or change --seed for synthetic corpora).
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import requests
+import torch
+from metrics import resident_memory
+
+# Vocabulary for synthetic sentences
+WORDS = [
+    "the", "a", "people", "city", "government", "school", "river", "market", "farmer", "teacher",
+    "water", "train", "village", "children", "doctor", "festival", "book", "road", "morning", "rain",
+    "is", "was", "will", "has", "opened", "visited", "announced", "built", "crossed", "needs",
+    "new", "old", "large", "small", "every", "near", "after", "before", "during", "with",
+    "today", "yesterday", "again", "quickly", "together", "and", "but", "because", "of", "in",
+]
+# Metrics compared against a baseline, and whether higher is better
+COMPARED_METRICS = [
+    ('throughput_rps', True),
+    ('latency_p50_ms', False),
+    ('latency_p95_ms', False),
+    ('latency_p99_ms', False),
+    ('resident_memory_mb', False),
+]
+
+
+# Synthetic English sentences with a controlled number of words
+def synthetic_corpus(count, min_words=3, max_words=20, seed=0):
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(count):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(min_words, max_words))]
+        sentences.append(' '.join(words).capitalize() + '.')
+    return sentences
+
+
+# One sentence per line from a text file
+def file_corpus(path):
+    with open(path, encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+# Held-out samanantar sentences in the source language of the pair
+def samanantar_corpus(src_lang, tgt_lang, rows):
+    from measure_length_ratios import load_validation_pairs
+    pairs = load_validation_pairs(tgt_lang if src_lang == 'en' else src_lang, rows)
+    return [pair['english'] if src_lang == 'en' else pair['target'] for pair in pairs]
+
+
+# Build (or reuse) a tiny randomly initialized Marian model with a sentencepiece
+# vocabulary trained on synthetic text, so benchmarks run without downloads
+def build_tiny_model(output_dir, seed=0):
+    if os.path.exists(os.path.join(output_dir, 'model.safetensors')):
+        return output_dir
+    import sentencepiece as spm
+    from transformers import MarianConfig, MarianMTModel, MarianTokenizer
+
+    os.makedirs(output_dir, exist_ok=True)
+    text_path = os.path.join(output_dir, 'spm_corpus.txt')
+    with open(text_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(synthetic_corpus(2000, 1, 20, seed)))
+    spm.SentencePieceTrainer.train(
+        input=text_path, model_prefix=os.path.join(output_dir, 'spm'), vocab_size=200,
+        hard_vocab_limit=False, character_coverage=1.0, num_threads=1, minloglevel=2,
+    )
+    processor = spm.SentencePieceProcessor(model_file=os.path.join(output_dir, 'spm.model'))
+    vocab = {'</s>': 0, '<unk>': 1}
+    for i in range(processor.get_piece_size()):
+        vocab.setdefault(processor.id_to_piece(i), len(vocab))
+    vocab['<pad>'] = len(vocab)
+    vocab_path = os.path.join(output_dir, 'vocab.json')
+    with open(vocab_path, 'w', encoding='utf-8') as f:
+        json.dump(vocab, f, ensure_ascii=False)
+    spm_path = os.path.join(output_dir, 'spm.model')
+    tokenizer = MarianTokenizer(spm_path, spm_path, vocab_path)
+    tokenizer.save_pretrained(output_dir)
+
+    torch.manual_seed(seed)
+    config = MarianConfig(
+        vocab_size=len(vocab), decoder_vocab_size=len(vocab), d_model=64,
+        encoder_layers=2, decoder_layers=2, encoder_attention_heads=4, decoder_attention_heads=4,
+        encoder_ffn_dim=128, decoder_ffn_dim=128, max_position_embeddings=256,
+        pad_token_id=vocab['<pad>'], eos_token_id=0, decoder_start_token_id=vocab['<pad>'],
+        forced_eos_token_id=None, architectures=['MarianMTModel'],
+    )
+    MarianMTModel(config).save_pretrained(output_dir)
+    for name in ['spm_corpus.txt', 'spm.model', 'spm.vocab']:
+        os.remove(os.path.join(output_dir, name))
+    return output_dir
+
+
+# Translation engine in this process, optionally behind the micro-batching scheduler
+class InProcessTarget:
+    def __init__(self, model_path, src_lang, tgt_lang, profile, batch_size=1, max_wait_ms=10):
+        from translator import UniversalTranslator, DECODING_PROFILES
+        from batching import BatchScheduler
+        self.translator = UniversalTranslator(model_path)
+        self.src_lang = src_lang
+        self.tgt_lang = tgt_lang
+        self.params = dict(DECODING_PROFILES[profile])
+        self.scheduler = BatchScheduler(batch_size, max_wait_ms)
+
+    def translate(self, text):
+        return self.scheduler.translate(self.translator, text, self.src_lang, self.tgt_lang, self.params)
+
+    def memory_bytes(self):
+        return resident_memory()
+
+
+# Running API server
+class ServerTarget:
+    def __init__(self, url, src_lang, tgt_lang, profile):
+        self.url = url.rstrip('/')
+        self.payload = {'src_lang': src_lang, 'tgt_lang': tgt_lang, 'profile': profile}
+        self._local = threading.local()
+
+    def translate(self, text):
+        # One session per client thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        response = session.post(f"{self.url}/api/translate", json=dict(self.payload, text=text), timeout=120)
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return response.json()['translation']
+
+    # Resident memory of the server and its workers, from /api/metrics
+    def memory_bytes(self):
+        response = requests.get(f"{self.url}/api/metrics", timeout=30)
+        return sum(
+            float(line.rsplit(' ', 1)[1]) for line in response.text.splitlines()
+            if line.startswith('nmt_process_resident_memory_bytes{')
+        )
+
+
+# Replay texts at fixed concurrency (closed loop), or at a fixed arrival rate
+# (open loop, latency counted from the scheduled arrival so queueing shows up)
+def run_load(target, texts, concurrency=1, rate=0.0):
+    latencies = [None] * len(texts)
+    errors = []
+    start_time = time.perf_counter()
+
+    def send(i):
+        scheduled = start_time + i / rate if rate > 0 else None
+        if scheduled is not None:
+            time.sleep(max(0.0, scheduled - time.perf_counter()))
+        request_start = scheduled if scheduled is not None else time.perf_counter()
+        try:
+            target.translate(texts[i])
+            latencies[i] = time.perf_counter() - request_start
+        except Exception as e:
+            errors.append(str(e))
+
+    with ThreadPoolExecutor(concurrency) as executor:
+        list(executor.map(send, range(len(texts))))
+    return [latency for latency in latencies if latency is not None], errors, time.perf_counter() - start_time
+
+
+# Summary metrics of one run
+def summarize(latencies, errors, duration, memory_bytes):
+    latencies_ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        'requests': len(latencies) + len(errors),
+        'errors': len(errors),
+        'duration_s': round(duration, 3),
+        'throughput_rps': round(len(latencies) / duration, 2) if duration else 0.0,
+        'latency_mean_ms': round(float(latencies_ms.mean()), 2),
+        'latency_p50_ms': round(float(np.percentile(latencies_ms, 50)), 2),
+        'latency_p95_ms': round(float(np.percentile(latencies_ms, 95)), 2),
+        'latency_p99_ms': round(float(np.percentile(latencies_ms, 99)), 2),
+        'latency_max_ms': round(float(latencies_ms.max()), 2),
+        'resident_memory_mb': round(memory_bytes / (1024 * 1024), 1),
+    }
+
+
+# Compare results with a baseline, returns the regressed metric names
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"\n{'':22}{'baseline':>12}{'current':>12}{'change':>10}")
+    for metric, higher_is_better in COMPARED_METRICS:
+        before, after = baseline['results'].get(metric), results.get(metric)
+        if before is None or after is None:
+            continue
+        change = (after - before) / before if before else 0.0
+        regressed = change < -tolerance if higher_is_better else change > tolerance
+        if regressed:
+            regressions.append(metric)
+        flag = '  REGRESSION' if regressed else ''
+        print(f"{metric:22}{before:>12}{after:>12}{change * 100:>+9.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, latency percentiles and memory of the translator or API server")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument('--model', help="Checkpoint to benchmark in-process")
+    target_group.add_argument('--tiny', action='store_true', help="In-process tiny random Marian model, no downloads")
+    target_group.add_argument('--server', help="Base URL of a running server, e.g. http://127.0.0.1:5005")
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--profile', default='quality')
+    corpus_group = parser.add_mutually_exclusive_group()
+    corpus_group.add_argument('--corpus', help="Text file with one sentence per line")
+    corpus_group.add_argument('--samanantar', action='store_true', help="Held-out samanantar slice for the pair")
+    corpus_group.add_argument('--synthetic', type=int, default=200, help="Number of synthetic sentences (default)")
+    parser.add_argument('--rows', type=int, default=5000, help="Samanantar rows read, as in the notebook")
+    parser.add_argument('--min-words', type=int, default=3)
+    parser.add_argument('--max-words', type=int, default=20)
+    parser.add_argument('--limit', type=int, default=0, help="Use only the first N sentences")
+    parser.add_argument('--concurrency', type=int, default=1, help="Concurrent clients")
+    parser.add_argument('--rate', type=float, default=0.0, help="Arrivals per second, 0 sends back to back")
+    parser.add_argument('--warmup', type=int, default=5, help="Untimed requests before the run")
+    parser.add_argument('--batch-size', type=int, default=1, help="In-process micro-batch size")
+    parser.add_argument('--max-wait-ms', type=float, default=10)
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads in-process")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tiny-dir', default=os.path.join(tempfile.gettempdir(), 'nmt_benchmark_tiny'))
+    parser.add_argument('--output', help="Write the results JSON here, e.g. to save a baseline")
+    parser.add_argument('--baseline', help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative change before flagging")
+    args = parser.parse_args()
+
+    if args.corpus:
+        texts, corpus = file_corpus(args.corpus), f"file:{args.corpus}"
+    elif args.samanantar:
+        texts, corpus = samanantar_corpus(args.src, args.tgt, args.rows), f"samanantar:{args.rows}"
+    else:
+        texts = synthetic_corpus(args.synthetic, args.min_words, args.max_words, args.seed)
+        corpus = f"synthetic:{args.synthetic}:{args.min_words}-{args.max_words}:seed{args.seed}"
+    if args.limit:
+        texts = texts[:args.limit]
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    if args.server:
+        target = ServerTarget(args.server, args.src, args.tgt, args.profile)
+        target_name = args.server
+    else:
+        model_path = build_tiny_model(args.tiny_dir, args.seed) if args.tiny else args.model
+        target = InProcessTarget(model_path, args.src, args.tgt, args.profile, args.batch_size, args.max_wait_ms)
+        target_name = f"inprocess:{model_path}"
+
+    for text in texts[:args.warmup]:
+        target.translate(text)
+    latencies, errors, duration = run_load(target, texts, args.concurrency, args.rate)
+    results = summarize(latencies, errors, duration, target.memory_bytes())
+
+    config = {
+        'target': target_name, 'pair': f"{args.src}_{args.tgt}", 'profile': args.profile, 'corpus': corpus,
+        'sentences': len(texts), 'concurrency': args.concurrency, 'rate': args.rate,
+        'batch_size': args.batch_size, 'torch_threads': torch.get_num_threads(),
+    }
+    print(f"\n===== {config['pair']} via {target_name} =====")
+    print(f"corpus {corpus}, {len(texts)} sentences, concurrency {args.concurrency}, "
+          f"{'rate ' + str(args.rate) + '/s' if args.rate else 'closed loop'}")
+    for metric, value in results.items():
+        print(f"{metric:22}{value:>12}")
+    if errors:
+        print(f"First error: {errors[0]}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'config': config, 'results': results}, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != config:
+            print("Note: baseline was recorded with a different configuration")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            raise SystemExit(f"\nRegressions beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        print(f"\nNo regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+# Compare fixed max_length decoding with adaptive length budgets and repetition guards:
+#   python benchmark_generation.py results/marian_en_hi_finetuned --src en --tgt hi
+#   python benchmark_generation.py results/marian_en_hi_finetuned --references data.tsv
+# Also counts the references each repetition guard setting would cut short,
+# and the greedy outputs without a guard that it would end as loops.
+import argparse
+import time
+import numpy as np
+import torch
+from decoding import RepetitionGuard
+from translator import UniversalTranslator, DECODING_PROFILES, TEST_CASES
+
+# Mostly short inputs, like production traffic, plus a few long ones
+SENTENCES = [
+    "Hello", "Thank you", "Good morning", "Yes", "Where is the bathroom?",
+    "I need help", "How much does this cost?", "See you tomorrow",
+    "Please call me back when you are free.",
+    "The meeting has been moved to Thursday afternoon because the manager is travelling.",
+]
+
+
+# Legitimate translations with runs a repetition guard can take for loops
+REPETITIVE_REFERENCES = [
+    "No no no no, that is not what I meant.",
+    "Ha ha ha ha ha, very funny.",
+    "Wait........ what happened?",
+    "Dial 9 9 9 9 9 9 9 9 for the operator.",
+    "---------- End of notice ----------",
+    "Yes yes yes yes yes yes, I agree.",
+    "नहीं नहीं नहीं नहीं, मैंने ऐसा नहीं कहा।",
+]
+# Guard settings compared: repeats needed, and whether punctuation and digit runs are exempt
+GUARD_SETTINGS = [(4, False), (8, False), (8, True)]
+
+
+# Texts a guard would cut short: it forces EOS after any prefix ending in a loop
+def guard_truncations(translator, texts, min_repeats, exempt):
+    guard = RepetitionGuard(
+        translator.tokenizer.eos_token_id, min_repeats, translator.guard_exempt_ids if exempt else None
+    )
+    start_id = translator.model.generation_config.decoder_start_token_id
+    truncated = 0
+    for text in texts:
+        ids = translator.tokenizer(text_target=text, return_tensors='pt')['input_ids'][:, :-1]
+        ids = torch.cat([torch.tensor([[start_id]]), ids], dim=1)
+        if any(guard.degenerate_rows(ids[:, :end]).item() for end in range(2, ids.shape[1])):
+            truncated += 1
+    return truncated
+
+
+# Target sides of a tab-separated english/target file
+def load_references(path, src_lang, limit):
+    references = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) >= 2:
+                references.append(parts[0] if src_lang != 'en' else parts[1])
+            if len(references) >= limit:
+                break
+    return references
+
+
+# Latency percentiles of one decoding setup
+def run(translator, texts, src_lang, tgt_lang, params, runs):
+    latencies = []
+    output_lengths = []
+    for _ in range(runs):
+        for text in texts:
+            start_time = time.time()
+            translation = translator.translate(text, src_lang, tgt_lang, params)
+            latencies.append((time.time() - start_time) * 1000)
+            output_lengths.append(len(translator.tokenizer(text_target=translation)['input_ids']))
+    return {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(np.mean(latencies)), 2),
+        'mean_output_tokens': round(float(np.mean(output_lengths)), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p99 latency of adaptive max_length against fixed max_length")
+    parser.add_argument('model_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--profile', default='quality', choices=list(DECODING_PROFILES))
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--references', help="Tab-separated english/target file whose target side is checked against the guard")
+    parser.add_argument('--limit', type=int, default=2000, help="References read from --references")
+    args = parser.parse_args()
+
+    translator = UniversalTranslator(args.model_path)
+    if args.src == 'en':
+        texts = SENTENCES
+    else:
+        texts = [case['source'] for case in TEST_CASES.get(f"{args.src}_{args.tgt}", [])]
+    ratio = translator.length_ratios.get(f"{args.src}_{args.tgt}")
+    print(f"Length ratio for {args.src} -> {args.tgt}: {ratio if ratio else 'not measured, using default'}")
+
+    adaptive = dict(DECODING_PROFILES[args.profile])
+    fixed = dict(adaptive, length_ratio=0, repetition_guard=0)
+    # Warm up
+    translator.translate(texts[0], args.src, args.tgt, fixed)
+
+    results = {
+        'fixed': run(translator, texts, args.src, args.tgt, fixed, args.runs),
+        'adaptive': run(translator, texts, args.src, args.tgt, adaptive, args.runs),
+    }
+    print(f"\n===== {args.src.upper()} -> {args.tgt.upper()}, profile {args.profile}, {len(texts)} sentences x {args.runs} =====")
+    print(f"{'':20}{'fixed':>10}{'adaptive':>10}{'change':>10}")
+    for metric in ['p50_ms', 'p99_ms', 'mean_ms', 'mean_output_tokens']:
+        before, after = results['fixed'][metric], results['adaptive'][metric]
+        change = (after - before) / before * 100 if before else 0.0
+        print(f"{metric:20}{before:>10}{after:>10}{change:>+9.1f}%")
+
+    # Guard false positives on real text, and loops it ends in unguarded greedy output
+    references = REPETITIVE_REFERENCES + (load_references(args.references, args.src, args.limit) if args.references else [])
+    unguarded = dict(DECODING_PROFILES['fast'], repetition_guard=0)
+    outputs = [translator.translate(text, args.src, args.tgt, unguarded) for text in texts]
+    print(f"\n===== Repetition guard: {len(REPETITIVE_REFERENCES)} repetitive + "
+          f"{len(references) - len(REPETITIVE_REFERENCES)} corpus references, {len(outputs)} unguarded outputs =====")
+    print(f"{'':28}{'repetitive':>12}{'corpus':>10}{'loops':>10}")
+    for min_repeats, exempt in GUARD_SETTINGS:
+        name = f"{min_repeats} repeats" + (", exempt" if exempt else "")
+        repetitive = guard_truncations(translator, REPETITIVE_REFERENCES, min_repeats, exempt)
+        corpus = guard_truncations(translator, references[len(REPETITIVE_REFERENCES):], min_repeats, exempt)
+        loops = guard_truncations(translator, outputs, min_repeats, exempt)
+        print(f"{name:28}{repetitive:>12}{corpus:>10}{loops:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Compare a dynamic int8 quantized model with its fp32 checkpoint:
+#   python benchmark_quantization.py results/marian_en_hi_finetuned --src en --tgt hi --save
+import argparse
+import time
+import nltk
+from translator import UniversalTranslator, TEST_CASES
+from evaluation import TranslationEvaluator, load_cases
+from quantization import configure_threads, save_quantized
+
+
+# Translate all cases and collect latency and quality
+def evaluate(translator, cases, src_lang, tgt_lang, evaluator, runs):
+    latencies = []
+    bleu_scores = []
+    meteor_scores = []
+    predictions = []
+
+    for case in cases:
+        # Warm run, then timed runs
+        prediction = translator.translate(case['source'], src_lang, tgt_lang)
+        for _ in range(runs):
+            start_time = time.time()
+            translator.translate(case['source'], src_lang, tgt_lang)
+            latencies.append(time.time() - start_time)
+        predictions.append(prediction)
+        bleu_scores.append(evaluator.calculate_bleu(case['reference'], prediction))
+        meteor_scores.append(evaluator.calculate_meteor(case['reference'], prediction))
+
+    return {
+        'latency_ms': round(sum(latencies) / len(latencies) * 1000, 2),
+        'bleu': round(sum(bleu_scores) / len(bleu_scores), 2),
+        'meteor': round(sum(meteor_scores) / len(meteor_scores), 2),
+        'memory_mb': round(translator.memory_bytes() / (1024 * 1024), 1),
+        'predictions': predictions,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and BLEU deltas of int8 quantization against fp32")
+    parser.add_argument('model_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--data', help="Tab-separated source/reference file, defaults to the notebook's test cases")
+    parser.add_argument('--runs', type=int, default=3, help="Timed runs per sentence")
+    parser.add_argument('--threads', type=int, default=0)
+    parser.add_argument('--interop-threads', type=int, default=0)
+    parser.add_argument('--save', action='store_true', help="Save the quantized checkpoint next to the model")
+    args = parser.parse_args()
+
+    for corpus in ['punkt', 'punkt_tab', 'wordnet', 'omw-1.4']:
+        nltk.download(corpus, quiet=True)
+    threads, interop_threads = configure_threads(args.threads, args.interop_threads)
+    print(f"Threads: intra-op {threads}, inter-op {interop_threads}")
+
+    cases = list(load_cases(args.data)) if args.data else TEST_CASES.get(f"{args.src}_{args.tgt}", [])
+    if not cases:
+        raise SystemExit(f"No test cases for {args.src} -> {args.tgt}, pass --data")
+
+    evaluator = TranslationEvaluator()
+    fp32 = UniversalTranslator(args.model_path)
+    int8 = UniversalTranslator(args.model_path, quantize=True)
+    fp32_results = evaluate(fp32, cases, args.src, args.tgt, evaluator, args.runs)
+    int8_results = evaluate(int8, cases, args.src, args.tgt, evaluator, args.runs)
+
+    print(f"\n===== {args.src.upper()} -> {args.tgt.upper()}: fp32 vs int8 ({len(cases)} sentences) =====")
+    print(f"{'':12}{'fp32':>10}{'int8':>10}{'delta':>10}")
+    for metric in ['latency_ms', 'bleu', 'meteor', 'memory_mb']:
+        delta = int8_results[metric] - fp32_results[metric]
+        print(f"{metric:12}{fp32_results[metric]:>10}{int8_results[metric]:>10}{delta:>+10.2f}")
+    speedup = fp32_results['latency_ms'] / int8_results['latency_ms'] if int8_results['latency_ms'] else 0.0
+    changed = sum(a != b for a, b in zip(fp32_results['predictions'], int8_results['predictions']))
+    print(f"\nSpeedup: {speedup:.2f}x, changed outputs: {changed}/{len(cases)}")
+
+    if args.save:
+        print(f"Saved quantized checkpoint to {save_quantized(int8.model, args.model_path)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+# Compare greedy decoding with speculative decoding through a pair's draft model:
+#   python benchmark_speculative.py --model results/marian_en_hi_finetuned --draft results/marian_en_hi_draft --samanantar
+#   python benchmark_speculative.py --tiny
+# Sentences are translated one at a time, as interactive requests are. Reports
+# latency percentiles of both, the speedup, how many speculative outputs equal
+# the greedy ones, and the draft's acceptance rate: draft tokens the model
+# accepted out of those proposed (nmt_draft_tokens_total). --tiny uses random
+# models, so only its timings of the mechanics mean anything.
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import torch
+from benchmark import build_tiny_model, file_corpus, samanantar_corpus, synthetic_corpus
+from metrics import translation_metrics
+from translator import UniversalTranslator, DECODING_PROFILES
+
+
+# Cut the tiny model down to a draft with the training code
+def build_tiny_draft(model_path, draft_path, num_layers):
+    if os.path.exists(os.path.join(draft_path, 'model.safetensors')):
+        return draft_path
+    from transformers import MarianMTModel, MarianTokenizer
+    from train import make_draft
+    make_draft(MarianMTModel.from_pretrained(model_path), num_layers).save_pretrained(draft_path)
+    MarianTokenizer.from_pretrained(model_path).save_pretrained(draft_path)
+    return draft_path
+
+
+# Draft tokens proposed and accepted so far for a pair
+def draft_counts(pair):
+    counts = {'proposed': 0, 'accepted': 0}
+    for name, labels, value in translation_metrics.snapshot()['counters']:
+        labels = dict(labels)
+        if name == 'nmt_draft_tokens_total' and labels['pair'] == pair:
+            counts[labels['result']] += value
+    return counts
+
+
+# Translations and latency percentiles of one decoding setup
+def run(translator, texts, src_lang, tgt_lang, params, runs):
+    latencies = []
+    for _ in range(runs):
+        translations = []
+        for text in texts:
+            start_time = time.perf_counter()
+            translations.append(translator.translate(text, src_lang, tgt_lang, params))
+            latencies.append((time.perf_counter() - start_time) * 1000)
+    return translations, {
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'mean_ms': round(float(np.mean(latencies)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency, speedup and acceptance rate of draft-model speculative decoding")
+    target_group = parser.add_mutually_exclusive_group(required=True)
+    target_group.add_argument('--model', help="Fine-tuned checkpoint that verifies")
+    target_group.add_argument('--tiny', action='store_true', help="Tiny random Marian model and a draft cut from it")
+    parser.add_argument('--draft', help="Draft checkpoint, e.g. results/marian_en_hi_draft from train.py --draft")
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    corpus_group = parser.add_mutually_exclusive_group()
+    corpus_group.add_argument('--corpus', help="Text file with one sentence per line")
+    corpus_group.add_argument('--samanantar', action='store_true', help="Held-out samanantar slice for the pair")
+    corpus_group.add_argument('--synthetic', type=int, default=50, help="Number of synthetic sentences (default)")
+    parser.add_argument('--rows', type=int, default=5000, help="Samanantar rows read, as in the notebook")
+    parser.add_argument('--limit', type=int, default=100, help="Use only the first N sentences, 0 for all")
+    parser.add_argument('--runs', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=0, help="torch intra-op threads")
+    parser.add_argument('--quantize', action='store_true')
+    parser.add_argument('--draft-layers', type=int, default=1, help="Decoder layers of the --tiny draft")
+    parser.add_argument('--tiny-dir', default=os.path.join(tempfile.gettempdir(), 'nmt_benchmark_tiny'))
+    args = parser.parse_args()
+    if args.model and not args.draft:
+        parser.error("--model needs --draft")
+
+    if args.corpus:
+        texts = file_corpus(args.corpus)
+    elif args.samanantar:
+        texts = samanantar_corpus(args.src, args.tgt, args.rows)
+    else:
+        texts = synthetic_corpus(args.synthetic, 3, 20, 0)
+    if args.limit:
+        texts = texts[:args.limit]
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    if args.tiny:
+        model_path = build_tiny_model(args.tiny_dir)
+        draft_path = build_tiny_draft(model_path, args.tiny_dir + '_draft', args.draft_layers)
+    else:
+        model_path, draft_path = args.model, args.draft
+    pair = f"{args.src}_{args.tgt}"
+    translator = UniversalTranslator(model_path, quantize=args.quantize, draft_models={pair: draft_path})
+    greedy = DECODING_PROFILES['fast']
+    speculative = DECODING_PROFILES['speculative']
+    # Warm up
+    translator.translate(texts[0], args.src, args.tgt, greedy)
+    translator.translate(texts[0], args.src, args.tgt, speculative)
+
+    greedy_outputs, greedy_results = run(translator, texts, args.src, args.tgt, greedy, args.runs)
+    before = draft_counts(pair)
+    speculative_outputs, speculative_results = run(translator, texts, args.src, args.tgt, speculative, args.runs)
+    after = draft_counts(pair)
+    proposed = after['proposed'] - before['proposed']
+    accepted = after['accepted'] - before['accepted']
+    matches = sum(a == b for a, b in zip(greedy_outputs, speculative_outputs))
+
+    draft = translator.drafts[pair]
+    print(f"\n===== {args.src.upper()} -> {args.tgt.upper()}, {len(texts)} sentences x {args.runs} =====")
+    print(f"Model {model_path}, draft {draft_path} "
+          f"({draft['model'].config.decoder_layers} decoder layers, "
+          f"{'shared' if draft['shares_encoder'] else 'own'} encoder)")
+    print(f"{'':20}{'greedy':>12}{'speculative':>12}{'speedup':>10}")
+    for metric in ['p50_ms', 'p99_ms', 'mean_ms']:
+        plain, fast = greedy_results[metric], speculative_results[metric]
+        print(f"{metric:20}{plain:>12}{fast:>12}{plain / fast if fast else 0.0:>9.2f}x")
+    print(f"{'acceptance_rate':20}{accepted / proposed if proposed else 0.0:>12.3f}  ({accepted}/{proposed} draft tokens)")
+    print(f"{'same_as_greedy':20}{matches:>12}  of {len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
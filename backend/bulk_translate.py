@@ -0,0 +1,279 @@
+# Translate a large TXT, CSV or JSONL file offline, without the API:
+#   python bulk_translate.py export.jsonl export_hi.jsonl --model results/marian_en_hi_finetuned --src en --tgt hi
+#   python bulk_translate.py notices.csv notices_kn.csv --model results/marian_en_kn_finetuned --tgt kn --field message
+#   python bulk_translate.py lines.txt lines_hi.txt --model results/marian_en_hi_finetuned --processes 4 --resume
+# The input is read a window of records at a time. Each window's records are
+# split into sentence chunks, sorted by length, batched and spread over the
+# worker processes, and its translations are written in input order. After
+# each window the output is synced and a checkpoint records how far it got,
+# so --resume continues a killed job from there. At most two windows are held
+# in memory, whatever the file size.
+import argparse
+import csv
+import itertools
+import json
+import os
+import resource
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+# Records read, translated and written together
+WINDOW_SIZE = 2048
+# Records per generate batch, and per task sent to a worker
+BATCH_SIZE = 32
+# Seconds between progress reports
+REPORT_SECONDS = 10.0
+# Formats by file extension
+FORMATS = {'.txt': 'txt', '.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+
+# The translator of this process and its job settings, set by init_worker
+_worker = {}
+
+
+# Format of a file from its extension
+def detect_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Unknown file type {extension!r}, use --format txt, csv or jsonl")
+    return FORMATS[extension]
+
+
+# (record, text) pairs of an input file, read lazily. A TXT record is a line,
+# CSV and JSONL records are rows whose field holds the text; a CSV without the
+# column or a row without the text is an error rather than a blank translation.
+def read_records(path, fmt, field='text'):
+    with open(path, encoding='utf-8', newline='' if fmt == 'csv' else None) as f:
+        if fmt == 'txt':
+            for line in f:
+                line = line.rstrip('\n')
+                yield line, line
+        elif fmt == 'csv':
+            reader = csv.DictReader(f)
+            if reader.fieldnames is not None and field not in reader.fieldnames:
+                raise ValueError(f"{path} has no {field!r} column, use --field with one of: {', '.join(reader.fieldnames)}")
+            for row in reader:
+                if row[field] is None:
+                    raise ValueError(f"{path}:{reader.line_num}: row has no {field!r} value")
+                yield row, row[field]
+        else:
+            for number, line in enumerate(f, 1):
+                if line.strip():
+                    row = json.loads(line)
+                    if not isinstance(row, dict) or not isinstance(row.get(field), str):
+                        raise ValueError(f"{path}:{number}: record has no string {field!r} field")
+                    yield row, row[field]
+
+
+# Writes translated records in the input's format
+class RecordWriter:
+    # Append to an open text file; the CSV header is written unless resuming
+    def __init__(self, file, fmt, output_field='translation', header=True):
+        self.file = file
+        self.fmt = fmt
+        self.output_field = output_field
+        self.header = header
+        self._csv = None
+
+    # Write one record with its translation
+    def write(self, record, translation):
+        if self.fmt == 'txt':
+            self.file.write(translation.replace('\n', ' ') + '\n')
+        elif self.fmt == 'csv':
+            if self._csv is None:
+                fieldnames = list(record) + ([self.output_field] if self.output_field not in record else [])
+                self._csv = csv.DictWriter(self.file, fieldnames=fieldnames)
+                if self.header:
+                    self._csv.writeheader()
+            self._csv.writerow(dict(record, **{self.output_field: translation}))
+        else:
+            self.file.write(json.dumps(dict(record, **{self.output_field: translation}), ensure_ascii=False) + '\n')
+
+    # Make everything written so far durable, returns the file size
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return os.fstat(self.file.fileno()).st_size
+
+
+# Load the translator in a worker process
+def init_worker(model_path, src_lang, tgt_lang, params, batch_size, quantize=False, num_threads=0):
+    from quantization import configure_threads
+    from translator import UniversalTranslator
+    configure_threads(num_threads)
+    _worker.update(
+        translator=UniversalTranslator(model_path, quantize=quantize), src_lang=src_lang, tgt_lang=tgt_lang,
+        params=params, batch_size=batch_size,
+    )
+
+
+# Translate a task's texts, sentence chunks of all of them batched together
+def translate_texts(texts):
+    return _worker['translator'].translate_documents(
+        texts, _worker['src_lang'], _worker['tgt_lang'], batch_size=_worker['batch_size'], params=_worker['params']
+    )
+
+
+# Run a function now, as a finished future, when there is no worker pool
+def run_now(fn, *args):
+    future = Future()
+    future.set_result(fn(*args))
+    return future
+
+
+# Indices of a window's non-empty texts, sorted by length and cut into tasks
+def length_sorted_tasks(texts, batch_size):
+    order = sorted((i for i, text in enumerate(texts) if text.strip()), key=lambda i: len(texts[i]))
+    return [order[start:start + batch_size] for start in range(0, len(order), batch_size)]
+
+
+# Load a checkpoint, checking it belongs to this job
+def load_checkpoint(path, job):
+    with open(path) as f:
+        state = json.load(f)
+    if state['job'] != job:
+        raise ValueError(f"{path} belongs to a different job, remove it or drop --resume")
+    return state['records'], state['output_bytes']
+
+
+# Save a checkpoint atomically
+def save_checkpoint(path, job, records, output_bytes):
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w') as f:
+        json.dump({'job': job, 'records': records, 'output_bytes': output_bytes, 'saved': time.time()}, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+# Translate a file into another in the same format, resuming from the
+# checkpoint beside the output when resume is set. Returns a summary.
+def bulk_translate(input_path, output_path, model_path, src_lang='en', tgt_lang='hi', fmt=None, field='text',
+                   output_field='translation', processes=1, num_threads=0, batch_size=BATCH_SIZE,
+                   window_size=WINDOW_SIZE, params=None, quantize=False, resume=False, report_seconds=REPORT_SECONDS):
+    fmt = fmt or detect_format(input_path)
+    checkpoint_path = output_path + '.checkpoint'
+    job = {
+        'input': os.path.abspath(input_path), 'input_size': os.path.getsize(input_path),
+        'model': os.path.abspath(model_path), 'src_lang': src_lang, 'tgt_lang': tgt_lang,
+        'format': fmt, 'field': field, 'output_field': output_field, 'params': params,
+    }
+    done, output_bytes = 0, 0
+    if resume and os.path.exists(checkpoint_path):
+        done, output_bytes = load_checkpoint(checkpoint_path, job)
+        if not os.path.exists(output_path) or os.path.getsize(output_path) < output_bytes:
+            # The output the checkpoint describes is gone or cut short, nothing of it is usable
+            print(f"{output_path} is missing or shorter than its checkpoint, starting over", file=sys.stderr)
+            done, output_bytes = 0, 0
+        else:
+            # Drop anything written after the checkpoint
+            with open(output_path, 'r+b') as f:
+                f.truncate(output_bytes)
+            print(f"Resuming after {done} records", file=sys.stderr)
+
+    settings = (model_path, src_lang, tgt_lang, params, batch_size, quantize, num_threads)
+    pool = None
+    if processes > 1:
+        pool = ProcessPoolExecutor(processes, initializer=init_worker, initargs=settings)
+        submit = pool.submit
+    else:
+        init_worker(*settings)
+        submit = run_now
+
+    records = itertools.islice(read_records(input_path, fmt, field), done, None)
+    start_time = time.time()
+    last_report = start_time
+    translated = 0
+    characters = 0
+    pending = deque()
+    with open(output_path, 'a' if output_bytes else 'w', encoding='utf-8', newline='') as f:
+        writer = RecordWriter(f, fmt, output_field, header=not output_bytes)
+
+        # Write the oldest window in input order and checkpoint it
+        def finish_window():
+            nonlocal done, output_bytes, translated, characters, last_report
+            window, tasks = pending.popleft()
+            translations = [''] * len(window)
+            for indices, future in tasks:
+                for i, translation in zip(indices, future.result()):
+                    translations[i] = translation
+            for (record, text), translation in zip(window, translations):
+                writer.write(record, translation)
+                characters += len(text)
+            output_bytes = writer.sync()
+            done += len(window)
+            translated += len(window)
+            save_checkpoint(checkpoint_path, job, done, output_bytes)
+            if time.time() - last_report >= report_seconds:
+                last_report = time.time()
+                elapsed = last_report - start_time
+                print(f"{done} records, {translated / elapsed:.1f} records/s, "
+                      f"{characters / elapsed:.0f} chars/s", file=sys.stderr)
+
+        try:
+            while True:
+                window = list(itertools.islice(records, window_size))
+                if not window:
+                    break
+                texts = [text for _, text in window]
+                tasks = [(indices, submit(translate_texts, [texts[i] for i in indices]))
+                         for indices in length_sorted_tasks(texts, batch_size)]
+                pending.append((window, tasks))
+                # The next window is queued before this one is waited on, so workers stay busy
+                if len(pending) > 1:
+                    finish_window()
+            while pending:
+                finish_window()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+    elapsed = time.time() - start_time
+    return {
+        'records': done,
+        'translated': translated,
+        'seconds': round(elapsed, 2),
+        'records_per_second': round(translated / elapsed, 2) if elapsed else 0.0,
+        'chars_per_second': round(characters / elapsed, 1) if elapsed else 0.0,
+        'peak_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    from translator import DECODING_PROFILES
+
+    parser = argparse.ArgumentParser(description="Translate a TXT, CSV or JSONL file with a checkpoint to resume from")
+    parser.add_argument('input')
+    parser.add_argument('output')
+    parser.add_argument('--model', required=True, help="Checkpoint directory, e.g. results/marian_en_hi_finetuned")
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--format', choices=sorted(set(FORMATS.values())), help="Defaults to the input's extension")
+    parser.add_argument('--field', default='text', help="CSV column or JSONL field to translate")
+    parser.add_argument('--output-field', default='translation', help="CSV column or JSONL field for the translation")
+    parser.add_argument('--profile', default='quality', choices=list(DECODING_PROFILES))
+    parser.add_argument('--processes', type=int, default=1, help="Worker processes, each loads the model")
+    parser.add_argument('--threads', type=int, default=0, help="Torch threads per process")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--window', type=int, default=WINDOW_SIZE, help="Records held and length-sorted together")
+    parser.add_argument('--quantize', action='store_true')
+    parser.add_argument('--resume', action='store_true', help="Continue from the checkpoint beside the output")
+    parser.add_argument('--report-seconds', type=float, default=REPORT_SECONDS)
+    args = parser.parse_args()
+
+    try:
+        summary = bulk_translate(
+            args.input, args.output, args.model, args.src, args.tgt, args.format, args.field, args.output_field,
+            args.processes, args.threads, args.batch_size, args.window, DECODING_PROFILES[args.profile],
+            args.quantize, args.resume, args.report_seconds,
+        )
+    except ValueError as e:
+        raise SystemExit(str(e))
+    print(f"\n===== {args.input} -> {args.output} =====")
+    for key, value in summary.items():
+        print(f"{key:22}{value:>12}")
+
+
+if __name__ == "__main__":
+    main()
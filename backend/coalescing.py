@@ -0,0 +1,54 @@
+# Import Libraries
+import threading
+from concurrent.futures import Future
+
+
+# Single-flight table of in-progress translations keyed by result cache key.
+# The first request for a key computes it; identical requests arriving before
+# it finishes wait on the same future instead of running their own generate.
+class SingleFlight:
+    # Initialize the table
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+        # Counters
+        self.leaders = 0
+        self.coalesced = 0
+
+    # Claim keys: returns the futures this caller must resolve with finish(),
+    # one per distinct key not in flight, and the futures of the keys that
+    # are, for every key given (duplicates share one future)
+    def begin(self, keys):
+        owned = {}
+        futures = {}
+        with self._lock:
+            for key in keys:
+                if key in futures:
+                    self.coalesced += 1
+                    continue
+                future = self._calls.get(key)
+                if future is None:
+                    future = self._calls[key] = owned[key] = Future()
+                    self.leaders += 1
+                else:
+                    self.coalesced += 1
+                futures[key] = future
+        return owned, futures
+
+    # Resolve an owned key with its result or error, waking its waiters
+    def finish(self, key, result=None, error=None):
+        with self._lock:
+            future = self._calls.pop(key)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    # Get in-flight and sharing counters
+    def stats(self):
+        with self._lock:
+            return {
+                'in_flight': len(self._calls),
+                'leaders': self.leaders,
+                'coalesced': self.coalesced,
+            }
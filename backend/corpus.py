@@ -0,0 +1,171 @@
+# Streaming samanantar preparation for fine-tuning, cached on disk as Arrow:
+#   python corpus.py Helsinki-NLP/opus-mt-en-hi --src en --tgt hi --num-proc 4
+# Pairs are streamed and filtered lazily into an Arrow file, tokenized with a
+# multiprocessing map into another, and both are memory-mapped on reuse, so
+# memory use does not grow with the corpus.
+import argparse
+import hashlib
+import os
+import tempfile
+import time
+from datasets import Dataset, load_dataset, load_from_disk
+from datasets.fingerprint import Hasher
+
+# Where prepared corpora are kept
+CACHE_DIR = os.environ.get('NMT_DATA_CACHE', 'data_cache')
+# Tail of the corpus held out for validation, as in the notebook
+VALIDATION_FRACTION = 0.1
+# Token limit for sources and targets
+MAX_LENGTH = 128
+
+
+# Valid (english, target) pairs for a language, read lazily from samanantar
+# or from a tab-separated file
+def iter_pairs(language, rows=None, data_path=None):
+    if data_path:
+        with open(data_path, encoding='utf-8') as f:
+            examples = ({'src': parts[0], 'tgt': parts[1]}
+                        for parts in (line.rstrip('\n').split('\t') for line in f) if len(parts) >= 2)
+            yield from _filter_pairs(examples, rows)
+    else:
+        yield from _filter_pairs(load_dataset("ai4bharat/samanantar", language, split='train', streaming=True), rows)
+
+
+# Keep pairs with text on both sides among the first rows
+def _filter_pairs(examples, rows):
+    for i, example in enumerate(examples):
+        if rows and i >= rows:
+            break
+        if example['src'] and example['tgt'] and example['src'].strip() and example['tgt'].strip():
+            yield {'english': example['src'].strip(), 'target': example['tgt'].strip()}
+
+
+# Directory for one prepared corpus
+def corpus_dir(language, rows=None, data_path=None, cache_dir=CACHE_DIR):
+    source = 'samanantar'
+    if data_path:
+        # A changed file gets a new corpus
+        stat = os.stat(data_path)
+        key = f"{os.path.abspath(data_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+        source = hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{language}-{source}-{rows or 'all'}")
+
+
+# Filtered pairs of a language as an Arrow dataset on disk, written in batches
+# while streaming. Both directions of a pair read the same corpus.
+def load_pairs(language, rows=None, data_path=None, cache_dir=CACHE_DIR):
+    path = os.path.join(corpus_dir(language, rows, data_path, cache_dir), 'pairs')
+    if os.path.exists(path):
+        return load_from_disk(path)
+    os.makedirs(cache_dir, exist_ok=True)
+    # The generator's own cache is only a staging copy
+    with tempfile.TemporaryDirectory(dir=cache_dir) as staging_dir:
+        pairs = Dataset.from_generator(
+            iter_pairs, gen_kwargs={'language': language, 'rows': rows, 'data_path': data_path},
+            cache_dir=staging_dir,
+        )
+        pairs.save_to_disk(path)
+    return load_from_disk(path)
+
+
+# Split into train and validation: the last VALIDATION_FRACTION is validation,
+# like the notebook. Contiguous selections do not copy data.
+def split_pairs(dataset, validation_fraction=VALIDATION_FRACTION):
+    split_idx = int((1 - validation_fraction) * len(dataset))
+    return dataset.select(range(split_idx)), dataset.select(range(split_idx, len(dataset)))
+
+
+# Check whether a tokenizer encodes sources and targets the same way, in
+# which case one tokenized corpus serves both directions of a pair
+def is_symmetric(tokenizer):
+    if getattr(tokenizer, 'separate_vocabs', False):
+        return False
+    if hasattr(tokenizer, 'spm_source') and hasattr(tokenizer, 'spm_target'):
+        return tokenizer.spm_source.serialized_model_proto() == tokenizer.spm_target.serialized_model_proto()
+    return True
+
+
+# Tokenize both sides of a corpus with a multiprocessing map. The english and
+# target columns become english_ids and target_ids (with eos, no task prefix).
+# With a symmetric tokenizer the result is shared by both directions;
+# otherwise each side is tokenized in the mode of the given direction.
+def tokenize_pairs(pairs, tokenizer, src_lang, tgt_lang, num_proc=None, max_length=MAX_LENGTH, cache_path=None):
+    symmetric = is_symmetric(tokenizer)
+    english_is_source = src_lang == 'en'
+
+    def tokenize(batch):
+        def encode(texts, as_target):
+            if as_target and not symmetric:
+                return tokenizer(text_target=texts, max_length=max_length, truncation=True)['input_ids']
+            return tokenizer(texts, max_length=max_length, truncation=True)['input_ids']
+        return {
+            'english_ids': encode(batch['english'], not english_is_source),
+            'target_ids': encode(batch['target'], english_is_source),
+        }
+
+    cache_file = None
+    if cache_path:
+        mode = 'shared' if symmetric else f"{src_lang}_{tgt_lang}"
+        cache_file = os.path.join(cache_path, f"tokens-{Hasher.hash(tokenizer)}-{mode}-{max_length}.arrow")
+    return pairs.map(
+        tokenize, batched=True, num_proc=num_proc, remove_columns=pairs.column_names,
+        cache_file_name=cache_file, desc="Tokenizing",
+    )
+
+
+# Model inputs for one direction of a tokenized corpus. Without a task prefix
+# this is a column rename; a prefix (T5) is encoded once and prepended.
+def direction_dataset(tokenized, tokenizer, src_lang, tgt_lang, prefix='', max_length=MAX_LENGTH, num_proc=None):
+    source, target = ('english_ids', 'target_ids') if src_lang == 'en' else ('target_ids', 'english_ids')
+    dataset = tokenized.rename_columns({source: 'input_ids', target: 'labels'})
+    if not prefix:
+        return dataset
+    prefix_ids = tokenizer(prefix, add_special_tokens=False)['input_ids']
+
+    def add_prefix(batch):
+        # Keep the closing eos when the prefix pushes a source over the limit
+        return {'input_ids': [
+            (prefix_ids + ids[:-1])[:max_length - 1] + ids[-1:] for ids in batch['input_ids']
+        ]}
+    return dataset.map(add_prefix, batched=True, num_proc=num_proc, desc="Adding task prefix")
+
+
+# Train and validation datasets for fine-tuning one direction, built from the
+# shared corpus of the pair's language
+def prepare_translation_data(tokenizer, src_lang='en', tgt_lang='hi', rows=None, data_path=None, prefix='',
+                             num_proc=None, max_length=MAX_LENGTH, cache_dir=CACHE_DIR):
+    language = tgt_lang if src_lang == 'en' else src_lang
+    pairs = load_pairs(language, rows, data_path, cache_dir)
+    tokenized = tokenize_pairs(
+        pairs, tokenizer, src_lang, tgt_lang, num_proc, max_length, corpus_dir(language, rows, data_path, cache_dir)
+    )
+    dataset = direction_dataset(tokenized, tokenizer, src_lang, tgt_lang, prefix, max_length, num_proc)
+    return split_pairs(dataset)
+
+
+def main():
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description="Prepare and cache a tokenized samanantar corpus for fine-tuning")
+    parser.add_argument('tokenizer', help="Model name or checkpoint whose tokenizer to use")
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--rows', type=int, default=0, help="Rows read, 0 for the full corpus")
+    parser.add_argument('--data', help="Tab-separated english/target file instead of samanantar")
+    parser.add_argument('--prefix', default='', help="Task prefix for T5, e.g. 'translate English to Hindi:'")
+    parser.add_argument('--num-proc', type=int, default=os.cpu_count())
+    parser.add_argument('--cache-dir', default=CACHE_DIR)
+    args = parser.parse_args()
+
+    start_time = time.time()
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    train_dataset, val_dataset = prepare_translation_data(
+        tokenizer, args.src, args.tgt, args.rows or None, args.data, args.prefix, args.num_proc,
+        cache_dir=args.cache_dir,
+    )
+    print(f"{args.src} -> {args.tgt}: {len(train_dataset)} train, {len(val_dataset)} validation pairs "
+          f"in {time.time() - start_time:.1f}s, cached under {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
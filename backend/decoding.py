@@ -0,0 +1,90 @@
+# Import Libraries
+import math
+import threading
+import unicodedata
+from contextlib import contextmanager
+import torch
+from transformers import LogitsProcessor
+
+# Output length budget when a pair has no measured length ratio
+DEFAULT_LENGTH_RATIO = 2.5
+# Extra tokens on top of the scaled source length, covers EOS and very short inputs
+LENGTH_OFFSET = 10
+# Longest repeating unit (in tokens) the repetition guard looks for
+MAX_REPEAT_PERIOD = 4
+
+
+# Output length budget scaled from the source length, never above max_length
+def length_budget(source_length, length_ratio, max_length):
+    return min(max_length, math.ceil(source_length * length_ratio) + LENGTH_OFFSET)
+
+
+# Token ids made only of punctuation, symbols, digits or the word boundary
+# marker, whose runs ("......", "9 9 9 9") are legitimate output the
+# repetition guard leaves alone
+def exempt_token_ids(tokenizer):
+    ids = []
+    for piece, token_id in tokenizer.get_vocab().items():
+        text = piece.replace('\u2581', '')
+        if all(unicodedata.category(char)[0] in 'PSN' for char in text):
+            ids.append(token_id)
+    return torch.tensor(sorted(ids), dtype=torch.long)
+
+
+# Force EOS on sequences stuck in a loop, so degenerate beams finish early.
+# A sequence is stuck when its last 1..MAX_REPEAT_PERIOD tokens repeat
+# min_repeats times in a row at the end of the output, unless the repeated
+# unit is all exempt tokens.
+class RepetitionGuard(LogitsProcessor):
+    def __init__(self, eos_token_id, min_repeats=8, exempt_ids=None):
+        self.eos_token_id = eos_token_id[0] if isinstance(eos_token_id, list) else eos_token_id
+        self.min_repeats = min_repeats
+        self.exempt_ids = exempt_ids
+
+    # Rows whose output ends in a repeated unit
+    def degenerate_rows(self, input_ids):
+        rows, length = input_ids.shape
+        stuck = torch.zeros(rows, dtype=torch.bool, device=input_ids.device)
+        for period in range(1, MAX_REPEAT_PERIOD + 1):
+            span = period * self.min_repeats
+            # Skip the decoder start token
+            if span > length - 1:
+                break
+            tail = input_ids[:, -span:].view(rows, self.min_repeats, period)
+            repeating = (tail == tail[:, -1:, :]).all(dim=2).all(dim=1)
+            if self.exempt_ids is not None:
+                exempt = self.exempt_ids.to(input_ids.device)
+                repeating &= ~torch.isin(tail[:, -1, :], exempt).all(dim=1)
+            stuck |= repeating
+        return stuck
+
+    def __call__(self, input_ids, scores):
+        stuck = self.degenerate_rows(input_ids)
+        if stuck.any():
+            scores[stuck] = float('-inf')
+            scores[stuck, self.eos_token_id] = 0.0
+        return scores
+
+
+# Count a module's forward calls made by the current thread inside count(),
+# e.g. the verification passes of one speculative generate while other
+# requests use the same model
+class ForwardCounter:
+    def __init__(self, module):
+        self._local = threading.local()
+        module.register_forward_hook(self._hook)
+
+    def _hook(self, module, args, output):
+        counts = getattr(self._local, 'counts', None)
+        if counts is not None:
+            counts[0] += 1
+
+    # Yields a one-item list holding the count so far
+    @contextmanager
+    def count(self):
+        previous = getattr(self._local, 'counts', None)
+        counts = self._local.counts = [0]
+        try:
+            yield counts
+        finally:
+            self._local.counts = previous
@@ -0,0 +1,166 @@
+# Import Libraries
+import os
+import torch
+from transformers import AutoConfig, GenerationConfig
+from transformers.generation import GenerationMixin
+from transformers.modeling_outputs import BaseModelOutput, Seq2SeqLMOutput
+
+# Inference engines UniversalTranslator can run on
+ENGINES = ['eager', 'torchscript']
+# File holding the traced encoder/decoder graphs inside the exported directory
+TORCHSCRIPT_FILE = "model_torchscript.pt"
+
+
+# Directory of the exported graphs, next to the fine-tuned checkpoint
+def exported_path(model_path):
+    return os.path.normpath(model_path) + "_torchscript"
+
+
+# Check whether exported graphs exist for a model
+def has_exported(model_path):
+    return os.path.exists(os.path.join(exported_path(model_path), TORCHSCRIPT_FILE))
+
+
+# Encoder and decoder steps of a seq2seq model as traceable methods.
+# The decoder cache is kept as two stacked tensors, self-attention keys/values
+# (grow each step) and cross-attention keys/values (computed once), so the
+# traced graphs only take and return plain tensors.
+class _TraceableSeq2Seq(torch.nn.Module):
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+        self.num_layers = model.config.decoder_layers if hasattr(model.config, 'decoder_layers') else model.config.num_decoder_layers
+
+    # Encode the source tokens
+    def encode(self, input_ids, attention_mask):
+        return self.model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask, return_dict=False)[0]
+
+    # Run one decoder step and stack the returned cache
+    def _decode(self, decoder_input_ids, encoder_hidden_states, attention_mask, past_key_values):
+        logits, present = self.model(
+            encoder_outputs=(encoder_hidden_states,),
+            attention_mask=attention_mask,
+            decoder_input_ids=decoder_input_ids,
+            past_key_values=past_key_values,
+            use_cache=True,
+            return_dict=False,
+        )[:2]
+        self_cache = torch.stack([state for layer in present for state in layer[:2]])
+        cross_cache = torch.stack([state for layer in present for state in layer[2:]])
+        return logits, self_cache, cross_cache
+
+    # First decoder step, without a cache
+    def decode_init(self, decoder_input_ids, encoder_hidden_states, attention_mask):
+        return self._decode(decoder_input_ids, encoder_hidden_states, attention_mask, None)
+
+    # Later decoder steps, reusing the stacked cache
+    def decode_step(self, decoder_input_ids, encoder_hidden_states, attention_mask, self_cache, cross_cache):
+        past_key_values = tuple(
+            (self_cache[2 * i], self_cache[2 * i + 1], cross_cache[2 * i], cross_cache[2 * i + 1])
+            for i in range(self.num_layers)
+        )
+        logits, self_cache, _ = self._decode(decoder_input_ids, encoder_hidden_states, attention_mask, past_key_values)
+        return logits, self_cache
+
+
+# Trace a model's encoder and decoder steps and save them with the tokenizer
+def export_torchscript(model, tokenizer, model_path):
+    model = model.to('cpu').eval()
+    module = _TraceableSeq2Seq(model).eval()
+    # Example inputs: padded batch of two, decoder at one token per step
+    inputs = tokenizer(["Hello world", "How are you today?"], return_tensors="pt", padding=True)
+    start_ids = torch.full((2, 1), model.config.decoder_start_token_id, dtype=torch.long)
+
+    with torch.no_grad():
+        hidden = module.encode(inputs['input_ids'], inputs['attention_mask'])
+        logits, self_cache, cross_cache = module.decode_init(start_ids, hidden, inputs['attention_mask'])
+        next_ids = logits[:, -1:].argmax(-1)
+        traced = torch.jit.trace_module(module, {
+            'encode': (inputs['input_ids'], inputs['attention_mask']),
+            'decode_init': (start_ids, hidden, inputs['attention_mask']),
+            'decode_step': (next_ids, hidden, inputs['attention_mask'], self_cache, cross_cache),
+        })
+
+    output_dir = exported_path(model_path)
+    os.makedirs(output_dir, exist_ok=True)
+    torch.jit.save(traced, os.path.join(output_dir, TORCHSCRIPT_FILE))
+    model.config.save_pretrained(output_dir)
+    model.generation_config.save_pretrained(output_dir)
+    tokenizer.save_pretrained(output_dir)
+    return output_dir
+
+
+# Encoder adapter: generate calls get_encoder()(input_ids=..., attention_mask=..., return_dict=True)
+class _TorchScriptEncoder:
+    main_input_name = "input_ids"
+
+    def __init__(self, graphs):
+        self.graphs = graphs
+
+    def forward(self, input_ids, attention_mask, return_dict=True):
+        return BaseModelOutput(last_hidden_state=self.graphs.encode(input_ids, attention_mask))
+
+    __call__ = forward
+
+
+# Seq2seq model backed by exported graphs, driven by transformers' generate
+class TorchScriptSeq2SeqModel(GenerationMixin):
+    main_input_name = "input_ids"
+    base_model_prefix = "graphs"
+    _supports_cache_class = False
+
+    # Initialize from an exported directory
+    def __init__(self, export_dir):
+        self.graphs = torch.jit.load(os.path.join(export_dir, TORCHSCRIPT_FILE), map_location='cpu')
+        self.graphs.eval()
+        self.config = AutoConfig.from_pretrained(export_dir)
+        self.generation_config = GenerationConfig.from_pretrained(export_dir)
+        self.device = torch.device('cpu')
+        self.encoder = _TorchScriptEncoder(self.graphs)
+
+    @classmethod
+    def can_generate(cls):
+        return True
+
+    def get_encoder(self):
+        return self.encoder
+
+    # Graphs are traced for CPU inference
+    def to(self, device):
+        return self
+
+    def eval(self):
+        return self
+
+    def state_dict(self):
+        return self.graphs.state_dict()
+
+    # Keep only the newest decoder token once the cache is filled
+    def prepare_inputs_for_generation(self, decoder_input_ids, past_key_values=None, attention_mask=None,
+                                      encoder_outputs=None, **kwargs):
+        if past_key_values is not None:
+            decoder_input_ids = decoder_input_ids[:, -1:]
+        return {
+            "decoder_input_ids": decoder_input_ids,
+            "encoder_outputs": encoder_outputs,
+            "attention_mask": attention_mask,
+            "past_key_values": past_key_values,
+        }
+
+    # Run one decoder step
+    def forward(self, decoder_input_ids, encoder_outputs, attention_mask, past_key_values=None, **kwargs):
+        hidden = encoder_outputs.last_hidden_state
+        if past_key_values is None:
+            logits, self_cache, cross_cache = self.graphs.decode_init(decoder_input_ids, hidden, attention_mask)
+        else:
+            self_cache, cross_cache = past_key_values
+            logits, self_cache = self.graphs.decode_step(decoder_input_ids, hidden, attention_mask, self_cache, cross_cache)
+        return Seq2SeqLMOutput(logits=logits, past_key_values=(self_cache, cross_cache))
+
+    __call__ = forward
+
+    # Follow the beams selected at each step; cross-attention states never change
+    @staticmethod
+    def _reorder_cache(past_key_values, beam_idx):
+        self_cache, cross_cache = past_key_values
+        return (self_cache.index_select(1, beam_idx), cross_cache)
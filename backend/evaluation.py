@@ -0,0 +1,272 @@
+# Offline evaluation of a checkpoint: translates a validation set in batches
+# and scores it with corpus BLEU, chrF and METEOR, scoring in a process pool
+# while the next chunk translates:
+#   python evaluation.py results/marian_en_hi_finetuned --src en --tgt hi --samanantar --output eval_en_hi.jsonl
+import argparse
+import itertools
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from fractions import Fraction
+import nltk
+from nltk.translate.bleu_score import (
+    sentence_bleu,
+    modified_precision,
+    closest_ref_length,
+    brevity_penalty,
+    SmoothingFunction,
+)
+from nltk.translate.chrf_score import sentence_chrf
+from nltk.translate.meteor_score import meteor_score
+
+# Metrics computed by default
+METRICS = ['bleu', 'chrf', 'meteor']
+# BLEU n-gram order, uniformly weighted
+BLEU_ORDER = 4
+# Sentences translated per chunk; each chunk is scored while the next translates
+CHUNK_SIZE = 512
+# nltk data METEOR needs
+METEOR_CORPORA = ['wordnet', 'omw-1.4']
+
+_smoothing = SmoothingFunction().method1
+
+
+# Lowercased word tokens. Each text is one sentence, so skip nltk's sentence
+# splitting, which also needs the punkt models.
+def tokenize(text):
+    return nltk.word_tokenize(text.lower(), preserve_line=True)
+
+
+# Sentence scores as the notebook computed them, one pair at a time
+class TranslationEvaluator:
+    def __init__(self):
+        self.smoothing = _smoothing
+    # Calculate BLEU
+    def calculate_bleu(self, reference, candidate):
+        if not reference.strip() or not candidate.strip():
+            return 0.0
+        return round(sentence_bleu([tokenize(reference)], tokenize(candidate), smoothing_function=self.smoothing) * 100, 2)
+    # Calculate METEOR
+    def calculate_meteor(self, reference, candidate):
+        if not reference.strip() or not candidate.strip():
+            return 0.0
+        return round(meteor_score([tokenize(reference)], tokenize(candidate)) * 100, 2)
+
+
+# Load source/reference pairs from a tab-separated file, lazily
+def load_cases(data_path):
+    with open(data_path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) >= 2 and parts[0].strip():
+                yield {'source': parts[0].strip(), 'reference': parts[1].strip()}
+
+
+# Held-out samanantar pairs for a translation direction
+def samanantar_cases(src_lang, tgt_lang, rows=5000):
+    from measure_length_ratios import load_validation_pairs
+    for pair in load_validation_pairs(tgt_lang if src_lang == 'en' else src_lang, rows):
+        if src_lang == 'en':
+            yield {'source': pair['english'], 'reference': pair['target']}
+        else:
+            yield {'source': pair['target'], 'reference': pair['english']}
+
+
+# Score a slice of the corpus: sentence scores plus the BLEU statistics that add
+# up to the corpus score. Runs in a worker process; each text is tokenized once.
+def score_chunk(references, candidates, metrics=METRICS):
+    rows = []
+    stats = {'numerators': [0] * BLEU_ORDER, 'denominators': [0] * BLEU_ORDER, 'hyp_length': 0, 'ref_length': 0}
+    for reference, candidate in zip(references, candidates):
+        ref_tokens = tokenize(reference)
+        cand_tokens = tokenize(candidate)
+        scorable = bool(ref_tokens and cand_tokens)
+        row = {}
+        if 'bleu' in metrics:
+            for n in range(1, BLEU_ORDER + 1):
+                precision = modified_precision([ref_tokens], cand_tokens, n)
+                stats['numerators'][n - 1] += precision.numerator
+                stats['denominators'][n - 1] += precision.denominator
+            stats['hyp_length'] += len(cand_tokens)
+            stats['ref_length'] += closest_ref_length([ref_tokens], len(cand_tokens))
+            row['bleu'] = round(sentence_bleu([ref_tokens], cand_tokens, smoothing_function=_smoothing) * 100, 2) if scorable else 0.0
+        if 'chrf' in metrics:
+            row['chrf'] = round(sentence_chrf(reference, candidate) * 100, 2) if scorable else 0.0
+        if 'meteor' in metrics:
+            row['meteor'] = round(meteor_score([ref_tokens], cand_tokens) * 100, 2) if scorable else 0.0
+        rows.append(row)
+    return rows, stats
+
+
+# Corpus BLEU from summed statistics, as nltk's corpus_bleu computes it
+def corpus_bleu_from_stats(stats):
+    if stats['numerators'][0] == 0:
+        return 0.0
+    precisions = _smoothing([
+        Fraction(numerator, denominator, _normalize=False)
+        for numerator, denominator in zip(stats['numerators'], stats['denominators'])
+    ])
+    penalty = brevity_penalty(stats['ref_length'], stats['hyp_length'])
+    weight = 1 / BLEU_ORDER
+    return round(penalty * math.exp(math.fsum(weight * math.log(p) for p in precisions if p > 0)) * 100, 2)
+
+
+# Per-sentence results written as they are scored, to JSONL or Parquet
+class ResultWriter:
+    # Open the output file, the format follows the extension
+    def __init__(self, path):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self._writer = None
+        self._file = None if self.parquet else open(path, 'w', encoding='utf-8')
+
+    # Append rows
+    def write(self, rows):
+        if not self.parquet:
+            for row in rows:
+                self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+            self._file.flush()
+            return
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pylist(rows)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table.cast(self._writer.schema))
+
+    # Finish the file
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+# Translate and score a stream of {'source', 'reference'} cases. Chunks are
+# translated with batched generation and split across the process pool for
+# scoring; results come back in input order and go to the writer as they do.
+def evaluate(translator, cases, src_lang, tgt_lang, metrics=METRICS, batch_size=32, chunk_size=CHUNK_SIZE,
+             processes=None, output=None, params=None):
+    start_time = time.time()
+    writer = ResultWriter(output) if output else None
+    totals = {metric: 0.0 for metric in metrics}
+    bleu_stats = {'numerators': [0] * BLEU_ORDER, 'denominators': [0] * BLEU_ORDER, 'hyp_length': 0, 'ref_length': 0}
+    count = 0
+    pending = []
+    cases = iter(cases)
+
+    workers = processes or os.cpu_count() or 1
+    with ProcessPoolExecutor(workers) as pool:
+        part_size = max(1, math.ceil(chunk_size / workers))
+
+        # Collect finished parts in order; block while too many are queued
+        def collect(block=False):
+            nonlocal count
+            while pending and (block or pending[0][2].done() or len(pending) > 2 * workers):
+                chunk, translations, future = pending.pop(0)
+                rows, stats = future.result()
+                for key in ['numerators', 'denominators']:
+                    bleu_stats[key] = [a + b for a, b in zip(bleu_stats[key], stats[key])]
+                bleu_stats['hyp_length'] += stats['hyp_length']
+                bleu_stats['ref_length'] += stats['ref_length']
+                for row in rows:
+                    for metric in metrics:
+                        totals[metric] += row[metric]
+                if writer:
+                    writer.write([
+                        dict(source=case['source'], reference=case['reference'], prediction=translation, **row)
+                        for case, translation, row in zip(chunk, translations, rows)
+                    ])
+                count += len(rows)
+
+        while True:
+            chunk = list(itertools.islice(cases, chunk_size))
+            if not chunk:
+                break
+            translations = translator.translate_batch(
+                [case['source'] for case in chunk], src_lang, tgt_lang, batch_size=batch_size, params=params
+            )
+            for start in range(0, len(chunk), part_size):
+                part = chunk[start:start + part_size]
+                future = pool.submit(
+                    score_chunk, [case['reference'] for case in part], translations[start:start + part_size], metrics
+                )
+                pending.append((part, translations[start:start + part_size], future))
+            collect()
+        collect(block=True)
+
+    if writer:
+        writer.close()
+    elapsed = time.time() - start_time
+    summary = {'pair': f"{src_lang}_{tgt_lang}", 'sentences': count}
+    for metric in metrics:
+        if metric == 'bleu':
+            summary['bleu'] = corpus_bleu_from_stats(bleu_stats)
+        else:
+            # chrF averaged over sentences is nltk's corpus_chrf; METEOR has no corpus form
+            summary[metric] = round(totals[metric] / count, 2) if count else 0.0
+    summary['seconds'] = round(elapsed, 2)
+    summary['sentences_per_second'] = round(count / elapsed, 2) if elapsed else 0.0
+    return summary
+
+
+def main():
+    from translator import UniversalTranslator, DECODING_PROFILES, TEST_CASES
+
+    parser = argparse.ArgumentParser(description="Corpus BLEU, chrF and METEOR of a checkpoint on a validation set")
+    parser.add_argument('model_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    data_group = parser.add_mutually_exclusive_group()
+    data_group.add_argument('--data', help="Tab-separated source/reference file")
+    data_group.add_argument('--samanantar', action='store_true', help="Held-out samanantar split, as in the notebook")
+    parser.add_argument('--rows', type=int, default=5000, help="Samanantar rows read")
+    parser.add_argument('--limit', type=int, default=0, help="Evaluate only the first N sentences")
+    parser.add_argument('--metrics', default=','.join(METRICS), help="Comma-separated subset of bleu,chrf,meteor")
+    parser.add_argument('--profile', default='quality', choices=list(DECODING_PROFILES))
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    parser.add_argument('--processes', type=int, default=None, help="Scoring processes, defaults to the CPU count")
+    parser.add_argument('--quantize', action='store_true')
+    parser.add_argument('--output', help="Per-sentence results, .jsonl or .parquet")
+    parser.add_argument('--summary', help="Write the corpus scores as JSON here")
+    args = parser.parse_args()
+
+    metrics = [metric.strip() for metric in args.metrics.split(',') if metric.strip()]
+    unknown = set(metrics) - set(METRICS)
+    if unknown:
+        raise SystemExit(f"Unknown metrics: {', '.join(sorted(unknown))}")
+    if 'meteor' in metrics:
+        for corpus in METEOR_CORPORA:
+            nltk.download(corpus, quiet=True)
+
+    if args.data:
+        cases = load_cases(args.data)
+    elif args.samanantar:
+        cases = samanantar_cases(args.src, args.tgt, args.rows)
+    else:
+        cases = TEST_CASES.get(f"{args.src}_{args.tgt}", [])
+    if args.limit:
+        cases = itertools.islice(cases, args.limit)
+
+    translator = UniversalTranslator(args.model_path, quantize=args.quantize)
+    summary = evaluate(
+        translator, cases, args.src, args.tgt, metrics, args.batch_size, args.chunk_size,
+        args.processes, args.output, DECODING_PROFILES[args.profile],
+    )
+
+    print(f"\n===== {args.src.upper()} -> {args.tgt.upper()}: {summary['sentences']} sentences =====")
+    for key, value in summary.items():
+        if key not in ('pair', 'sentences'):
+            print(f"{key:22}{value:>10}")
+    if args.output:
+        print(f"\nPer-sentence results in {args.output}")
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# Export a fine-tuned checkpoint to TorchScript graphs and check them against eager generate:
+#   python export_model.py results/marian_en_hi_finetuned --src en --tgt hi
+import argparse
+import time
+from translator import UniversalTranslator, TEST_CASES
+from engines import export_torchscript
+
+# Extra sentences so the check also covers longer inputs and padded batches
+CHECK_SENTENCES = [
+    "This is a longer sentence that checks the decoder cache over many steps.",
+    "Where is the bathroom?",
+    "I would like to request your assistance with this matter.",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export encoder/decoder graphs for the torchscript engine")
+    parser.add_argument('model_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--skip-check', action='store_true', help="Do not compare outputs with the eager engine")
+    args = parser.parse_args()
+
+    eager = UniversalTranslator(args.model_path)
+    start_time = time.time()
+    output_dir = export_torchscript(eager.model, eager.tokenizer, args.model_path)
+    print(f"Exported {args.model_path} to {output_dir} in {time.time() - start_time:.1f}s")
+    if args.skip_check:
+        return
+
+    start_time = time.time()
+    exported = UniversalTranslator(args.model_path, engine='torchscript')
+    print(f"Loaded exported graphs in {time.time() - start_time:.2f}s")
+
+    texts = [case['source'] for case in TEST_CASES.get(f"{args.src}_{args.tgt}", [])] + CHECK_SENTENCES
+    timings = {}
+    outputs = {}
+    for name, translator in [('eager', eager), ('torchscript', exported)]:
+        start_time = time.time()
+        outputs[name] = [translator.translate(text, args.src, args.tgt) for text in texts]
+        outputs[name + '_batch'] = translator.translate_batch(texts, args.src, args.tgt)
+        timings[name] = time.time() - start_time
+
+    mismatches = [
+        (text, a, b) for text, a, b in zip(texts, outputs['eager'], outputs['torchscript']) if a != b
+    ]
+    if outputs['eager_batch'] != outputs['torchscript_batch']:
+        mismatches.append(('<batch>', outputs['eager_batch'], outputs['torchscript_batch']))
+    print(f"eager {timings['eager']:.2f}s, torchscript {timings['torchscript']:.2f}s on {len(texts)} sentences")
+    for text, a, b in mismatches:
+        print(f"MISMATCH {text!r}:\n  eager:       {a!r}\n  torchscript: {b!r}")
+    if mismatches:
+        raise SystemExit(f"{len(mismatches)} outputs differ from the eager engine")
+    print("All outputs match the eager engine")
+
+
+if __name__ == "__main__":
+    main()
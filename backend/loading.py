@@ -0,0 +1,98 @@
+# Import Libraries
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import weakref
+import torch
+from transformers import GenerationConfig
+from transformers.modeling_utils import no_init_weights
+
+# Checkpoint file loaded zero-copy
+SAFETENSORS_FILE = "model.safetensors"
+# Files that define a tokenizer, tokenizers with identical files are shared
+TOKENIZER_FILES = ["source.spm", "target.spm", "vocab.json", "spiece.model", "tokenizer.json",
+                   "tokenizer_config.json", "special_tokens_map.json"]
+# safetensors dtype names
+SAFETENSORS_DTYPES = {
+    'F64': torch.float64, 'F32': torch.float32, 'F16': torch.float16, 'BF16': torch.bfloat16,
+    'I64': torch.int64, 'I32': torch.int32, 'I16': torch.int16, 'I8': torch.int8,
+    'U8': torch.uint8, 'BOOL': torch.bool,
+}
+
+# Tokenizers in use, keyed by class and tokenizer file contents; one is dropped
+# once no translator holds it
+_tokenizers = weakref.WeakValueDictionary()
+_tokenizer_lock = threading.Lock()
+
+
+# Check whether a checkpoint has safetensors weights
+def has_safetensors(model_path):
+    return os.path.exists(os.path.join(model_path, SAFETENSORS_FILE))
+
+
+# Map a safetensors file into memory and return its tensors without copying.
+# The mapping is private: pages are read on first touch and stay shared with
+# the page cache (and other processes) until written.
+def load_safetensors_mmap(file_path):
+    with open(file_path, 'rb') as f:
+        header_size = struct.unpack('<Q', f.read(8))[0]
+        header = json.loads(f.read(header_size))
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+
+    data_start = 8 + header_size
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = SAFETENSORS_DTYPES[info['dtype']]
+        start, end = info['data_offsets']
+        count = (end - start) // dtype.itemsize
+        tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + start) if count else torch.empty(0, dtype=dtype)
+        tensors[name] = tensor.view(info['shape'])
+    return tensors
+
+
+# Build a model around memory-mapped weights: the module tree is created
+# without random init, then the mapped tensors are assigned in place
+def load_model_mmap(model_class, model_path):
+    config = model_class.config_class.from_pretrained(model_path)
+    with no_init_weights():
+        model = model_class(config)
+    state_dict = load_safetensors_mmap(os.path.join(model_path, SAFETENSORS_FILE))
+    missing_keys = model.load_state_dict(state_dict, strict=False, assign=True).missing_keys
+    model.tie_weights()
+
+    # Tied weights and tables computed at construction (e.g. sinusoidal
+    # positions) are not saved; anything else missing gets a fresh init
+    skipped = set(model._tied_weights_keys or []) | set(model._keys_to_ignore_on_save or [])
+    for key in missing_keys:
+        if key not in skipped:
+            model._init_weights(model.get_submodule(key.rsplit('.', 1)[0]))
+
+    try:
+        model.generation_config = GenerationConfig.from_pretrained(model_path)
+    except OSError:
+        model.generation_config = GenerationConfig.from_model_config(config)
+    return model
+
+
+# Build a tokenizer once and reuse it for every checkpoint with the same files
+def load_tokenizer(tokenizer_class, path):
+    digest = hashlib.sha256(tokenizer_class.__name__.encode('utf-8'))
+    for name in TOKENIZER_FILES:
+        file_path = os.path.join(path, name)
+        if os.path.exists(file_path):
+            digest.update(name.encode('utf-8'))
+            with open(file_path, 'rb') as f:
+                digest.update(f.read())
+    key = digest.hexdigest()
+
+    with _tokenizer_lock:
+        tokenizer = _tokenizers.get(key)
+        if tokenizer is None:
+            tokenizer = tokenizer_class.from_pretrained(path)
+            _tokenizers[key] = tokenizer
+        return tokenizer
@@ -0,0 +1,65 @@
+# Measure a pair's target/source token length ratio on the samanantar validation split:
+#   python measure_length_ratios.py results/marian_en_hi_finetuned --src en --tgt hi
+import argparse
+import json
+import os
+import numpy as np
+from transformers import MarianTokenizer, T5Tokenizer
+from corpus import iter_pairs
+from loading import load_tokenizer
+from translator import LENGTH_RATIOS_FILE, detect_model_type
+
+
+# Validation pairs as the notebook builds them: first rows, 90/10 split
+def load_validation_pairs(language, rows=5000, data_path=None):
+    valid_pairs = list(iter_pairs(language, rows, data_path))
+    split_idx = int(0.9 * len(valid_pairs))
+    return valid_pairs[split_idx:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure output length ratios for adaptive max_length")
+    parser.add_argument('model_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    parser.add_argument('--rows', type=int, default=5000, help="Rows read from samanantar, as in the notebook")
+    parser.add_argument('--data', help="Tab-separated english/target file instead of samanantar")
+    parser.add_argument('--percentile', type=float, default=99.0, help="Ratio percentile kept as the budget")
+    args = parser.parse_args()
+
+    language = args.tgt if args.src == 'en' else args.src
+    pairs = load_validation_pairs(language, args.rows, args.data)
+    if args.src == 'en':
+        sources = [pair['english'] for pair in pairs]
+        targets = [pair['target'] for pair in pairs]
+    else:
+        sources = [pair['target'] for pair in pairs]
+        targets = [pair['english'] for pair in pairs]
+
+    # Only the tokenizer is needed, not the model weights
+    tokenizer_class = MarianTokenizer if detect_model_type(args.model_path) == 'marian' else T5Tokenizer
+    tokenizer = load_tokenizer(tokenizer_class, args.model_path)
+    source_lengths = np.array([len(ids) for ids in tokenizer(sources)['input_ids']])
+    target_lengths = np.array([len(ids) for ids in tokenizer(text_target=targets)['input_ids']])
+    ratios = target_lengths / np.maximum(source_lengths, 1)
+    ratio = round(float(np.percentile(ratios, args.percentile)), 3)
+
+    ratios_path = os.path.join(args.model_path, LENGTH_RATIOS_FILE)
+    entries = {}
+    if os.path.exists(ratios_path):
+        with open(ratios_path, 'r') as f:
+            entries = json.load(f)
+    entries[f"{args.src}_{args.tgt}"] = {
+        'ratio': ratio,
+        'percentile': args.percentile,
+        'mean': round(float(ratios.mean()), 3),
+        'samples': len(ratios),
+    }
+    with open(ratios_path, 'w') as f:
+        json.dump(entries, f, indent=2)
+    print(f"{args.src} -> {args.tgt}: p{args.percentile:g} ratio {ratio} (mean {ratios.mean():.3f}, {len(ratios)} pairs)")
+    print(f"Saved to {ratios_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# Import Libraries
+import bisect
+import os
+import resource
+import threading
+
+# Histogram buckets: stage latencies in seconds, and token counts per request
+LATENCY_BUCKETS = [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+TOKEN_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 128, 256, 512]
+# Exported metrics: name -> (type, help)
+METRIC_HELP = {
+    'nmt_stage_seconds': ('histogram', 'Time per request stage: queue_wait, model_wait, tokenize, generate, decode, total'),
+    'nmt_input_tokens': ('histogram', 'Source tokens per translated text'),
+    'nmt_output_tokens': ('histogram', 'Generated tokens per translated text'),
+    'nmt_requests_total': ('counter', 'Requests by endpoint and HTTP status'),
+    'nmt_generate_calls_total': ('counter', 'generate calls, each translating one padded batch'),
+    'nmt_input_tokens_total': ('counter', 'Source tokens translated'),
+    'nmt_output_tokens_total': ('counter', 'Tokens generated'),
+    'nmt_generate_seconds_total': ('counter', 'Time spent in generate'),
+    'nmt_output_tokens_per_second': ('gauge', 'Generated tokens per second of generate time'),
+    'nmt_cache_lookups_total': ('counter', 'Result cache lookups by result'),
+    'nmt_encoding_cache_lookups_total': ('counter', 'Tokenizer encoding cache lookups by result'),
+    'nmt_coalesced_translations_total': ('counter', 'Translations shared with an identical in-flight request'),
+    'nmt_draft_tokens_total': ('counter', 'Tokens proposed by draft models and accepted by the verifying model'),
+    'nmt_memory_lookups_total': ('counter', 'Translation memory lookups by result'),
+    'nmt_model_load_seconds': ('gauge', 'Time taken to load a model'),
+    'nmt_model_memory_bytes': ('gauge', 'Memory held by a loaded model'),
+    'nmt_process_resident_memory_bytes': ('gauge', 'Resident memory of a server process'),
+    'nmt_worker_stats_up': ('gauge', 'Whether a worker answered the last stats request in time'),
+}
+
+
+# Cumulative histogram with fixed buckets
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # One count per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+# Histograms and counters keyed by metric name and labels. Recording is one
+# lock and a bisect, cheap enough to leave on for every request.
+class MetricsRegistry:
+    # Initialize the registry
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    # Record a value in a histogram
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        with self._lock:
+            self._observe_locked(name, value, buckets, **labels)
+
+    # Add to a counter
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    # Record one generate call over a batch of texts
+    def record_generation(self, pair, tokenize, generate, decode, input_tokens, output_tokens):
+        with self._lock:
+            for stage, seconds in [('tokenize', tokenize), ('generate', generate), ('decode', decode)]:
+                self._observe_locked('nmt_stage_seconds', seconds, LATENCY_BUCKETS, pair=pair, stage=stage)
+            for count in input_tokens:
+                self._observe_locked('nmt_input_tokens', count, TOKEN_BUCKETS, pair=pair)
+            for count in output_tokens:
+                self._observe_locked('nmt_output_tokens', count, TOKEN_BUCKETS, pair=pair)
+            for name, value in [('nmt_generate_calls_total', 1), ('nmt_input_tokens_total', sum(input_tokens)),
+                                ('nmt_output_tokens_total', sum(output_tokens)), ('nmt_generate_seconds_total', generate)]:
+                key = (name, (('pair', pair),))
+                self._counters[key] = self._counters.get(key, 0) + value
+
+    # observe() for callers already holding the lock
+    def _observe_locked(self, name, value, buckets, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            histogram = self._histograms[key] = Histogram(buckets)
+        histogram.observe(value)
+
+    # Plain data copy of all metrics, mergeable across processes
+    def snapshot(self):
+        with self._lock:
+            return {
+                'histograms': [
+                    [name, list(labels), histogram.buckets, list(histogram.counts), histogram.sum, histogram.count]
+                    for (name, labels), histogram in self._histograms.items()
+                ],
+                'counters': [[name, list(labels), value] for (name, labels), value in self._counters.items()],
+            }
+
+
+# Add up snapshots from several processes
+def merge_snapshots(snapshots):
+    histograms = {}
+    counters = {}
+    for snapshot in snapshots:
+        for name, labels, buckets, counts, total, count in snapshot['histograms']:
+            key = (name, tuple(tuple(label) for label in labels))
+            if key not in histograms:
+                histograms[key] = [buckets, [0] * len(counts), 0.0, 0]
+            merged = histograms[key]
+            merged[1] = [a + b for a, b in zip(merged[1], counts)]
+            merged[2] += total
+            merged[3] += count
+        for name, labels, value in snapshot['counters']:
+            key = (name, tuple(tuple(label) for label in labels))
+            counters[key] = counters.get(key, 0) + value
+    return {
+        'histograms': [[name, list(labels), *values] for (name, labels), values in histograms.items()],
+        'counters': [[name, list(labels), value] for (name, labels), value in counters.items()],
+    }
+
+
+# Resident memory of this process in bytes
+def resident_memory():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        # Peak instead of current RSS where /proc is missing
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+# Format label pairs as {a="x",b="y"}
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{str(value)}"' for name, value in labels) + '}'
+
+
+# Format a number the way Prometheus expects
+def _format_value(value):
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    return str(value)
+
+
+# Render a snapshot plus gauges [(name, labels, value)] in the Prometheus text format
+def render_prometheus(snapshot, gauges=()):
+    samples = {}
+    for name, labels, buckets, counts, total, count in snapshot['histograms']:
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, bucket_count in zip(buckets + ['+Inf'], counts):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_format_labels(list(labels) + [('le', bound)])} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {count}")
+    for name, labels, value in list(snapshot['counters']) + list(gauges):
+        samples.setdefault(name, []).append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    output = []
+    for name in sorted(samples):
+        metric_type, help_text = METRIC_HELP.get(name, ('untyped', ''))
+        output.append(f"# HELP {name} {help_text}")
+        output.append(f"# TYPE {name} {metric_type}")
+        output.extend(samples[name])
+    return '\n'.join(output) + '\n'
+
+
+# Metrics recorded by this process
+translation_metrics = MetricsRegistry()
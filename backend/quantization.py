@@ -0,0 +1,60 @@
+# Import Libraries
+import os
+import torch
+
+# File holding the quantized state dict inside the quantized checkpoint
+QUANTIZED_WEIGHTS = "quantized_model.pt"
+
+
+# Set intra-op and inter-op thread counts for this worker
+def configure_threads(num_threads=0, num_interop_threads=0):
+    if num_threads > 0:
+        torch.set_num_threads(num_threads)
+    if num_interop_threads > 0:
+        try:
+            torch.set_num_interop_threads(num_interop_threads)
+        except RuntimeError:
+            pass # Can only be set before inter-op work has started
+    return torch.get_num_threads(), torch.get_num_interop_threads()
+
+
+# Apply dynamic int8 quantization to the Linear layers
+def quantize_model(model):
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+# Directory of the quantized checkpoint, next to the fp32 one
+def quantized_path(model_path):
+    return os.path.normpath(model_path) + "_int8"
+
+
+# Save a quantized model with its config next to the fp32 checkpoint
+def save_quantized(model, model_path):
+    output_dir = quantized_path(model_path)
+    os.makedirs(output_dir, exist_ok=True)
+    model.config.save_pretrained(output_dir)
+    torch.save(model.state_dict(), os.path.join(output_dir, QUANTIZED_WEIGHTS))
+    return output_dir
+
+
+# Check for a saved quantized checkpoint that is newer than the fp32 model files
+def has_quantized(model_path, model_files):
+    weights_path = os.path.join(quantized_path(model_path), QUANTIZED_WEIGHTS)
+    if not os.path.exists(weights_path):
+        return False
+    saved_at = os.path.getmtime(weights_path)
+    for name in model_files:
+        file_path = os.path.join(model_path, name)
+        if os.path.exists(file_path) and os.path.getmtime(file_path) > saved_at:
+            return False
+    return True
+
+
+# Load a saved quantized checkpoint into a model of the given class
+def load_quantized(model_class, model_path):
+    output_dir = quantized_path(model_path)
+    config = model_class.config_class.from_pretrained(output_dir)
+    model = quantize_model(model_class(config))
+    state_dict = torch.load(os.path.join(output_dir, QUANTIZED_WEIGHTS), weights_only=False)
+    model.load_state_dict(state_dict)
+    return model
@@ -0,0 +1,175 @@
+# Import Libraries
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from translator import MODEL_FILES
+
+# Memoized fingerprints keyed by path and file versions. Kept in memory only,
+# checkpoint directories are not written to and may be read-only.
+_fingerprints = {}
+
+
+# Content hash of a checkpoint's config and weights
+def model_fingerprint(model_path):
+    files = []
+    for name in MODEL_FILES:
+        file_path = os.path.join(model_path, name)
+        if os.path.exists(file_path):
+            stat = os.stat(file_path)
+            files.append((file_path, stat.st_size, stat.st_mtime_ns))
+    memo_key = (os.path.realpath(model_path), tuple(files))
+    if memo_key in _fingerprints:
+        return _fingerprints[memo_key]
+    # Without any files to hash, fall back to the resolved path
+    if not files:
+        return memo_key[0]
+
+    digest = hashlib.sha256()
+    for file_path, _, _ in files:
+        digest.update(os.path.basename(file_path).encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+    _fingerprints[memo_key] = digest.hexdigest()
+    return _fingerprints[memo_key]
+
+
+# Registry of loaded translators with lazy loading and LRU eviction
+class ModelRegistry:
+    # Initialize the registry
+    def __init__(self, loader, memory_budget_mb=0, idle_ttl=0):
+        self.loader = loader
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.idle_ttl = idle_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # Counters
+        self.loads = 0
+        self.evictions = 0
+
+    # Get a translator, loading it on first use; owner records who shares it,
+    # until the translator is evicted
+    def get(self, key, owner=None):
+        with self._lock:
+            self._evict_idle()
+            translator = self._touch(key, owner)
+            if translator is not None:
+                return translator
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # One load per key: concurrent first requests wait for the same load
+        with load_lock:
+            with self._lock:
+                translator = self._touch(key, owner)
+                if translator is not None:
+                    return translator
+
+            start_time = time.time()
+            translator = self.loader(key)
+            load_time = time.time() - start_time
+
+            with self._lock:
+                now = time.time()
+                self._entries[key] = {
+                    'translator': translator,
+                    'memory': self._memory_of(translator),
+                    'load_time': load_time,
+                    'loaded_at': now,
+                    'last_used': now,
+                    'owners': {owner} if owner else set(),
+                }
+                self.loads += 1
+                self._evict_over_budget(keep=key)
+            return translator
+
+    # Mark an entry as used and return its translator
+    def _touch(self, key, owner=None):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if owner:
+            entry['owners'].add(owner)
+        entry['last_used'] = time.time()
+        self._entries.move_to_end(key)
+        return entry['translator']
+
+    # Estimate the memory held by a translator
+    def _memory_of(self, translator):
+        memory_bytes = getattr(translator, 'memory_bytes', None)
+        return memory_bytes() if memory_bytes else 0
+
+    # Total memory of loaded translators
+    def memory_used(self):
+        return sum(entry['memory'] for entry in self._entries.values())
+
+    # Evict least recently used translators until under the memory budget
+    def _evict_over_budget(self, keep=None):
+        if self.memory_budget <= 0:
+            return
+        for key in list(self._entries.keys()):
+            if self.memory_used() <= self.memory_budget:
+                break
+            if key != keep:
+                self._remove(key)
+
+    # Evict translators that have not been used within the idle TTL
+    def _evict_idle(self):
+        if self.idle_ttl <= 0:
+            return
+        cutoff = time.time() - self.idle_ttl
+        for key in [key for key, entry in self._entries.items() if entry['last_used'] < cutoff]:
+            self._remove(key)
+
+    # Drop one entry
+    def _remove(self, key):
+        del self._entries[key]
+        self.evictions += 1
+
+    # Evict a translator by key
+    def evict(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    # Keys of loaded translators, least recently used first
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    # Owners whose translator is loaded
+    def owners(self):
+        with self._lock:
+            return sorted(owner for entry in self._entries.values() for owner in entry['owners'])
+
+    # Check whether an owner's translator is loaded
+    def has_owner(self, owner):
+        with self._lock:
+            return any(owner in entry['owners'] for entry in self._entries.values())
+
+    # Get registry metrics
+    def stats(self):
+        with self._lock:
+            now = time.time()
+            return {
+                'memory_budget_mb': round(self.memory_budget / (1024 * 1024), 1),
+                'memory_used_mb': round(self.memory_used() / (1024 * 1024), 1),
+                'loads': self.loads,
+                'evictions': self.evictions,
+                'loaded': {
+                    key: {
+                        'memory_mb': round(entry['memory'] / (1024 * 1024), 1),
+                        'memory_bytes': entry['memory'],
+                        'load_time': round(entry['load_time'], 3),
+                        'idle_seconds': round(now - entry['last_used'], 1),
+                        'owners': sorted(entry['owners']),
+                    }
+                    for key, entry in self._entries.items()
+                },
+            }
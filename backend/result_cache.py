@@ -0,0 +1,158 @@
+# Import Libraries
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+
+# Normalize text so trivially different inputs share a cache entry
+def normalize_text(text):
+    return ' '.join(unicodedata.normalize('NFC', text).split())
+
+
+# Build the cache key for a translation request
+def make_cache_key(text, src_lang, tgt_lang, model_id, params=None):
+    key = json.dumps(
+        [normalize_text(text), src_lang, tgt_lang, model_id, params or {}],
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+
+# SQLite inserts between purges of its expired and oldest rows
+PURGE_INTERVAL = 1000
+
+
+# Translation result cache: in-memory LRU with an optional SQLite tier
+class TranslationCache:
+    # Initialize the cache; the SQLite tier keeps at most db_max_size rows
+    def __init__(self, max_size=10000, ttl=86400, db_path=None, db_max_size=100000):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_path = db_path
+        self.db_max_size = db_max_size
+        self._inserts = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        # Counters
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if db_path:
+            self._open_db()
+
+    # Open the SQLite tier
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            "key TEXT PRIMARY KEY, translation TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS translations_created ON translations (created)")
+        self._purge()
+        self._db.commit()
+
+    # Open a fresh SQLite connection, a forked worker must not share its parent's
+    def reopen(self):
+        if self.db_path:
+            self._open_db()
+
+    # Check whether an entry created at this time has expired
+    def _expired(self, created):
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    # Get a cached translation or None
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                translation, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    return translation
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT translation, created FROM translations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    translation, created = row
+                    if not self._expired(created):
+                        # Promote to the memory tier
+                        self._store(key, translation, created)
+                        self.disk_hits += 1
+                        return translation
+                    self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                    self._db.commit()
+
+            self.misses += 1
+            return None
+
+    # Store a translation
+    def set(self, key, translation):
+        created = time.time()
+        with self._lock:
+            self._store(key, translation, created)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO translations (key, translation, created) VALUES (?, ?, ?)",
+                    (key, translation, created),
+                )
+                self._inserts += 1
+                if self._inserts % PURGE_INTERVAL == 0:
+                    self._purge()
+                self._db.commit()
+
+    # Delete expired rows of the SQLite tier and the oldest ones over its size limit
+    def _purge(self):
+        if self.ttl > 0:
+            self._db.execute("DELETE FROM translations WHERE created < ?", (time.time() - self.ttl,))
+        if self.db_max_size > 0:
+            self._db.execute(
+                "DELETE FROM translations WHERE key IN ("
+                "SELECT key FROM translations ORDER BY created DESC LIMIT -1 OFFSET ?)",
+                (self.db_max_size,),
+            )
+
+    # Put an entry in the memory tier and evict least recently used ones
+    def _store(self, key, translation, created):
+        self._entries[key] = (translation, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    # Drop all entries
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    # Get cache counters
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            lookups = hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'db_max_size': self.db_max_size if self._db is not None else None,
+                'ttl': self.ttl,
+                'persistent': self._db is not None,
+                'hits': hits,
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(hits / lookups, 3) if lookups else 0.0,
+            }
@@ -0,0 +1,52 @@
+# Translation routes over the available models. Each direct model is an edge
+# of a language graph; a pair without one is served along the shortest path,
+# e.g. hi -> en -> kn, pivoting through English.
+import os
+from collections import deque
+
+# Language preferred as the intermediate when several routes are equally short
+PIVOT_LANGUAGE = 'en'
+
+
+class TranslationGraph:
+    # Edges for the pairs of model_paths ("src_tgt" -> path) whose model exists
+    def __init__(self, model_paths, pivot=PIVOT_LANGUAGE):
+        self.pivot = pivot
+        self.edges = {}
+        for pair, path in model_paths.items():
+            if os.path.exists(path):
+                src_lang, tgt_lang = pair.split('_')
+                self.edges.setdefault(src_lang, []).append(tgt_lang)
+        # Try the pivot first so ties go through it
+        for targets in self.edges.values():
+            targets.sort(key=lambda language: language != pivot)
+
+    # Shortest list of languages from src_lang to tgt_lang, None when unreachable
+    def route(self, src_lang, tgt_lang):
+        previous = {src_lang: None}
+        queue = deque([src_lang])
+        while queue:
+            language = queue.popleft()
+            if language == tgt_lang:
+                route = []
+                while language is not None:
+                    route.append(language)
+                    language = previous[language]
+                return route[::-1]
+            for target in self.edges.get(language, []):
+                if target not in previous:
+                    previous[target] = language
+                    queue.append(target)
+        return None
+
+    # Route of every pair of languages, for the health report
+    def routes(self, languages):
+        return {
+            f"{src_lang}_{tgt_lang}": self.route(src_lang, tgt_lang)
+            for src_lang in languages for tgt_lang in languages if src_lang != tgt_lang
+        }
+
+
+# Consecutive (src, tgt) hops of a route
+def route_hops(route):
+    return list(zip(route, route[1:]))
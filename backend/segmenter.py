@@ -0,0 +1,60 @@
+# Import Libraries
+import re
+
+# Paragraph breaks are one or more blank lines
+PARAGRAPH_BREAK = re.compile(r'(\n\s*\n)')
+# Sentence ends: Latin punctuation plus the Devanagari danda/double danda,
+# which Hindi uses and Kannada text often borrows alongside the full stop
+SENTENCE_END = re.compile(r'(?<=[.!?।॥])["\'”’)\]]*\s+')
+
+
+# Split text into paragraphs, keeping the separators for reassembly
+def split_paragraphs(text):
+    parts = PARAGRAPH_BREAK.split(text)
+    paragraphs = parts[0::2]
+    separators = parts[1::2]
+    return paragraphs, separators
+
+
+# Split a paragraph into sentences
+def split_sentences(paragraph):
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(paragraph):
+        sentences.append(paragraph[start:match.end()].strip())
+        start = match.end()
+    sentences.append(paragraph[start:].strip())
+    return [sentence for sentence in sentences if sentence]
+
+
+# Split a sentence that is over the token budget into word windows
+def _split_long_sentence(sentence, token_count, max_tokens):
+    words = sentence.split()
+    pieces = max(1, -(-token_count // max_tokens))
+    size = max(1, -(-len(words) // pieces))
+    return [' '.join(words[i:i + size]) for i in range(0, len(words), size)]
+
+
+# Pack sentences into chunks that stay within the token budget
+def pack_sentences(sentences, token_counts, max_tokens):
+    chunks = []
+    current = []
+    current_tokens = 0
+
+    for sentence, count in zip(sentences, token_counts):
+        if count > max_tokens:
+            # Flush and emit the oversized sentence as its own pieces
+            if current:
+                chunks.append(' '.join(current))
+                current, current_tokens = [], 0
+            chunks.extend(_split_long_sentence(sentence, count, max_tokens))
+            continue
+        if current and current_tokens + count > max_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += count
+
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
@@ -0,0 +1,140 @@
+# Import Libraries
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Raised when the queue is full, clients should retry later (HTTP 429)
+class QueueFullError(Exception):
+    pass
+
+
+# Raised when a request would wait past its timeout, or ran past it (HTTP 503)
+class OverloadedError(Exception):
+    pass
+
+
+# Bounded worker pool running blocking inference off the event loop, with a
+# queue limit, load shedding and per-request timeouts
+class InferencePool:
+    # Initialize the pool
+    def __init__(self, max_workers=4, max_queue=64, timeout=30):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix='inference')
+        self._lock = threading.Lock()
+        # Requests admitted and not yet finished, and those on a worker
+        self.pending = 0
+        self.running = 0
+        # Moving average of the time a request holds a worker
+        self.avg_service_time = 0.0
+        # Metrics
+        self.completed = 0
+        self.rejected = 0
+        self.shed = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+
+    # Admit a request or shed it: 429 when the queue is full, 503 when the
+    # expected queue wait already exceeds the timeout
+    def _admit(self):
+        with self._lock:
+            queued = self.pending - self.running
+            if self.pending >= self.max_workers + self.max_queue:
+                self.rejected += 1
+                raise QueueFullError(f'Server is busy, {queued} requests queued. Retry later.')
+            expected_wait = max(queued + 1 - (self.max_workers - self.running), 0) * self.avg_service_time / self.max_workers
+            if self.timeout > 0 and expected_wait > self.timeout:
+                self.shed += 1
+                raise OverloadedError(f'Server is overloaded, expected wait {expected_wait:.1f}s.')
+            self.pending += 1
+
+    # Run fn on a worker, recording queue wait and service time
+    def _call(self, fn, args, queued_at):
+        started = time.time()
+        with self._lock:
+            self.running += 1
+            self.total_wait += started - queued_at
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.time() - started
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.avg_service_time = elapsed if self.completed == 1 else 0.9 * self.avg_service_time + 0.1 * elapsed
+
+    # Free the slot once the call finished, or was cancelled while still queued
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    # Submit a call to the executor and track its slot
+    def _submit(self, fn, *args):
+        future = self._executor.submit(self._call, fn, args, time.time())
+        future.add_done_callback(self._release)
+        return future
+
+    # Run a blocking call on the pool and wait for it within the timeout. A call
+    # still queued at the timeout is dropped; a running one finishes in the background.
+    async def run(self, fn, *args):
+        self._admit()
+        future = asyncio.wrap_future(self._submit(fn, *args))
+        try:
+            return await asyncio.wait_for(future, self.timeout if self.timeout > 0 else None)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self.timeouts += 1
+            raise OverloadedError(f'Request timed out after {self.timeout:g}s.')
+
+    # Run a blocking generator on the pool and yield its items. make_iterator
+    # gets a threading.Event that is set when the consumer stops reading.
+    async def iterate(self, make_iterator):
+        self._admit()
+        loop = asyncio.get_running_loop()
+        items = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def pump():
+            try:
+                for item in make_iterator(stop):
+                    loop.call_soon_threadsafe(items.put_nowait, item)
+                    if stop.is_set():
+                        break
+            finally:
+                loop.call_soon_threadsafe(items.put_nowait, done)
+
+        future = self._submit(pump)
+        try:
+            while True:
+                item = await items.get()
+                if item is done:
+                    break
+                yield item
+        finally:
+            stop.set()
+            future.cancel()
+
+    # Stop the workers, dropping queued calls
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # Get pool metrics
+    def stats(self):
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'timeout': self.timeout,
+                'running': self.running,
+                'queued': self.pending - self.running,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'shed': self.shed,
+                'timeouts': self.timeouts,
+                'avg_wait_ms': round(self.total_wait / self.completed * 1000, 2) if self.completed else 0.0,
+                'avg_service_ms': round(self.avg_service_time * 1000, 2),
+            }
@@ -0,0 +1,172 @@
+# Import Libraries
+import os
+import threading
+import weakref
+from collections import OrderedDict
+import torch
+
+# Encodings of recent texts kept per tokenizer
+ENCODING_CACHE_SIZE = int(os.environ.get('NMT_ENCODING_CACHE_SIZE', 10000))
+# Threads sentencepiece may use to encode one batch
+ENCODE_THREADS = int(os.environ.get('NMT_ENCODE_THREADS', 0)) or min(4, os.cpu_count() or 1)
+# sentencepiece word boundary marker
+SPIECE_UNDERLINE = "▁"
+
+# Live encoders, for their metrics; an encoder goes with the translator that owns it
+_encoders = weakref.WeakSet()
+_encoders_lock = threading.Lock()
+
+
+# Tokenization layer over a Hugging Face tokenizer. Texts are encoded once
+# without special tokens and cached, task prefixes are encoded once and their
+# ids prepended. Fast (Rust) tokenizers encode batches in parallel natively;
+# for Marian's slow tokenizer the batch goes straight to sentencepiece, which
+# encodes on several threads, and decoding skips the per-token special token
+# lookups of the generic slow path.
+class TextEncoder:
+    # Initialize the encoder
+    def __init__(self, tokenizer, cache_size=ENCODING_CACHE_SIZE, num_threads=ENCODE_THREADS):
+        self.tokenizer = tokenizer
+        self.cache_size = cache_size
+        self.num_threads = num_threads
+        self._entries = OrderedDict()
+        self._prefixes = {}
+        self._lock = threading.Lock()
+        self.special_ids = set(tokenizer.all_special_ids)
+        self.special_tokens = set(tokenizer.all_special_tokens)
+        self.num_special_tokens = tokenizer.num_special_tokens_to_add()
+        # Texts containing these go through the tokenizer itself
+        self._added_tokens = list(tokenizer.get_added_vocab())
+        # Marian's slow tokenizer is sentencepiece plus a vocabulary lookup
+        self.sentencepiece = not tokenizer.is_fast and hasattr(tokenizer, 'spm_source')
+        if tokenizer.is_fast:
+            self.backend = 'fast'
+        elif self.sentencepiece:
+            self.backend = 'sentencepiece'
+        else:
+            self.backend = 'slow'
+        # Counters
+        self.hits = 0
+        self.misses = 0
+        with _encoders_lock:
+            _encoders.add(self)
+
+    # Token ids of texts without special tokens, via the fastest path available
+    def _encode_texts(self, texts):
+        if not self.sentencepiece:
+            return self.tokenizer(texts, add_special_tokens=False)['input_ids']
+        plain = [i for i, text in enumerate(texts)
+                 if '>>' not in text and not any(token in text for token in self._added_tokens)]
+        ids = [None] * len(texts)
+        if plain:
+            vocab = self.tokenizer.encoder
+            unk_id = vocab[self.tokenizer.unk_token]
+            pieces = self.tokenizer.spm_source.encode(
+                [texts[i] for i in plain], out_type=str, num_threads=self.num_threads
+            )
+            for i, text_pieces in zip(plain, pieces):
+                ids[i] = [vocab.get(piece, unk_id) for piece in text_pieces]
+        # Language codes and special tokens in the text need the full tokenizer
+        rest = [i for i in range(len(texts)) if ids[i] is None]
+        if rest:
+            encoded = self.tokenizer([texts[i] for i in rest], add_special_tokens=False)['input_ids']
+            for i, text_ids in zip(rest, encoded):
+                ids[i] = text_ids
+        return ids
+
+    # Token ids of texts without special tokens, from the cache where possible
+    def encode_texts(self, texts):
+        ids = [None] * len(texts)
+        missing = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                cached = self._entries.get(text)
+                if cached is not None:
+                    self._entries.move_to_end(text)
+                    ids[i] = cached
+                    self.hits += 1
+                else:
+                    missing.setdefault(text, []).append(i)
+                    self.misses += 1
+        if missing:
+            encoded = self._encode_texts(list(missing))
+            with self._lock:
+                for (text, positions), text_ids in zip(missing.items(), encoded):
+                    text_ids = tuple(text_ids)
+                    for i in positions:
+                        ids[i] = text_ids
+                    self._entries[text] = text_ids
+                    self._entries.move_to_end(text)
+                while len(self._entries) > self.cache_size:
+                    self._entries.popitem(last=False)
+        return ids
+
+    # Token ids of a task prefix such as "translate English to Hindi:", encoded once
+    def prefix_ids(self, prefix):
+        if not prefix:
+            return ()
+        ids = self._prefixes.get(prefix)
+        if ids is None:
+            ids = self._prefixes[prefix] = tuple(self.tokenizer(prefix, add_special_tokens=False)['input_ids'])
+        return ids
+
+    # Encode texts behind a prefix into padded input_ids and attention_mask
+    # tensors, the same as calling the tokenizer on prefix + text with
+    # truncation to max_length and padding to the longest
+    def encode(self, texts, prefix='', max_length=128):
+        prefix_ids = self.prefix_ids(prefix)
+        limit = max_length - self.num_special_tokens
+        sequences = [
+            self.tokenizer.build_inputs_with_special_tokens(list(prefix_ids + text_ids)[:limit])
+            for text_ids in self.encode_texts(texts)
+        ]
+        longest = max(len(ids) for ids in sequences)
+        input_ids = torch.full((len(sequences), longest), self.tokenizer.pad_token_id, dtype=torch.long)
+        attention_mask = torch.zeros((len(sequences), longest), dtype=torch.long)
+        for row, ids in enumerate(sequences):
+            if self.tokenizer.padding_side == 'left':
+                input_ids[row, longest - len(ids):] = torch.tensor(ids)
+                attention_mask[row, longest - len(ids):] = 1
+            else:
+                input_ids[row, :len(ids)] = torch.tensor(ids)
+                attention_mask[row, :len(ids)] = 1
+        return {'input_ids': input_ids, 'attention_mask': attention_mask}
+
+    # Decode generated ids to text, skipping special tokens
+    def decode(self, sequences):
+        if not self.sentencepiece:
+            return self.tokenizer.batch_decode(sequences, skip_special_tokens=True)
+        vocab = self.tokenizer.decoder
+        unk_token = self.tokenizer.unk_token
+        texts = []
+        for ids in sequences.tolist() if isinstance(sequences, torch.Tensor) else sequences:
+            tokens = [vocab.get(i, unk_token) for i in ids if i not in self.special_ids]
+            if any(token in self.special_tokens for token in tokens):
+                # Special token strings among the pieces are decoded differently
+                texts.append(self.tokenizer.decode(ids, skip_special_tokens=True))
+                continue
+            text = self.tokenizer.spm_target.decode_pieces(tokens).replace(SPIECE_UNDERLINE, " ").strip()
+            if self.tokenizer.clean_up_tokenization_spaces:
+                text = self.tokenizer.clean_up_tokenization(text)
+            texts.append(text)
+        return texts
+
+    # Get encoder metrics
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'backend': self.backend,
+                'size': len(self._entries),
+                'max_size': self.cache_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Metrics of every encoder in this process
+def encoder_stats():
+    with _encoders_lock:
+        encoders = list(_encoders)
+    return [encoder.stats() for encoder in encoders]
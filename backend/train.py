@@ -0,0 +1,303 @@
+# Fine-tune one translation direction, replacing the notebook's four copies:
+#   python train.py en_hi --max-tokens 4096 --grad-accum 2
+#   python train.py hi_en --rows 0 --resume
+#   python train.py en_hi --draft --distill
+# Batches are built from length-sorted buckets under a token budget, so short
+# and long sentences are not padded to each other; tokens/sec is logged.
+# --draft trains a pair's draft model for speculative decoding instead: the
+# fine-tuned model cut down to a few decoder layers, trained on the same
+# data, or with --distill on the fine-tuned model's own greedy translations.
+import argparse
+import itertools
+import os
+import random
+import time
+import numpy as np
+import pyarrow.compute as pc
+import torch
+from torch.utils.data import DataLoader
+from transformers import (
+    AutoModelForSeq2SeqLM,
+    AutoTokenizer,
+    DataCollatorForSeq2Seq,
+    Seq2SeqTrainer,
+    Seq2SeqTrainingArguments,
+)
+from transformers.trainer_utils import get_last_checkpoint
+from corpus import iter_pairs, prepare_translation_data
+
+# Base checkpoint and output directory of each direction, as in the notebook,
+# and where its draft model goes
+PAIR_SPECS = {
+    'en_hi': {'base_model': 'Helsinki-NLP/opus-mt-en-hi', 'output_dir': 'results/marian_en_hi_finetuned',
+              'draft_dir': 'results/marian_en_hi_draft'},
+    'hi_en': {'base_model': 'Helsinki-NLP/opus-mt-hi-en', 'output_dir': 'results/marian_hi_en_finetuned',
+              'draft_dir': 'results/marian_hi_en_draft'},
+    'en_kn': {'base_model': 'Helsinki-NLP/opus-mt-en-mul', 'output_dir': 'results/marian_en_kn_finetuned',
+              'draft_dir': 'results/marian_en_kn_draft'},
+    'kn_en': {'base_model': 'Helsinki-NLP/opus-mt-mul-en', 'output_dir': 'results/marian_kn_en_finetuned',
+              'draft_dir': 'results/marian_kn_en_draft'},
+}
+# The notebook's training arguments
+TRAINING_ARGS = {
+    'evaluation_strategy': 'steps',
+    'eval_steps': 200,
+    'logging_steps': 50,
+    'save_steps': 200,
+    'save_total_limit': 2,
+    'learning_rate': 3e-5,
+    'per_device_train_batch_size': 16,
+    'per_device_eval_batch_size': 16,
+    'num_train_epochs': 3,
+    'weight_decay': 0.01,
+    'warmup_steps': 200,
+    'predict_with_generate': True,
+    'load_best_model_at_end': True,
+    'metric_for_best_model': 'eval_loss',
+}
+# Padded tokens per batch with token-budget batching
+DEFAULT_MAX_TOKENS = 4096
+# Batches formed from each sorted bucket, more means less padding but less randomness
+BUCKET_BATCHES = 100
+# Examples whose lengths are read per Arrow batch
+LENGTH_BATCH_SIZE = 10000
+# Decoder layers kept in a draft model
+DRAFT_DECODER_LAYERS = 1
+# Sentences translated per batch when distilling
+DISTILL_BATCH_SIZE = 32
+
+
+# Cut a Marian model down to a draft: keep num_layers evenly spaced decoder
+# layers and freeze the encoder and embeddings, so they stay identical to the
+# fine-tuned model's and the server runs the encoder once for both
+def make_draft(model, num_layers=DRAFT_DECODER_LAYERS):
+    layers = model.model.decoder.layers
+    keep = sorted({round(i * (len(layers) - 1) / max(num_layers - 1, 1)) for i in range(min(num_layers, len(layers)))})
+    model.model.decoder.layers = torch.nn.ModuleList(layers[i] for i in keep)
+    model.config.decoder_layers = len(keep)
+    for parameter in list(model.model.encoder.parameters()) + list(model.model.shared.parameters()):
+        parameter.requires_grad = False
+    return model
+
+
+# Write a distillation corpus: the pair's source sentences with the teacher's
+# greedy translations, in the english/target layout of --data files
+def distill_corpus(teacher_path, src_lang, tgt_lang, rows, data_path, output_path, batch_size=DISTILL_BATCH_SIZE):
+    from translator import DECODING_PROFILES, UniversalTranslator
+    translator = UniversalTranslator(teacher_path)
+    language = tgt_lang if src_lang == 'en' else src_lang
+    side = 'english' if src_lang == 'en' else 'target'
+    pairs = iter_pairs(language, rows, data_path)
+    start_time = time.time()
+    count = 0
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path + '.tmp', 'w', encoding='utf-8') as f:
+        while True:
+            sources = [' '.join(pair[side].split()) for pair in itertools.islice(pairs, batch_size * 8)]
+            if not sources:
+                break
+            translations = translator.translate_batch(
+                sources, src_lang, tgt_lang, batch_size=batch_size, params=DECODING_PROFILES['fast']
+            )
+            for source, translation in zip(sources, translations):
+                translation = ' '.join(translation.split())
+                english, target = (source, translation) if src_lang == 'en' else (translation, source)
+                f.write(f"{english}\t{target}\n")
+            count += len(sources)
+            print(f"Distilled {count} sentences, {count / (time.time() - start_time):.1f}/s")
+    os.replace(output_path + '.tmp', output_path)
+    return output_path
+
+
+# Batches of example indices whose padded size (examples x longest source or
+# target) stays within a token budget. Indices are shuffled, cut into
+# buckets, sorted by length inside each bucket and packed greedily; the batch
+# order is shuffled again. Each pass over the sampler is a new epoch.
+class TokenBudgetBatchSampler:
+    def __init__(self, lengths, max_tokens=DEFAULT_MAX_TOKENS, shuffle=True, seed=42, bucket_batches=BUCKET_BATCHES):
+        self.lengths = lengths
+        self.max_tokens = max_tokens
+        self.shuffle = shuffle
+        self.seed = seed
+        # Enough examples per bucket for about bucket_batches average batches
+        average_length = sum(lengths) / max(len(lengths), 1)
+        self.bucket_size = max(1, int(bucket_batches * max_tokens / max(average_length, 1)))
+        self.epoch = 0
+        self._num_batches = len(self._batches(0))
+
+    # The batches of one epoch
+    def _batches(self, epoch):
+        indices = list(range(len(self.lengths)))
+        rng = random.Random(self.seed + epoch)
+        if self.shuffle:
+            rng.shuffle(indices)
+        batches = []
+        for start in range(0, len(indices), self.bucket_size):
+            bucket = sorted(indices[start:start + self.bucket_size], key=lambda i: self.lengths[i])
+            batch = []
+            longest = 0
+            for i in bucket:
+                if batch and (len(batch) + 1) * max(longest, self.lengths[i]) > self.max_tokens:
+                    batches.append(batch)
+                    batch = []
+                    longest = 0
+                batch.append(i)
+                longest = max(longest, self.lengths[i])
+            if batch:
+                batches.append(batch)
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def __iter__(self):
+        batches = self._batches(self.epoch)
+        self.epoch += 1
+        return iter(batches)
+
+    # Batch counts vary slightly between epochs; the first epoch's is reported
+    def __len__(self):
+        return self._num_batches
+
+
+# Seq2SeqTrainer with token-budget batches and a tokens/sec report
+class TokenBudgetTrainer(Seq2SeqTrainer):
+    def __init__(self, *args, max_tokens=DEFAULT_MAX_TOKENS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_tokens = max_tokens
+        self.train_tokens = 0
+        self.padded_tokens = 0
+        self.train_start = None
+
+    # Longest side of each example, the padded width it needs, read from the
+    # Arrow list offsets so the token lists stay memory-mapped
+    def _lengths(self, dataset):
+        lengths = []
+        for batch in dataset.with_format('arrow').iter(batch_size=LENGTH_BATCH_SIZE):
+            sources = pc.list_value_length(batch['input_ids']).to_numpy()
+            targets = pc.list_value_length(batch['labels']).to_numpy()
+            lengths.extend(np.maximum(sources, targets).tolist())
+        return lengths
+
+    def _token_budget_dataloader(self, dataset, shuffle, description):
+        dataset = self._remove_unused_columns(dataset, description=description)
+        sampler = TokenBudgetBatchSampler(self._lengths(dataset), self.max_tokens, shuffle, self.args.seed)
+        return self.accelerator.prepare(DataLoader(
+            dataset,
+            batch_sampler=sampler,
+            collate_fn=self.data_collator,
+            num_workers=self.args.dataloader_num_workers,
+            pin_memory=self.args.dataloader_pin_memory,
+        ))
+
+    def get_train_dataloader(self):
+        if not self.max_tokens:
+            return super().get_train_dataloader()
+        return self._token_budget_dataloader(self.train_dataset, True, "training")
+
+    def get_eval_dataloader(self, eval_dataset=None):
+        if not self.max_tokens:
+            return super().get_eval_dataloader(eval_dataset)
+        return self._token_budget_dataloader(eval_dataset if eval_dataset is not None else self.eval_dataset, False, "evaluation")
+
+    # Count real and padded tokens of every training batch
+    def training_step(self, model, inputs):
+        if self.train_start is None:
+            self.train_start = time.time()
+        self.train_tokens += int(inputs['attention_mask'].sum()) + int((inputs['labels'] != -100).sum())
+        self.padded_tokens += inputs['input_ids'].numel() + inputs['labels'].numel()
+        return super().training_step(model, inputs)
+
+    # Throughput and padding share with every log line
+    def log(self, logs):
+        if self.train_start is not None and self.train_tokens:
+            logs['tokens_per_second'] = round(self.train_tokens / (time.time() - self.train_start), 1)
+            logs['padding_ratio'] = round(1 - self.train_tokens / self.padded_tokens, 4)
+        super().log(logs)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fine-tune one translation direction")
+    parser.add_argument('pair', choices=list(PAIR_SPECS), help="Direction to train, e.g. en_hi")
+    parser.add_argument('--base-model', help="Checkpoint to start from, overrides the pair's")
+    parser.add_argument('--output-dir', help="Where to save, overrides the pair's")
+    parser.add_argument('--rows', type=int, default=5000, help="Samanantar rows read, 0 for the full corpus")
+    parser.add_argument('--data', help="Tab-separated english/target file instead of samanantar")
+    parser.add_argument('--max-tokens', type=int, default=DEFAULT_MAX_TOKENS,
+                        help="Padded tokens per batch, 0 for the notebook's random batches of 16")
+    parser.add_argument('--grad-accum', type=int, default=1, help="Batches per optimizer step")
+    parser.add_argument('--epochs', type=float, default=TRAINING_ARGS['num_train_epochs'])
+    parser.add_argument('--max-steps', type=int, default=-1)
+    parser.add_argument('--resume', nargs='?', const=True, default=None,
+                        help="Resume from the last checkpoint in the output directory, or from the given one")
+    parser.add_argument('--num-proc', type=int, default=os.cpu_count(), help="Tokenization processes")
+    parser.add_argument('--draft', action='store_true',
+                        help="Train the pair's draft model for speculative decoding from its fine-tuned model")
+    parser.add_argument('--draft-layers', type=int, default=DRAFT_DECODER_LAYERS, help="Decoder layers kept in the draft")
+    parser.add_argument('--distill', action='store_true',
+                        help="Train the draft on the fine-tuned model's greedy translations of the data")
+    args = parser.parse_args()
+    if args.distill and not args.draft:
+        parser.error("--distill needs --draft")
+
+    spec = dict(PAIR_SPECS[args.pair])
+    if args.draft:
+        spec['base_model'], spec['output_dir'] = spec['output_dir'], spec['draft_dir']
+    spec.update({key: value for key, value in [('base_model', args.base_model), ('output_dir', args.output_dir)] if value})
+    src_lang, tgt_lang = args.pair.split('_')
+    print(f"===== Fine-tuning {args.pair}: {spec['base_model']} -> {spec['output_dir']} =====")
+
+    tokenizer = AutoTokenizer.from_pretrained(spec['base_model'])
+    model = AutoModelForSeq2SeqLM.from_pretrained(spec['base_model'])
+    data_path = args.data
+    if args.draft:
+        model = make_draft(model, args.draft_layers)
+        print(f"Draft keeps {model.config.decoder_layers} decoder layers, "
+              f"{sum(p.numel() for p in model.parameters() if p.requires_grad)} trainable parameters")
+    if args.distill:
+        # Reused on reruns, delete it after retraining the fine-tuned model
+        distilled_path = os.path.join(spec['output_dir'], 'distilled.tsv')
+        if not os.path.exists(distilled_path):
+            distill_corpus(spec['base_model'], src_lang, tgt_lang, args.rows or None, args.data, distilled_path)
+        data_path = distilled_path
+    train_dataset, val_dataset = prepare_translation_data(
+        tokenizer, src_lang, tgt_lang, args.rows or None, data_path, num_proc=args.num_proc
+    )
+    print(f"{len(train_dataset)} train, {len(val_dataset)} validation pairs")
+
+    training_args = Seq2SeqTrainingArguments(
+        output_dir=spec['output_dir'],
+        **dict(TRAINING_ARGS, num_train_epochs=args.epochs),
+        max_steps=args.max_steps,
+        gradient_accumulation_steps=args.grad_accum,
+        fp16=torch.cuda.is_available(),
+    )
+    trainer = TokenBudgetTrainer(
+        model=model,
+        args=training_args,
+        train_dataset=train_dataset,
+        eval_dataset=val_dataset,
+        tokenizer=tokenizer,
+        data_collator=DataCollatorForSeq2Seq(tokenizer=tokenizer, model=model),
+        max_tokens=args.max_tokens,
+    )
+
+    resume = args.resume
+    if resume is True:
+        # Start fresh when there is nothing to resume from
+        resume = get_last_checkpoint(spec['output_dir']) if os.path.isdir(spec['output_dir']) else None
+    trainer.train(resume_from_checkpoint=resume)
+    trainer.save_model(spec['output_dir'])
+    tokenizer.save_pretrained(spec['output_dir'])
+
+    elapsed = time.time() - trainer.train_start if trainer.train_start else 0.0
+    if elapsed:
+        print(f"\nTrained on {trainer.train_tokens} tokens in {elapsed:.1f}s: "
+              f"{trainer.train_tokens / elapsed:.1f} tokens/sec, "
+              f"{1 - trainer.train_tokens / trainer.padded_tokens:.1%} padding")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+# Translation memory: translated segments consulted before the model.
+#   python translation_memory.py memory.db --samanantar hi --rows 50000
+#   python translation_memory.py memory.db --data pairs.tsv --src en --tgt hi
+#   python translation_memory.py memory.db --outputs eval_en_hi.jsonl --src en --tgt hi
+#   python translation_memory.py memory.db --lookup "Your order 1234 has shipped" --src en --tgt hi
+# Exact matches (after normalization) are returned as they are. Near matches
+# are found with MinHash signatures of character n-grams, banded into an LSH
+# index, and scored by edit similarity. Entries and their index buckets are
+# stored in SQLite, so adding an entry updates the index in place and a
+# restart does not rebuild it.
+import argparse
+import difflib
+import hashlib
+import itertools
+import json
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import numpy as np
+from result_cache import normalize_text
+
+# Character n-gram size of the signatures
+NGRAM_SIZE = 3
+# MinHash functions, split into LSH bands: two texts sharing all values of any
+# band become candidates, which happens mostly above ~0.5 n-gram Jaccard
+NUM_PERM = 64
+BANDS = 16
+# Edit similarity a near match needs
+FUZZY_THRESHOLD = 0.85
+# Candidates scored per lookup, the ones sharing the most bands
+MAX_CANDIDATES = 20
+# Entries written per transaction on import
+IMPORT_BATCH_SIZE = 1000
+# Numbers a near match may differ in, e.g. order ids and amounts
+NUMBER_PATTERN = re.compile(r'\d+(?:[.,]\d+)*')
+
+# Fixed hash functions (a * x + b) mod p; they are part of the stored index
+_PRIME = np.uint64((1 << 31) - 1)
+_random = np.random.RandomState(20240601)
+_A = _random.randint(1, int(_PRIME), NUM_PERM).astype(np.uint64)
+_B = _random.randint(0, int(_PRIME), NUM_PERM).astype(np.uint64)
+
+
+# Text as matched: normalized, lowercased, numbers masked so that templated
+# segments differing only in numbers match fully
+def match_form(text):
+    return NUMBER_PATTERN.sub('#', normalize_text(text).lower())
+
+
+# Character n-grams of a text's match form
+def char_ngrams(text, n=NGRAM_SIZE):
+    text = f" {match_form(text)} "
+    if len(text) <= n:
+        return {text}
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+# MinHash signature of a set of n-grams
+def minhash(grams):
+    hashes = np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+    return ((_A[:, None] * (hashes[None, :] % _PRIME) + _B[:, None]) % _PRIME).min(axis=1)
+
+
+# LSH bucket of each band of a signature, separate per language pair
+def band_buckets(signature, src_lang, tgt_lang):
+    rows = NUM_PERM // BANDS
+    buckets = []
+    for band in range(BANDS):
+        digest = hashlib.blake2b(
+            f"{src_lang}_{tgt_lang}:{band}:".encode('utf-8') + signature[band * rows:(band + 1) * rows].tobytes(),
+            digest_size=8,
+        ).digest()
+        buckets.append(int.from_bytes(digest, 'big', signed=True))
+    return buckets
+
+
+# Edit similarity of two texts' match forms, 1.0 when equal; None when the
+# cheap upper bounds already fall below minimum
+def similarity(a, b, minimum=0.0):
+    matcher = difflib.SequenceMatcher(None, match_form(a), match_form(b))
+    if matcher.real_quick_ratio() < minimum or matcher.quick_ratio() < minimum:
+        return None
+    return matcher.ratio()
+
+
+# Translation of a near match that differs from the text only in numbers, with
+# the numbers replaced; None when anything else differs or a number is not
+# found in the translation
+def substitute_numbers(text, match_source, match_translation):
+    if match_form(text) != match_form(match_source):
+        return None
+    mapping = {}
+    for old, new in zip(NUMBER_PATTERN.findall(match_source), NUMBER_PATTERN.findall(text)):
+        if mapping.setdefault(old, new) != new:
+            return None
+    translated_numbers = set(NUMBER_PATTERN.findall(match_translation))
+    if all(old == new for old, new in mapping.items()) or any(old not in translated_numbers for old in mapping):
+        return None
+    return NUMBER_PATTERN.sub(lambda m: mapping.get(m.group(0), m.group(0)), match_translation)
+
+
+# Segments with their translation. version is '' for imported translations,
+# which serve every model, and identifies the model and decoding parameters
+# of a recorded model output, which only serves lookups with the same version.
+ENTRIES_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS entries ("
+    "id INTEGER PRIMARY KEY, src_lang TEXT NOT NULL, tgt_lang TEXT NOT NULL, source TEXT NOT NULL, "
+    "normalized TEXT NOT NULL, translation TEXT NOT NULL, origin TEXT NOT NULL, created REAL NOT NULL, "
+    "version TEXT NOT NULL DEFAULT '', UNIQUE (src_lang, tgt_lang, normalized, version));"
+)
+
+
+# Translation memory stored in SQLite
+class TranslationMemory:
+    # Open or create the memory. Near matches scoring at least threshold are
+    # returned when return_fuzzy is set and offered as hints otherwise; ones
+    # differing only in numbers are always returned, with the numbers replaced.
+    def __init__(self, db_path, threshold=FUZZY_THRESHOLD, return_fuzzy=False):
+        self.db_path = db_path
+        self.threshold = threshold
+        self.return_fuzzy = return_fuzzy
+        self._lock = threading.Lock()
+        self._db = None
+        # Counters
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.hints = 0
+        self.misses = 0
+        self.added = 0
+        self._open_db()
+
+    # Open the database
+    def _open_db(self):
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        columns = [row[1] for row in self._db.execute("PRAGMA table_info(entries)")]
+        if columns and 'version' not in columns:
+            # Model outputs recorded before versioning get a version no model has
+            self._db.executescript(
+                "ALTER TABLE entries RENAME TO entries_unversioned;" + ENTRIES_SCHEMA +
+                "INSERT INTO entries (id, src_lang, tgt_lang, source, normalized, translation, origin, created, version) "
+                "SELECT id, src_lang, tgt_lang, source, normalized, translation, origin, created, "
+                "CASE origin WHEN 'model' THEN 'unversioned' ELSE '' END FROM entries_unversioned;"
+                "DROP TABLE entries_unversioned;"
+            )
+        self._db.executescript(
+            ENTRIES_SCHEMA +
+            "CREATE TABLE IF NOT EXISTS buckets (bucket INTEGER NOT NULL, entry_id INTEGER NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS buckets_bucket ON buckets (bucket);"
+        )
+        self._db.commit()
+
+    # Open a fresh connection, a forked worker must not share its parent's
+    def reopen(self):
+        self._open_db()
+
+    # Add one translated segment
+    def add(self, source, translation, src_lang, tgt_lang, origin='import', replace=False, version=''):
+        return self.add_many([(source, translation)], src_lang, tgt_lang, origin, replace, version)
+
+    # Add (source, translation) pairs in one transaction, indexing the new ones.
+    # An existing source of the same version keeps its translation unless
+    # replace is set. Returns the number of new entries.
+    def add_many(self, pairs, src_lang, tgt_lang, origin='import', replace=False, version=''):
+        created = time.time()
+        added = 0
+        with self._lock:
+            for source, translation in pairs:
+                source = source.strip()
+                translation = translation.strip()
+                if not source or not translation:
+                    continue
+                normalized = normalize_text(source)
+                existing = self._db.execute(
+                    "SELECT id FROM entries WHERE src_lang = ? AND tgt_lang = ? AND normalized = ? AND version = ?",
+                    (src_lang, tgt_lang, normalized, version),
+                ).fetchone()
+                if existing is not None:
+                    if replace:
+                        self._db.execute(
+                            "UPDATE entries SET source = ?, translation = ?, origin = ?, created = ? WHERE id = ?",
+                            (source, translation, origin, created, existing[0]),
+                        )
+                    continue
+                entry_id = self._db.execute(
+                    "INSERT INTO entries (src_lang, tgt_lang, source, normalized, translation, origin, created, version) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (src_lang, tgt_lang, source, normalized, translation, origin, created, version),
+                ).lastrowid
+                buckets = band_buckets(minhash(char_ngrams(source)), src_lang, tgt_lang)
+                self._db.executemany(
+                    "INSERT INTO buckets (bucket, entry_id) VALUES (?, ?)", [(bucket, entry_id) for bucket in buckets]
+                )
+                added += 1
+            self._db.commit()
+            self.added += added
+        return added
+
+    # Find the memory's translation of a text: None, or a dict with match
+    # 'exact', 'fuzzy' (translation to use) or 'hint' (for reference only),
+    # the similarity score and the matched entry. Only imported entries and
+    # model outputs of the given version are considered, imported ones first.
+    def lookup(self, text, src_lang, tgt_lang, version=''):
+        normalized = normalize_text(text)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT source, translation FROM entries WHERE src_lang = ? AND tgt_lang = ? AND normalized = ? "
+                "AND version IN ('', ?) ORDER BY version = '' DESC LIMIT 1",
+                (src_lang, tgt_lang, normalized, version),
+            ).fetchone()
+            if row is not None:
+                self.exact_hits += 1
+                return {'match': 'exact', 'score': 1.0, 'source': row[0], 'translation': row[1]}
+
+            buckets = band_buckets(minhash(char_ngrams(text)), src_lang, tgt_lang)
+            candidates = self._db.execute(
+                f"SELECT e.source, e.translation FROM buckets b JOIN entries e ON e.id = b.entry_id "
+                f"WHERE b.bucket IN ({','.join('?' * len(buckets))}) AND e.version IN ('', ?) "
+                f"GROUP BY e.id ORDER BY COUNT(*) DESC LIMIT ?",
+                (*buckets, version, MAX_CANDIDATES),
+            ).fetchall()
+
+            best = None
+            for source, translation in candidates:
+                score = similarity(text, source, best[0] if best else self.threshold)
+                if score is not None and score >= self.threshold and (best is None or score > best[0]):
+                    best = (score, source, translation)
+            if best is None:
+                self.misses += 1
+                return None
+
+            score, source, translation = best
+            match = {'match': 'fuzzy', 'score': round(score, 3), 'source': source, 'translation': translation}
+            substituted = substitute_numbers(text, source, translation)
+            if substituted is not None:
+                match['translation'] = substituted
+            elif not self.return_fuzzy:
+                match['match'] = 'hint'
+            if match['match'] == 'hint':
+                self.hints += 1
+            else:
+                self.fuzzy_hits += 1
+            return match
+
+    # Get memory counters
+    def stats(self):
+        with self._lock:
+            size = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            lookups = self.exact_hits + self.fuzzy_hits + self.hints + self.misses
+            return {
+                'size': size,
+                'threshold': self.threshold,
+                'return_fuzzy': self.return_fuzzy,
+                'exact_hits': self.exact_hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'hints': self.hints,
+                'misses': self.misses,
+                'added': self.added,
+                'hit_rate': round((self.exact_hits + self.fuzzy_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+# Source/translation pairs of past outputs: JSONL rows with 'source' and
+# 'prediction' (evaluation.py) or 'translation'
+def load_outputs(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                row = json.loads(line)
+                translation = row.get('prediction', row.get('translation'))
+                if row.get('source') and translation:
+                    yield row['source'], translation
+
+
+# Add pairs to the memory in batches, returns the number of new entries
+def import_pairs(memory, pairs, src_lang, tgt_lang, origin, replace=False):
+    pairs = iter(pairs)
+    added = 0
+    while True:
+        batch = list(itertools.islice(pairs, IMPORT_BATCH_SIZE))
+        if not batch:
+            return added
+        added += memory.add_many(batch, src_lang, tgt_lang, origin, replace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import into or query a translation memory")
+    parser.add_argument('db_path')
+    parser.add_argument('--src', default='en')
+    parser.add_argument('--tgt', default='hi')
+    source_group = parser.add_mutually_exclusive_group(required=True)
+    source_group.add_argument('--samanantar', metavar='LANGUAGE', help="Import samanantar pairs, both directions")
+    source_group.add_argument('--data', help="Import a tab-separated source/translation file")
+    source_group.add_argument('--outputs', help="Import past outputs, JSONL with source and prediction/translation")
+    source_group.add_argument('--lookup', help="Look a text up")
+    parser.add_argument('--rows', type=int, default=5000, help="Samanantar rows read, 0 for the full corpus")
+    parser.add_argument('--replace', action='store_true', help="Overwrite translations of existing sources")
+    parser.add_argument('--threshold', type=float, default=FUZZY_THRESHOLD)
+    args = parser.parse_args()
+
+    memory = TranslationMemory(args.db_path, args.threshold)
+    if args.lookup:
+        print(json.dumps(memory.lookup(args.lookup, args.src, args.tgt), ensure_ascii=False, indent=2))
+        return
+
+    start_time = time.time()
+    if args.samanantar:
+        from corpus import iter_pairs
+        language = args.samanantar
+        added = import_pairs(
+            memory, ((p['english'], p['target']) for p in iter_pairs(language, args.rows or None)),
+            'en', language, 'samanantar', args.replace,
+        )
+        added += import_pairs(
+            memory, ((p['target'], p['english']) for p in iter_pairs(language, args.rows or None)),
+            language, 'en', 'samanantar', args.replace,
+        )
+    elif args.data:
+        from evaluation import load_cases
+        cases = ((case['source'], case['reference']) for case in load_cases(args.data))
+        added = import_pairs(memory, cases, args.src, args.tgt, 'import', args.replace)
+    else:
+        added = import_pairs(memory, load_outputs(args.outputs), args.src, args.tgt, 'output', args.replace)
+    print(f"Added {added} entries in {time.time() - start_time:.1f}s, {memory.stats()['size']} in {args.db_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,93 +1,545 @@
 import torch
-import pandas as pd
-from datasets import load_dataset, Dataset
 from transformers import (
     MarianMTModel,
     MarianTokenizer,
     T5ForConditionalGeneration,
     T5Tokenizer,
+    T5TokenizerFast,
+    LogitsProcessorList,
+    StoppingCriteria,
+    StoppingCriteriaList,
+    TextIteratorStreamer,
 )
-from nltk.translate.bleu_score import sentence_bleu, SmoothingFunction
-from nltk.translate.meteor_score import meteor_score
+from segmenter import split_paragraphs, split_sentences, pack_sentences
+from quantization import quantize_model, has_quantized, load_quantized
+from engines import ENGINES, exported_path, has_exported, TorchScriptSeq2SeqModel
+from decoding import DEFAULT_LENGTH_RATIO, length_budget, RepetitionGuard, ForwardCounter, exempt_token_ids
+from loading import has_safetensors, load_model_mmap, load_tokenizer
+from metrics import translation_metrics
+from tokenization import TextEncoder
 import os
+import time
+import threading
 import warnings
 import json
 warnings.filterwarnings("ignore")
 
+# Decoding parameters passed to generate. The output is capped at the
+# pair's measured target/source length ratio times the source length
+# (length_ratio overrides it, 0 disables), and sequences looping on a
+# repeated unit repetition_guard times are ended (0 disables). Runs of
+# punctuation or digits never count as loops; 8 repeats leaves room for
+# real repetition such as "no no no no" (see benchmark_generation.py).
+DECODING_PARAMS = {
+    'max_length': 128,
+    'num_beams': 4,
+    'length_penalty': 0.6,
+    'early_stopping': True,
+    'do_sample': False,
+    'repetition_guard': 8,
+}
+# Named decoding profiles: beam search for quality, greedy for interactive use,
+# and greedy checked against a pair's draft model (same output as 'fast',
+# plain greedy for pairs without a draft)
+DECODING_PROFILES = {
+    'quality': DECODING_PARAMS,
+    'fast': {
+        'max_length': 128,
+        'num_beams': 1,
+        'do_sample': False,
+        'repetition_guard': 8,
+    },
+    'speculative': {
+        'max_length': 128,
+        'num_beams': 1,
+        'do_sample': False,
+        'repetition_guard': 8,
+        'speculative': True,
+    },
+}
+# Files whose changes mean the model was retrained
+MODEL_FILES = ["config.json", "model.safetensors", "pytorch_model.bin"]
+# Per-pair output length ratios written by measure_length_ratios.py
+LENGTH_RATIOS_FILE = "length_ratios.json"
+# Input used to warm up a freshly loaded model
+WARMUP_TEXT = "Hello, how are you?"
+# Tokens a draft model proposes per verification pass, adapted per request
+DRAFT_TOKENS = 5
+
+
+# Detect a checkpoint's model type from its config, else from its path
+def detect_model_type(model_path):
+    config_path = os.path.join(model_path, "config.json")
+    
+    if os.path.exists(config_path):
+        try:
+            with open(config_path, 'r') as f:
+                config = json.load(f)
+                architecture = config.get("architectures", [""])[0].lower()
+                if "marian" in architecture:
+                    return "marian"
+                elif "t5" in architecture:
+                    return "t5"
+        except:
+            pass # Ignore errors
+        
+    # If config file doesn't exist, check model name
+    if "marian" in model_path.lower():
+        return "marian"
+    elif "t5" in model_path.lower():
+        return "t5"
+    # Default to T5
+    return "t5"
+
 
 class UniversalTranslator:
-    # Initialize the translator
-    def __init__(self, model_path):
+    # Initialize the translator, quantize=True loads a dynamic int8 CPU model,
+    # engine='torchscript' runs the graphs exported next to the checkpoint,
+    # mmap_weights=True maps safetensors weights instead of copying them,
+    # draft_models maps pairs to draft checkpoints for speculative decoding
+    def __init__(self, model_path, quantize=False, engine='eager', mmap_weights=True, draft_models=None):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', use one of: {', '.join(ENGINES)}")
         self.model_path = model_path
-        self.model_type = self._detect_model_type()
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.engine = engine
+        self.model_type = detect_model_type(self.model_path)
+        # Exported graphs are traced for CPU and already fixed in precision
+        self.quantize = quantize and engine == 'eager' and not torch.cuda.is_available()
+        if engine == 'eager':
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        else:
+            self.device = torch.device("cpu")
+        self.mmap_weights = mmap_weights
+        self.decoding_params = dict(DECODING_PARAMS)
+        self.length_ratios = self._load_length_ratios()
+        self.model_id = self._model_identity()
         self._load_model()
-    # Detect the model type
-    def _detect_model_type(self):
-        config_path = os.path.join(self.model_path, "config.json")
-        
-        if os.path.exists(config_path):
-            try:
-                with open(config_path, 'r') as f:
-                    config = json.load(f)
-                    architecture = config.get("architectures", [""])[0].lower()
-                    if "marian" in architecture:
-                        return "marian"
-                    elif "t5" in architecture:
-                        return "t5"
-            except:
-                pass # Ignore errors
-            
-        # If config file doesn't exist, check model name
-        if "marian" in self.model_path.lower():
-            return "marian"
-        elif "t5" in self.model_path.lower():
-            return "t5"
-        # Default to T5
-        return "t5"
-    
+        self.drafts = {}
+        self._target_calls = None
+        for pair, draft_path in (draft_models or {}).items():
+            self.load_draft(pair, draft_path)
+    # Identify the model by path and the size/mtime of its files
+    def _model_identity(self):
+        parts = [os.path.abspath(self.model_path)]
+        for name in MODEL_FILES + [LENGTH_RATIOS_FILE]:
+            file_path = os.path.join(self.model_path, name)
+            if os.path.exists(file_path):
+                stat = os.stat(file_path)
+                parts.append(f"{name}:{stat.st_size}:{int(stat.st_mtime)}")
+        if self.quantize:
+            parts.append("int8")
+        if self.engine != 'eager':
+            parts.append(self.engine)
+        return '|'.join(parts)
+    # Load measured output length ratios per language pair
+    def _load_length_ratios(self):
+        ratios_path = os.path.join(self.model_path, LENGTH_RATIOS_FILE)
+        if not os.path.exists(ratios_path):
+            return {}
+        with open(ratios_path, 'r') as f:
+            return {pair: entry['ratio'] for pair, entry in json.load(f).items()}
     # Load the model
     def _load_model(self):
         if self.model_type == "marian":
-            self.tokenizer = MarianTokenizer.from_pretrained(self.model_path)
-            self.model = MarianMTModel.from_pretrained(self.model_path)
+            tokenizer_class, model_class = MarianTokenizer, MarianMTModel
         else:
-            self.tokenizer = T5Tokenizer.from_pretrained(self.model_path)
-            self.model = T5ForConditionalGeneration.from_pretrained(self.model_path)
+            tokenizer_class, model_class = T5TokenizerFast, T5ForConditionalGeneration
             self.model_type = "t5"
         
+        if self.engine == 'torchscript':
+            if not has_exported(self.model_path):
+                raise FileNotFoundError(
+                    f"No exported graphs in {exported_path(self.model_path)}, run export_model.py first"
+                )
+            self._load_tokenizer(tokenizer_class, exported_path(self.model_path))
+            self.model = TorchScriptSeq2SeqModel(exported_path(self.model_path))
+            return
+        
+        self._load_tokenizer(tokenizer_class, self.model_path)
+        if self.quantize and has_quantized(self.model_path, MODEL_FILES):
+            self.model = load_quantized(model_class, self.model_path)
+        else:
+            if self.mmap_weights and has_safetensors(self.model_path):
+                self.model = load_model_mmap(model_class, self.model_path)
+            else:
+                self.model = model_class.from_pretrained(self.model_path)
+            if self.quantize:
+                self.model = quantize_model(self.model)
+        
         self.model.to(self.device)
         self.model.eval()
     
-    # Translate text
-    def translate(self, text, src_lang='en', tgt_lang='hi'):
-        if self.model_type == "marian":
-            input_text = text
+    # Load a smaller model that proposes tokens for this one to verify when a
+    # pair is decoded with the 'speculative' profile. It must share the
+    # vocabulary; a draft whose encoder is identical (train.py --draft freezes
+    # it) reuses this model's encoder and its outputs instead of its own.
+    def load_draft(self, pair, draft_path):
+        if self.engine != 'eager' or self.model_type != 'marian':
+            raise ValueError("Draft models need the eager engine and a Marian model")
+        if self.mmap_weights and has_safetensors(draft_path):
+            draft = load_model_mmap(MarianMTModel, draft_path)
         else:
-            lang_map = {'en': 'English', 'hi': 'Hindi', 'kn': 'Kannada'}
-            input_text = f"translate {lang_map[src_lang]} to {lang_map[tgt_lang]}: {text}"
-        
-        # Tokenize and generate
-        inputs = self.tokenizer(
-            input_text,
-            return_tensors="pt",
-            max_length=128,
-            truncation=True,
-            padding=True
+            draft = MarianMTModel.from_pretrained(draft_path)
+        for name in ['vocab_size', 'decoder_start_token_id', 'eos_token_id', 'pad_token_id']:
+            if getattr(draft.config, name) != getattr(self.model.config, name):
+                raise ValueError(f"Draft model {draft_path} has a different {name} than {self.model_path}")
+        
+        # Compared before quantization, which changes the weights
+        target_encoder = self.model.get_encoder().state_dict()
+        draft_encoder = draft.get_encoder().state_dict()
+        shares_encoder = not self.quantize and target_encoder.keys() == draft_encoder.keys() and all(
+            value.shape == target_encoder[name].shape and torch.equal(value, target_encoder[name])
+            for name, value in draft_encoder.items()
+        )
+        if shares_encoder:
+            draft.model.encoder = self.model.get_encoder()
+        elif self.quantize:
+            draft = quantize_model(draft)
+        draft.generation_config.num_assistant_tokens = DRAFT_TOKENS
+        # Every request starts from DRAFT_TOKENS, concurrent requests do not share the count
+        draft.generation_config.num_assistant_tokens_schedule = 'heuristic_transient'
+        draft.to(self.device)
+        draft.eval()
+        
+        if self._target_calls is None:
+            self._target_calls = ForwardCounter(self.model)
+        self.drafts[pair] = {
+            'path': draft_path,
+            'model': draft,
+            'shares_encoder': shares_encoder,
+            'calls': ForwardCounter(draft),
+        }
+    
+    # Load the tokenizer and its encoder. T5 uses the fast tokenizer, which
+    # needs tokenizer.json or protobuf to convert spiece.model, and falls
+    # back to the slow one; Marian has no fast tokenizer.
+    def _load_tokenizer(self, tokenizer_class, path):
+        try:
+            self.tokenizer = load_tokenizer(tokenizer_class, path)
+        except (ImportError, ValueError, OSError):
+            if tokenizer_class is not T5TokenizerFast:
+                raise
+            self.tokenizer = load_tokenizer(T5Tokenizer, path)
+        self.encoder = TextEncoder(self.tokenizer)
+        self.guard_exempt_ids = exempt_token_ids(self.tokenizer)
+
+    # Memory held by the model weights and buffers
+    def memory_bytes(self):
+        # The state dict also covers packed int8 weights, which are not parameters
+        total = 0
+        for value in self.model.state_dict().values():
+            tensors = value if isinstance(value, tuple) else (value,)
+            total += sum(t.numel() * t.element_size() for t in tensors if isinstance(t, torch.Tensor))
+        # Draft weights, less an encoder shared with this model
+        for draft in self.drafts.values():
+            weights = draft['model'].model.decoder if draft['shares_encoder'] else draft['model']
+            total += sum(t.numel() * t.element_size() for t in weights.state_dict().values() if isinstance(t, torch.Tensor))
+        return total
+
+    # Run a dummy generate per decoding profile so the first request does not
+    # pay for lazy initialization; returns the seconds spent
+    def warmup(self, src_lang='en', tgt_lang='hi'):
+        start_time = time.time()
+        for params in DECODING_PROFILES.values():
+            self.generate_batch([WARMUP_TEXT], src_lang, tgt_lang, params)
+        return time.time() - start_time
+
+    # Translate text
+    def translate(self, text, src_lang='en', tgt_lang='hi', params=None):
+        return self.generate_batch([text], src_lang, tgt_lang, params)[0]
+
+    # Translate many texts in length-sorted chunks, keeping input order
+    def translate_batch(self, texts, src_lang='en', tgt_lang='hi', batch_size=16, return_timings=False, params=None):
+        # Sorting by length keeps similar lengths together and cuts padding
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        translations = [None] * len(texts)
+        timings = [0.0] * len(texts)
+        
+        for start in range(0, len(order), batch_size):
+            chunk = order[start:start + batch_size]
+            chunk_start = time.time()
+            results = self.generate_batch([texts[i] for i in chunk], src_lang, tgt_lang, params)
+            elapsed = time.time() - chunk_start
+            for i, translation in zip(chunk, results):
+                translations[i] = translation
+                timings[i] = elapsed
+        
+        if return_timings:
+            return translations, timings
+        return translations
+
+    # Split a document into sentence chunks that fit the model input,
+    # with the chunk count of each paragraph and the paragraph separators.
+    # pack=False keeps each sentence its own chunk, for streaming.
+    def _document_chunks(self, text, src_lang, tgt_lang, max_tokens=128, pack=True):
+        paragraphs, separators = split_paragraphs(text)
+        # Leave room for the task prefix and special tokens
+        budget = max_tokens - len(self.encoder.prefix_ids(self._task_prefix(src_lang, tgt_lang))) - self.encoder.num_special_tokens
+        
+        chunks = []
+        chunk_counts = []
+        for paragraph in paragraphs:
+            sentences = split_sentences(paragraph)
+            if not sentences:
+                chunk_counts.append(0)
+                continue
+            token_counts = [len(ids) for ids in self.encoder.encode_texts(sentences)]
+            if pack:
+                paragraph_chunks = pack_sentences(sentences, token_counts, budget)
+            else:
+                paragraph_chunks = [
+                    chunk for sentence, count in zip(sentences, token_counts)
+                    for chunk in pack_sentences([sentence], [count], budget)
+                ]
+            chunks.extend(paragraph_chunks)
+            chunk_counts.append(len(paragraph_chunks))
+        return chunks, chunk_counts, separators
+
+    # Translate a long document sentence by sentence, keeping paragraph breaks
+    def translate_document(self, text, src_lang='en', tgt_lang='hi', max_tokens=128, batch_size=16, params=None):
+        return self.translate_documents([text], src_lang, tgt_lang, max_tokens, batch_size, params)[0]
+
+    # Translate many documents at once: the sentence chunks of all of them
+    # share length-sorted batches, then each document is put back together
+    def translate_documents(self, texts, src_lang='en', tgt_lang='hi', max_tokens=128, batch_size=16, params=None):
+        documents = [self._document_chunks(text, src_lang, tgt_lang, max_tokens) for text in texts]
+        
+        # Translate all chunks of all paragraphs as one padded batch job
+        translations = self.translate_batch(
+            [chunk for chunks, _, _ in documents for chunk in chunks], src_lang, tgt_lang,
+            batch_size=batch_size, params=params
         )
+        
+        outputs = []
+        position = 0
+        for _, chunk_counts, separators in documents:
+            output = []
+            for i, count in enumerate(chunk_counts):
+                output.append(' '.join(translations[position:position + count]))
+                position += count
+                if i < len(separators):
+                    output.append(separators[i])
+            outputs.append(''.join(output).strip())
+        return outputs
+
+    # Stream a document's translation sentence by sentence, in document order.
+    # Yields (text, separator) per chunk: the separator goes before the text
+    # and is a space, a paragraph break or '' for the first chunk.
+    def stream_document(self, text, src_lang='en', tgt_lang='hi', max_tokens=128, batch_size=16, params=None, cancel=None):
+        chunks, chunk_counts, separators = self._document_chunks(text, src_lang, tgt_lang, max_tokens, pack=False)
+        chunk_separators = []
+        for i, count in enumerate(chunk_counts):
+            for j in range(count):
+                if j > 0:
+                    chunk_separators.append(' ')
+                elif not chunk_separators:
+                    chunk_separators.append('')
+                else:
+                    # Paragraph breaks since the previous non-empty paragraph
+                    chunk_separators.append(''.join(separators[k] for k in range(last_paragraph, i)))
+                last_paragraph = i
+        
+        # Document order instead of length order, so the first sentence comes back first.
+        # Batches start at one chunk and double up to batch_size, so it comes back soon.
+        start = 0
+        size = 1
+        while start < len(chunks):
+            if cancel is not None and cancel.is_set():
+                return
+            results = self.generate_batch(chunks[start:start + size], src_lang, tgt_lang, params, cancel)
+            for translation, separator in zip(results, chunk_separators[start:start + size]):
+                yield translation, separator
+            start += size
+            size = min(size * 2, batch_size)
+
+    # Task prefix put before each input, T5 only
+    def _task_prefix(self, src_lang, tgt_lang):
+        if self.model_type == "marian":
+            return ''
+        lang_map = {'en': 'English', 'hi': 'Hindi', 'kn': 'Kannada'}
+        return f"translate {lang_map[src_lang]} to {lang_map[tgt_lang]}:"
+
+    # Tokenize texts and resolve generate parameters for one padded batch
+    def _prepare_generation(self, texts, src_lang, tgt_lang, params=None, cancel=None):
+        params = dict(self.decoding_params if params is None else params)
+        length_ratio = params.pop('length_ratio', None)
+        if length_ratio is None:
+            length_ratio = self.length_ratios.get(f"{src_lang}_{tgt_lang}", DEFAULT_LENGTH_RATIO)
+        repetition_guard = params.pop('repetition_guard', 0)
+        speculative = params.pop('speculative', False)
+        
+        # Tokenize, the prefix ids are computed once per pair
+        inputs = self.encoder.encode(texts, self._task_prefix(src_lang, tgt_lang), max_length=128)
         inputs = {k: v.to(self.device) for k, v in inputs.items()}
         
+        if length_ratio:
+            # Output budget scaled from the longest source in the batch
+            source_length = int(inputs['attention_mask'].sum(dim=1).max())
+            params['max_length'] = length_budget(source_length, length_ratio, params['max_length'])
+        if repetition_guard:
+            params['logits_processor'] = LogitsProcessorList([
+                RepetitionGuard(self.model.generation_config.eos_token_id, repetition_guard, self.guard_exempt_ids)
+            ])
+        if cancel is not None:
+            params['stopping_criteria'] = StoppingCriteriaList([CancelCriteria(cancel)])
+        draft = self._draft_for(src_lang, tgt_lang, params) if speculative else None
+        if draft is not None:
+            params['assistant_model'] = draft['model']
+            if draft['shares_encoder']:
+                # Encode once for both models
+                with torch.no_grad():
+                    params['encoder_outputs'] = self.model.get_encoder()(**inputs)
+                params['assistant_encoder_outputs'] = params['encoder_outputs']
+        return inputs, params
+
+    # The pair's draft when it can speculate for these parameters: only
+    # greedy decoding is checked token by token, so beams and sampling run
+    # without one
+    def _draft_for(self, src_lang, tgt_lang, params):
+        if params.get('num_beams', 1) > 1 or params.get('do_sample'):
+            return None
+        return self.drafts.get(f"{src_lang}_{tgt_lang}")
+
+    # Translate a list of texts with one padded generate call. Speculative
+    # decoding verifies one sequence at a time, so it generates per text.
+    def generate_batch(self, texts, src_lang='en', tgt_lang='hi', params=None, cancel=None):
+        params = self.decoding_params if params is None else params
+        if params.get('speculative') and self._draft_for(src_lang, tgt_lang, params) is not None:
+            return [self._generate_speculative(text, src_lang, tgt_lang, params, cancel) for text in texts]
+        
+        start_time = time.perf_counter()
+        inputs, params = self._prepare_generation(texts, src_lang, tgt_lang, params, cancel)
+        tokenized_time = time.perf_counter()
+        
         # Generate
         with torch.no_grad():
-            outputs = self.model.generate(
-                **inputs,
-                max_length=128,
-                num_beams=4,
-                length_penalty=0.6,
-                early_stopping=True,
-                do_sample=False,
-            )
+            outputs = self.model.generate(**inputs, **params)
+        generated_time = time.perf_counter()
         
         # Decode and return
-        translation = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
-        return translation.strip()
\ No newline at end of file
+        translations = self.encoder.decode(outputs)
+        translation_metrics.record_generation(
+            f"{src_lang}_{tgt_lang}",
+            tokenized_time - start_time,
+            generated_time - tokenized_time,
+            time.perf_counter() - generated_time,
+            inputs['attention_mask'].sum(dim=1).tolist(),
+            (outputs != self.tokenizer.pad_token_id).sum(dim=1).tolist(),
+        )
+        return [translation.strip() for translation in translations]
+
+    # Translate one text with its pair's draft proposing tokens, counting the
+    # tokens the draft proposed and the ones this model accepted
+    def _generate_speculative(self, text, src_lang, tgt_lang, params, cancel=None):
+        pair = f"{src_lang}_{tgt_lang}"
+        draft = self.drafts[pair]
+        start_time = time.perf_counter()
+        inputs, params = self._prepare_generation([text], src_lang, tgt_lang, params, cancel)
+        tokenized_time = time.perf_counter()
+        
+        with torch.no_grad(), self._target_calls.count() as target_calls, draft['calls'].count() as draft_calls:
+            outputs = self.model.generate(**inputs, **params)
+        generated_time = time.perf_counter()
+        
+        translation = self.encoder.decode(outputs)[0]
+        # Every verification pass adds the accepted draft tokens plus one of its own
+        new_tokens = outputs.shape[1] - 1
+        translation_metrics.inc('nmt_draft_tokens_total', draft_calls[0], pair=pair, result='proposed')
+        translation_metrics.inc('nmt_draft_tokens_total', max(new_tokens - target_calls[0], 0), pair=pair, result='accepted')
+        translation_metrics.record_generation(
+            pair,
+            tokenized_time - start_time,
+            generated_time - tokenized_time,
+            time.perf_counter() - generated_time,
+            inputs['attention_mask'].sum(dim=1).tolist(),
+            (outputs != self.tokenizer.pad_token_id).sum(dim=1).tolist(),
+        )
+        return translation.strip()
+
+    # Stream one text's translation as decoded text pieces. Greedy decoding
+    # streams token by token; beam search only knows the best sequence at the
+    # end, so it yields the whole translation once. Setting cancel (a
+    # threading.Event) stops generation at the next decoding step.
+    def stream(self, text, src_lang='en', tgt_lang='hi', params=None, cancel=None):
+        cancel = cancel if cancel is not None else threading.Event()
+        params = dict(self.decoding_params if params is None else params)
+        if params.get('num_beams', 1) > 1:
+            translation = self.generate_batch([text], src_lang, tgt_lang, params, cancel)[0]
+            if not cancel.is_set():
+                yield translation
+            return
+        
+        start_time = time.perf_counter()
+        inputs, params = self._prepare_generation([text], src_lang, tgt_lang, params, cancel)
+        pair = f"{src_lang}_{tgt_lang}"
+        translation_metrics.observe('nmt_stage_seconds', time.perf_counter() - start_time, pair=pair, stage='tokenize')
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        errors = []
+        
+        def run():
+            try:
+                generate_start = time.perf_counter()
+                with torch.no_grad():
+                    self.model.generate(**inputs, **params, streamer=streamer)
+                translation_metrics.observe('nmt_stage_seconds', time.perf_counter() - generate_start, pair=pair, stage='generate')
+            except Exception as e:
+                errors.append(e)
+                streamer.end()
+        
+        worker = threading.Thread(target=run, daemon=True)
+        worker.start()
+        finished = False
+        try:
+            for piece in streamer:
+                if piece:
+                    yield piece
+            finished = True
+        finally:
+            # Stop generating when the consumer goes away
+            if not finished:
+                cancel.set()
+            worker.join()
+        if errors:
+            raise errors[0]
+
+
+# Stop generation once a cancel event is set
+class CancelCriteria(StoppingCriteria):
+    def __init__(self, cancel):
+        self.cancel = cancel
+
+    def __call__(self, input_ids, scores, **kwargs):
+        return self.cancel.is_set()
+
+
+# Test cases for both directions, from the notebook's evaluation
+TEST_CASES = {
+    'en_hi': [
+        {'source': 'Hello', 'reference': 'नमस्ते'},
+        {'source': 'How are you?', 'reference': 'आप कैसे हैं?'},
+        {'source': 'Good morning', 'reference': 'सुप्रभात'},
+        {'source': 'Thank you', 'reference': 'धन्यवाद'},
+        {'source': 'I am fine', 'reference': 'मैं ठीक हूं'},
+    ],
+    'hi_en': [
+        {'source': 'नमस्ते', 'reference': 'Hello'},
+        {'source': 'आप कैसे हैं?', 'reference': 'How are you?'},
+        {'source': 'सुप्रभात', 'reference': 'Good morning'},
+        {'source': 'धन्यवाद', 'reference': 'Thank you'},
+        {'source': 'मैं ठीक हूं', 'reference': 'I am fine'},
+    ],
+    'en_kn': [
+        {'source': 'Hello', 'reference': 'ನಮಸ್ಕಾರ'},
+        {'source': 'How are you?', 'reference': 'ಹೇಗಿದ್ದೀರಾ?'},
+        {'source': 'Good morning', 'reference': 'ಶುಭೋದಯ'},
+        {'source': 'Thank you', 'reference': 'ಧನ್ಯವಾದಗಳು'},
+        {'source': 'I am fine', 'reference': 'ನಾನು ಚೆನ್ನಾಗಿದ್ದೇನೆ'},
+    ],
+    'kn_en': [
+        {'source': 'ನಮಸ್ಕಾರ', 'reference': 'Hello'},
+        {'source': 'ಹೇಗಿದ್ದೀರಾ?', 'reference': 'How are you?'},
+        {'source': 'ಶುಭೋದಯ', 'reference': 'Good morning'},
+        {'source': 'ಧನ್ಯವಾದಗಳು', 'reference': 'Thank you'},
+        {'source': 'ನಾನು ಚೆನ್ನಾಗಿದ್ದೇನೆ', 'reference': 'I am fine'},
+    ]
+}
@@ -0,0 +1,314 @@
+# Import Libraries
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from quantization import configure_threads
+
+# Seconds call_all waits for the workers before reporting one as unknown
+CALL_ALL_TIMEOUT = 2.0
+
+
+# Split the CPUs this process may use into one contiguous core set per worker
+def split_cores(num_workers):
+    cores = sorted(os.sched_getaffinity(0))
+    if num_workers >= len(cores):
+        return [[cores[i % len(cores)]] for i in range(num_workers)]
+    size = len(cores) // num_workers
+    return [cores[i * size:(i + 1) * size] for i in range(num_workers)]
+
+
+# Parse core sets like "0-3;4-7" or "0,2;1,3", one set per worker
+def parse_cores(spec):
+    core_sets = []
+    for part in spec.split(';'):
+        cores = []
+        for item in part.split(','):
+            if '-' in item:
+                first, last = item.split('-')
+                cores.extend(range(int(first), int(last) + 1))
+            elif item.strip():
+                cores.append(int(item))
+        core_sets.append(cores)
+    return core_sets
+
+
+# Worker process loop: pin to the core set, then run requests on a few threads
+# so the worker's micro-batching queues can group concurrent requests
+def _worker_main(index, cores, pairs, num_threads, concurrency, handlers, on_start, requests, results):
+    os.sched_setaffinity(0, cores)
+    configure_threads(num_threads or len(cores))
+    if on_start:
+        on_start(pairs)
+    executor = ThreadPoolExecutor(concurrency, thread_name_prefix=f'worker{index}')
+    cancels = {}
+
+    def run_call(request_id, name, data):
+        try:
+            results.put((request_id, 'result', handlers[name](data)))
+        except Exception as e:
+            results.put((request_id, 'error', str(e)))
+
+    def run_stream(request_id, name, data, cancel):
+        try:
+            body, status, events = handlers[name](data)
+            results.put((request_id, 'start', (body, status, events is not None)))
+            if events is not None:
+                for event in events(cancel):
+                    results.put((request_id, 'event', event))
+                    if cancel.is_set():
+                        break
+            results.put((request_id, 'end', None))
+        except Exception as e:
+            results.put((request_id, 'error', str(e)))
+        finally:
+            cancels.pop(request_id, None)
+
+    while True:
+        message = requests.get()
+        if message is None:
+            break
+        kind, request_id, name, data = message
+        if kind == 'call':
+            executor.submit(run_call, request_id, name, data)
+        elif kind == 'direct':
+            # Quick handlers such as stats answer here, not behind busy translation threads
+            run_call(request_id, name, data)
+        elif kind == 'stream':
+            cancel = cancels[request_id] = threading.Event()
+            executor.submit(run_stream, request_id, name, data, cancel)
+        elif kind == 'cancel':
+            # The stream may have ended and dropped its event since the cancel was sent
+            cancel = cancels.get(request_id)
+            if cancel is not None:
+                cancel.set()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+# One forked inference worker
+class Worker:
+    # Fork the worker process
+    def __init__(self, context, index, cores, pairs, num_threads, concurrency, handlers, on_start, results):
+        self.index = index
+        self.cores = cores
+        self.pairs = pairs
+        self.num_threads = num_threads or len(cores)
+        self.requests = context.Queue()
+        self.process = context.Process(
+            target=_worker_main,
+            args=(index, cores, pairs, num_threads, concurrency, handlers, on_start, self.requests, results),
+            name=f'nmt-worker-{index}',
+            daemon=True,
+        )
+        self.process.start()
+        # Metrics
+        self.in_flight = 0
+        self.completed = 0
+
+
+# Pre-fork pool of inference workers. The parent loads the models first, so
+# forked workers share the weights copy-on-write instead of loading N copies.
+# Requests are routed by language pair: each pair has its own workers and a
+# request goes to the least busy of them.
+class WorkerPool:
+    # Fork the workers; handlers maps names to functions run inside a worker,
+    # on_start(pairs) prepares a new worker for the pairs it serves
+    def __init__(self, num_workers, handlers, pairs, core_sets=None, num_threads=0, concurrency=4, on_start=None):
+        context = multiprocessing.get_context('fork')
+        core_sets = core_sets or split_cores(num_workers)
+        self.num_workers = num_workers
+        self.pairs = list(pairs)
+        self._results = context.Queue()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self.workers = []
+        for i in range(num_workers):
+            worker_pairs = [pair for pair in self.pairs if i in self._indices_for(pair)]
+            self.workers.append(Worker(
+                context, i, core_sets[i % len(core_sets)], worker_pairs, num_threads, concurrency,
+                handlers, on_start, self._results
+            ))
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+        self._collector.start()
+
+    # Worker indices serving a language pair: pairs get disjoint worker sets when
+    # there are enough workers, otherwise pairs share workers round-robin
+    def _indices_for(self, pair):
+        # Pairs not loaded at startup can go to any worker
+        if pair not in self.pairs:
+            return list(range(self.num_workers))
+        k = self.pairs.index(pair)
+        if self.num_workers >= len(self.pairs):
+            return [i for i in range(self.num_workers) if i % len(self.pairs) == k]
+        return [k % self.num_workers]
+
+    # Workers serving a language pair
+    def workers_for(self, pair):
+        return [self.workers[i] for i in self._indices_for(pair)]
+
+    # Pick the least busy live worker for a pair
+    def _route(self, pair):
+        candidates = [w for w in self.workers_for(pair) if w.process.is_alive()]
+        if not candidates:
+            raise RuntimeError(f"No live worker for {pair}")
+        with self._lock:
+            worker = min(candidates, key=lambda w: w.in_flight)
+            worker.in_flight += 1
+        return worker
+
+    # Hand results from the workers to the waiting requests
+    def _collect(self):
+        while True:
+            request_id, kind, payload = self._results.get()
+            with self._lock:
+                waiter = self._pending.get(request_id)
+            if waiter is None:
+                continue
+            if isinstance(waiter, Future):
+                with self._lock:
+                    del self._pending[request_id]
+                if kind == 'error':
+                    waiter.set_exception(RuntimeError(payload))
+                else:
+                    waiter.set_result(payload)
+            else:
+                waiter.put((kind, payload))
+
+    # Mark a request on a worker as finished
+    def _finish(self, worker, request_id):
+        with self._lock:
+            self._pending.pop(request_id, None)
+            worker.in_flight -= 1
+            worker.completed += 1
+
+    # Wait for a future, failing if its worker dies
+    def _wait(self, worker, future):
+        while True:
+            try:
+                return future.result(timeout=1.0)
+            except TimeoutError:
+                if not worker.process.is_alive():
+                    raise RuntimeError(f"Worker {worker.index} exited")
+
+    # Run a handler on a worker serving the pair and return its result
+    def call(self, name, pair, data):
+        return self._call_on(self._route(pair), name, data)
+
+    # Run a quick handler on every worker's request loop at once, e.g. to collect
+    # their stats. Returns one result per worker, None for a worker that is dead,
+    # failed or has not answered within timeout seconds.
+    def call_all(self, name, data=None, timeout=CALL_ALL_TIMEOUT):
+        calls = []
+        for worker in self.workers:
+            if not worker.process.is_alive():
+                calls.append(None)
+                continue
+            request_id = next(self._ids)
+            future = Future()
+            with self._lock:
+                self._pending[request_id] = future
+                worker.in_flight += 1
+            worker.requests.put(('direct', request_id, name, data))
+            calls.append((worker, request_id, future))
+
+        deadline = time.time() + timeout
+        results = []
+        for call in calls:
+            if call is None:
+                results.append(None)
+                continue
+            worker, request_id, future = call
+            try:
+                results.append(future.result(timeout=max(deadline - time.time(), 0)))
+            except Exception:
+                results.append(None)
+            finally:
+                self._finish(worker, request_id)
+        return results
+
+    # Run a handler on one worker
+    def _call_on(self, worker, name, data):
+        request_id = next(self._ids)
+        future = Future()
+        with self._lock:
+            self._pending[request_id] = future
+        try:
+            worker.requests.put(('call', request_id, name, data))
+            return self._wait(worker, future)
+        finally:
+            self._finish(worker, request_id)
+
+    # Run a streaming handler on a worker: returns (body, status, events) like
+    # the handler, where events(cancel) relays the worker's events
+    def stream(self, name, pair, data):
+        worker = self._route(pair)
+        request_id = next(self._ids)
+        messages = queue.Queue()
+        with self._lock:
+            self._pending[request_id] = messages
+        worker.requests.put(('stream', request_id, name, data))
+
+        # Next message from the worker, checking it is still alive
+        def receive(cancel=None):
+            while True:
+                try:
+                    return messages.get(timeout=0.1)
+                except queue.Empty:
+                    if cancel is not None and cancel.is_set():
+                        return 'cancelled', None
+                    if not worker.process.is_alive():
+                        return 'error', f"Worker {worker.index} exited"
+
+        kind, payload = receive()
+        if kind != 'start':
+            self._finish(worker, request_id)
+            raise RuntimeError(payload)
+        body, status, has_events = payload
+        if not has_events:
+            receive()
+            self._finish(worker, request_id)
+            return body, status, None
+
+        def events(cancel):
+            finished = False
+            try:
+                while True:
+                    kind, payload = receive(cancel)
+                    if kind == 'event':
+                        yield payload
+                    elif kind == 'error':
+                        raise RuntimeError(payload)
+                    else:
+                        finished = kind == 'end'
+                        return
+            finally:
+                if not finished:
+                    worker.requests.put(('cancel', request_id, None, None))
+                self._finish(worker, request_id)
+
+        return None, status, events
+
+    # Stop the workers
+    def shutdown(self):
+        for worker in self.workers:
+            worker.requests.put(None)
+
+    # Get worker metrics
+    def stats(self):
+        with self._lock:
+            return {
+                'num_workers': len(self.workers),
+                'workers': [{
+                    'pid': worker.process.pid,
+                    'alive': worker.process.is_alive(),
+                    'cores': worker.cores,
+                    'torch_threads': worker.num_threads,
+                    'pairs': worker.pairs,
+                    'in_flight': worker.in_flight,
+                    'completed': worker.completed,
+                } for worker in self.workers],
+            }
@@ -1,6 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { ArrowRightLeft, Languages, Clock, Copy } from 'lucide-react';
-import { translateText as apiTranslateText } from './api';
+import { translateStream as apiTranslateStream } from './api';
 import { transliterationMap } from './transliterationMap';
 
 // const mockTransliterationMap = {
@@ -29,6 +29,8 @@ function App() {
   const [processingTime, setProcessingTime] = useState(null);
   const [showTransliteration, setShowTransliteration] = useState(false);
   const [transliteratedText, setTransliteratedText] = useState('');
+  // Aborts the running stream when a new translation starts
+  const streamController = useRef(null);
 
   const languages = {
     'en': 'English', 'hi': 'Hindi', 'kn': 'Kannada',
@@ -62,6 +64,12 @@ function App() {
       return;
     }
 
+    if (streamController.current) {
+      streamController.current.abort();
+    }
+    const controller = new AbortController();
+    streamController.current = controller;
+
     setLoading(true);
     setError('');
     setOutputText('');
@@ -69,18 +77,41 @@ function App() {
     // const startTime = performance.now();
 
     try {
-      const payload = { text: inputText, src_lang: srcLang, tgt_lang: tgtLang };
-      const response = await apiTranslateText(payload);
-      // setOutputText(response.data.translated_text);      
-      setOutputText(response.data.translation);
-      // const endTime = performance.now();
-      // setProcessingTime(((endTime - startTime) / 1000).toFixed(2));
-      setProcessingTime(response.data.processing_time.toFixed(2));
+      // Greedy decoding streams token by token, beam search only at the end. Text with
+      // several sentences or paragraphs streams sentence by sentence in document mode.
+      const multiSentence = /[.!?।]\s+\S|\n\s*\S/.test(inputText.trim());
+      const payload = {
+        text: inputText,
+        src_lang: srcLang,
+        tgt_lang: tgtLang,
+        profile: 'fast',
+        mode: multiSentence ? 'document' : 'sentence',
+      };
+      // Show the translation as it is decoded
+      let partial = '';
+      await apiTranslateStream(payload, (event, data) => {
+        if (event === 'token') {
+          partial += data.text;
+          setOutputText(partial);
+        } else if (event === 'sentence') {
+          partial += data.separator + data.text;
+          setOutputText(partial);
+        } else if (event === 'done') {
+          setOutputText(data.translation);
+          setProcessingTime(data.processing_time.toFixed(2));
+        } else if (event === 'error') {
+          throw new Error(data.error);
+        }
+      }, controller.signal);
     } catch (err) {
+      if (err.name === 'AbortError') return;
       console.error("Translation API error:", err);
       setError('Translation failed. Please try again.');
     } finally {
-      setLoading(false);
+      if (streamController.current === controller) {
+        streamController.current = null;
+        setLoading(false);
+      }
     }
   };
 
@@ -201,7 +232,7 @@ function App() {
                 </select>
                 <div className="relative">
                   <div className="w-full h-48 bg-gray-50/30 border border-gray-200 rounded-xl px-4 py-3 overflow-y-auto">
-                    {loading ? (
+                    {loading && !outputText ? (
                       <div className="flex items-center justify-center h-full">
                         <div className="flex items-center space-x-2">
                           <div className="w-2 h-2 bg-blue-500 rounded-full animate-bounce" style={{ animationDelay: '0s' }}></div>
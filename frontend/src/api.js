@@ -7,8 +7,50 @@ const API_BASE_URL = 'http://127.0.0.1:5005/api';
 * @param {string} payload.text - The text to translate.
 * @param {string} payload.src_lang - The source language code.
 * @param {string} payload.tgt_lang - The target language code.
+* @param {string} [payload.profile] - Decoding profile, 'fast' (greedy) or 'quality' (beam search).
 * @returns {Promise} An axios promise.
 */
 export const translateText = (payload) => {
     return axios.post(`${API_BASE_URL}/translate`, payload);
-};
\ No newline at end of file
+};
+
+/** Streaming translation over Server-Sent Events
+* @param {object} payload - The translation payload, as for translateText (plus optional mode).
+* @param {function} onEvent - Called with (event, data) for each 'token', 'sentence', 'done' or 'error' event.
+* @param {AbortSignal} [signal] - Aborting closes the stream and stops generation on the server.
+* @returns {Promise} Resolves when the stream ends.
+*/
+export const translateStream = async (payload, onEvent, signal) => {
+    const response = await fetch(`${API_BASE_URL}/translate/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify(payload),
+        signal,
+    });
+    if (!response.ok) {
+        const body = await response.json().catch(() => ({}));
+        throw new Error(body.error || `HTTP ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const block = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            let event = 'message';
+            let data = '';
+            block.split('\n').forEach(line => {
+                if (line.startsWith('event: ')) event = line.slice(7);
+                else if (line.startsWith('data: ')) data += line.slice(6);
+            });
+            onEvent(event, data ? JSON.parse(data) : null);
+        }
+    }
+};
@@ -1,8 +1,14 @@
 #!/usr/bin/env python3
 
+import os
+import sys
 import pytest
 import requests
 import time
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
 
 # Test Configuration
 API_BASE_URL = "http://127.0.0.1:5005/api"
@@ -20,14 +26,49 @@ class APIClient:
     def health_check(self) -> requests.Response:
         return self.session.get(f"{self.base_url}/health", timeout=TIMEOUT)
     
-    def translate(self, text: str, src_lang: str, tgt_lang: str) -> requests.Response:
-        # Translate text via API
+    # Get Prometheus metrics
+    def metrics(self) -> requests.Response:
+        return self.session.get(f"{self.base_url}/metrics", timeout=TIMEOUT)
+    
+    def translate(self, text: str, src_lang: str, tgt_lang: str, **options) -> requests.Response:
+        # Translate text via API, extra options go into the payload
         payload = {
             "text": text,
             "src_lang": src_lang,
-            "tgt_lang": tgt_lang
+            "tgt_lang": tgt_lang,
+            **options
         }
         return self.session.post(f"{self.base_url}/translate", json=payload, timeout=TIMEOUT)
+    
+    def translate_batch(self, texts: list, src_lang: str, tgt_lang: str) -> requests.Response:
+        # Translate a list of texts via batch API
+        payload = {
+            "texts": texts,
+            "src_lang": src_lang,
+            "tgt_lang": tgt_lang
+        }
+        return self.session.post(f"{self.base_url}/translate/batch", json=payload, timeout=TIMEOUT)
+    
+    def translate_stream(self, text: str, src_lang: str, tgt_lang: str, **options) -> requests.Response:
+        # Open a streaming translation, read events with read_events
+        payload = {
+            "text": text,
+            "src_lang": src_lang,
+            "tgt_lang": tgt_lang,
+            **options
+        }
+        return self.session.post(f"{self.base_url}/translate/stream", json=payload, timeout=TIMEOUT, stream=True)
+
+# Parse Server-Sent Events into (event, data) pairs
+def read_events(response) -> list:
+    events = []
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((event, json.loads(line[len("data: "):])))
+    return events
 
 # Pytest Fixtures
 @pytest.fixture(scope="session")
@@ -88,6 +129,191 @@ class TestAPIHealth:
         api_languages = api_health_check['supported_languages']
         for lang_code in supported_languages:
             assert lang_code in api_languages
+    
+    def test_models_loaded_at_startup(self, api_health_check):
+        # Test every pair with a model is loaded before the first request (NMT_WARM_PAIRS unset)
+        available = [pair for pair, status in api_health_check['model_status'].items() if status['exists']]
+        startup = api_health_check['startup']
+        for pair in available:
+            assert pair in startup['pairs']
+            assert startup['pairs'][pair]['load_seconds'] >= 0
+
+# Model Registry Tests, in-process with stand-in translators
+class FakeTranslator:
+    def __init__(self, key, memory_mb=1):
+        self.key = key
+        self.memory_mb = memory_mb
+    
+    def memory_bytes(self):
+        return int(self.memory_mb * 1024 * 1024)
+
+class TestModelRegistry:
+    # Test lazy loading, LRU eviction under the memory budget and idle eviction
+    
+    def make_registry(self, memory_budget_mb=0, idle_ttl=0, load_seconds=0.0):
+        from registry import ModelRegistry
+        loads = []
+        
+        def loader(key):
+            loads.append(key)
+            time.sleep(load_seconds)
+            return FakeTranslator(key)
+        return ModelRegistry(loader, memory_budget_mb, idle_ttl), loads
+    
+    def test_loads_once_and_reuses(self):
+        # Test a key is loaded on first use only, and owners are recorded
+        registry, loads = self.make_registry()
+        first = registry.get('model_a', owner='en_hi')
+        second = registry.get('model_a', owner='en_kn')
+        assert first is second
+        assert loads == ['model_a']
+        assert registry.owners() == ['en_hi', 'en_kn']
+        assert registry.has_owner('en_kn') and not registry.has_owner('hi_en')
+        registry.evict('model_a')
+        assert registry.owners() == [] and not registry.has_owner('en_hi')
+    
+    def test_concurrent_first_use_loads_once(self):
+        # Test concurrent first requests wait for a single load
+        registry, loads = self.make_registry(load_seconds=0.1)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            translators = list(executor.map(lambda _: registry.get('model_a'), range(8)))
+        assert loads == ['model_a']
+        assert all(translator is translators[0] for translator in translators)
+    
+    def test_lru_eviction_over_budget(self):
+        # Test the least recently used translator goes once the budget is exceeded
+        registry, loads = self.make_registry(memory_budget_mb=2.5)
+        registry.get('model_a')
+        registry.get('model_b')
+        registry.get('model_a')
+        registry.get('model_c')
+        assert registry.keys() == ['model_a', 'model_c']
+        assert registry.stats()['evictions'] == 1
+        assert registry.stats()['memory_used_mb'] <= 2.5
+        # An evicted translator is loaded again
+        registry.get('model_b')
+        assert loads == ['model_a', 'model_b', 'model_c', 'model_b']
+    
+    def test_idle_eviction(self):
+        # Test translators idle past the TTL are dropped on the next access
+        registry, loads = self.make_registry(idle_ttl=0.2)
+        registry.get('model_a')
+        time.sleep(0.3)
+        registry.get('model_b')
+        assert 'model_a' not in registry
+        assert registry.keys() == ['model_b']
+
+class TestTokenization:
+    # Test encoders and their caches live only as long as their translator
+    
+    def test_encoder_released_with_translator(self, tmp_path):
+        # Test an evicted translator's tokenizer and encoding cache are freed
+        import gc
+        import weakref
+        from benchmark import build_tiny_model
+        from translator import UniversalTranslator
+        translator = UniversalTranslator(build_tiny_model(str(tmp_path / 'tiny')))
+        translator.translate("Hello world")
+        encoder, tokenizer = weakref.ref(translator.encoder), weakref.ref(translator.tokenizer)
+        assert encoder().stats()['misses'] > 0
+        del translator
+        gc.collect()
+        assert encoder() is None and tokenizer() is None
+
+# Worker handler for the pool tests: sleeps, then returns how long
+def nap(seconds):
+    time.sleep(seconds)
+    return seconds
+
+class TestWorkerPool:
+    # Test stats calls to forked workers are not held up by busy or slow workers
+    
+    def test_call_all_answers_while_busy(self):
+        # Test call_all is answered while the worker's translation threads are busy,
+        # and a worker too slow to answer is reported as None
+        from workers import WorkerPool
+        pool = WorkerPool(1, {'nap': nap}, ['en_hi'], core_sets=[[0]], num_threads=1, concurrency=1)
+        try:
+            with ThreadPoolExecutor(max_workers=1) as executor:
+                busy = executor.submit(pool.call, 'nap', 'en_hi', 2.0)
+                time.sleep(0.2)
+                start_time = time.time()
+                assert pool.call_all('nap', 0.0) == [0.0]
+                assert time.time() - start_time < 1.0
+                assert pool.call_all('nap', 1.0, timeout=0.2) == [None]
+                assert busy.result() == 2.0
+        finally:
+            pool.shutdown()
+
+class TestResultCacheDatabase:
+    # Test the SQLite tier of the result cache stays bounded
+    
+    def test_oldest_and_expired_rows_purged(self, tmp_path, monkeypatch):
+        # Test inserts past the row limit drop the oldest rows, and expired rows go too
+        import sqlite3
+        import result_cache
+        monkeypatch.setattr(result_cache, 'PURGE_INTERVAL', 10)
+        db_path = str(tmp_path / 'cache.db')
+        cache = result_cache.TranslationCache(max_size=5, ttl=3600, db_path=db_path, db_max_size=20)
+        for i in range(50):
+            cache.set(f"key{i}", f"translation {i}")
+        db = sqlite3.connect(db_path)
+        keys = {key for (key,) in db.execute("SELECT key FROM translations")}
+        assert len(keys) == 20
+        assert "key49" in keys and "key0" not in keys
+        
+        db.execute("UPDATE translations SET created = 0 WHERE key = 'key49'")
+        db.commit()
+        for i in range(50, 60):
+            cache.set(f"key{i}", f"translation {i}")
+        keys = {key for (key,) in db.execute("SELECT key FROM translations")}
+        assert "key49" not in keys and "key59" in keys
+        db.close()
+
+class TestTranslationMemoryVersions:
+    # Test recorded model outputs only serve lookups of the same model and parameters
+    
+    def test_recorded_output_needs_same_version(self, tmp_path):
+        # Test a model output is an exact match for its version only
+        from translation_memory import TranslationMemory
+        memory = TranslationMemory(str(tmp_path / 'memory.db'))
+        memory.add("Your order has shipped", "fast output", 'en', 'hi', origin='model', version='fast')
+        assert memory.lookup("Your order has shipped", 'en', 'hi', 'fast')['translation'] == "fast output"
+        assert memory.lookup("Your order has shipped", 'en', 'hi', 'quality') is None
+        assert memory.lookup("Your order has shipped", 'en', 'hi') is None
+    
+    def test_imported_translation_serves_every_version(self, tmp_path):
+        # Test an imported translation is preferred over a recorded one
+        from translation_memory import TranslationMemory
+        memory = TranslationMemory(str(tmp_path / 'memory.db'))
+        memory.add("Your order has shipped", "model output", 'en', 'hi', origin='model', version='fast')
+        memory.add("Your order has shipped", "curated", 'en', 'hi')
+        for version in ['fast', 'quality']:
+            match = memory.lookup("Your order has shipped", 'en', 'hi', version)
+            assert match['match'] == 'exact' and match['translation'] == "curated"
+    
+    def test_unversioned_database_is_migrated(self, tmp_path):
+        # Test model outputs recorded before versioning no longer match
+        import sqlite3
+        from translation_memory import TranslationMemory
+        db_path = str(tmp_path / 'memory.db')
+        db = sqlite3.connect(db_path)
+        db.execute(
+            "CREATE TABLE entries (id INTEGER PRIMARY KEY, src_lang TEXT NOT NULL, tgt_lang TEXT NOT NULL, "
+            "source TEXT NOT NULL, normalized TEXT NOT NULL, translation TEXT NOT NULL, origin TEXT NOT NULL, "
+            "created REAL NOT NULL, UNIQUE (src_lang, tgt_lang, normalized))"
+        )
+        db.executemany(
+            "INSERT INTO entries (src_lang, tgt_lang, source, normalized, translation, origin, created) "
+            "VALUES ('en', 'hi', ?, ?, ?, ?, 0)",
+            [("Hello", "Hello", "curated", 'import'), ("Goodbye", "Goodbye", "model output", 'model')],
+        )
+        db.commit()
+        db.close()
+        memory = TranslationMemory(db_path)
+        assert memory.lookup("Hello", 'en', 'hi', 'fast')['translation'] == "curated"
+        assert memory.lookup("Goodbye", 'en', 'hi', 'fast') is None
+        assert memory.stats()['size'] == 2
 
 # Basic Translation Tests
 class TestBasicTranslation:
@@ -252,6 +478,189 @@ class TestTextLength:
         data = response.json()
         assert len(data['translation']) > 0
 
+# Decoding Profile Tests
+class TestDecodingProfiles:
+    # Test per-request decoding profiles
+    
+    @pytest.mark.parametrize("profile", ["fast", "quality"])
+    def test_profile_reported(self, api_client, profile):
+        # Test the response reports the profile used
+        response = api_client.translate("Hello world", "en", "hi", profile=profile)
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data['profile'] == profile
+        assert len(data['translation']) > 0
+    
+    def test_default_profile(self, api_client):
+        # Test a profile is reported when none is requested
+        response = api_client.translate("Hello world", "en", "hi")
+        assert response.status_code == 200
+        assert 'profile' in response.json()
+    
+    def test_beams_bounded_by_server(self, api_client):
+        # Test requested beams are clamped to the server limit
+        response = api_client.translate("Hello world", "en", "hi", profile="quality", num_beams=64)
+        assert response.status_code == 200
+        assert response.json()['decoding_params']['num_beams'] <= 4
+    
+    def test_speculative_matches_fast(self, api_client, api_health_check):
+        # Test speculative decoding runs the draft and gives the greedy translation
+        if not api_health_check['model_status']['en_hi']['draft']:
+            pytest.skip("No draft model for en_hi")
+        def proposed_tokens():
+            for line in api_client.metrics().text.splitlines():
+                if line.startswith('nmt_draft_tokens_total{pair="en_hi",result="proposed"}'):
+                    return float(line.split()[-1])
+            return 0.0
+        
+        text = f"Please send the signed form back by Friday {time.time()}"
+        fast = api_client.translate(text, "en", "hi", profile="fast")
+        proposed = proposed_tokens()
+        speculative = api_client.translate(text, "en", "hi", profile="speculative")
+        assert speculative.status_code == 200
+        assert speculative.json()['profile'] == "speculative"
+        assert speculative.json()['translation'] == fast.json()['translation']
+        assert proposed_tokens() > proposed
+    
+    @pytest.mark.parametrize("options", [{"profile": "turbo"}, {"num_beams": 0}, {"max_length": "long"}])
+    def test_invalid_decoding_options(self, api_client, options):
+        # Test unknown profiles and bad overrides return error
+        response = api_client.translate("Hello world", "en", "hi", **options)
+        assert response.status_code == 400
+        assert 'error' in response.json()
+
+# Document Mode Tests
+class TestDocumentMode:
+    # Test long document translation split into sentence chunks
+    
+    def test_document_mode_paragraphs(self, api_client):
+        # Test paragraph breaks survive document translation
+        document = ("This is the first sentence. " * 30).strip() + "\n\n" + "This is a new paragraph."
+        response = api_client.translate(document, "en", "hi", mode="document")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data['mode'] == 'document'
+        assert len(data['translation']) > 0
+        assert data['translation'].count("\n\n") == 1
+    
+    def test_document_mode_devanagari(self, api_client):
+        # Test danda-terminated Hindi sentences are handled
+        document = "नमस्ते। आप कैसे हैं? मैं ठीक हूं।"
+        response = api_client.translate(document, "hi", "en", mode="document")
+        assert response.status_code == 200
+        assert len(response.json()['translation']) > 0
+    
+    def test_invalid_mode(self, api_client):
+        # Test unknown mode returns error
+        response = api_client.translate("Hello", "en", "hi", mode="poem")
+        assert response.status_code == 400
+        assert 'mode' in response.json()['error'].lower()
+
+# Streaming Tests
+class TestStreaming:
+    # Test incremental output over Server-Sent Events
+    
+    def test_stream_sentence(self, api_client):
+        # Test token events add up to the final translation
+        response = api_client.translate_stream("How are you today?", "en", "hi", profile="fast")
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/event-stream')
+        
+        events = read_events(response)
+        assert events[-1][0] == 'done'
+        tokens = [data['text'] for event, data in events if event == 'token']
+        assert len(tokens) > 0
+        assert ''.join(tokens).strip() == events[-1][1]['translation']
+    
+    def test_stream_document(self, api_client):
+        # Test document mode streams one event per sentence chunk in order
+        document = "This is the first paragraph.\n\nThis is the second paragraph."
+        events = read_events(api_client.translate_stream(document, "en", "hi", mode="document"))
+        sentences = [data for event, data in events if event == 'sentence']
+        assert [data['index'] for data in sentences] == list(range(len(sentences)))
+        assert events[-1][0] == 'done'
+        assert events[-1][1]['translation'].count("\n\n") == 1
+    
+    def test_stream_document_per_sentence(self, api_client):
+        # Test short sentences stream one event each, as the frontend sends them
+        document = f"Sentence one is short. Sentence two is short. Sentence three is run {int(time.time() * 1000)}."
+        events = read_events(api_client.translate_stream(document, "en", "hi", profile="fast", mode="document"))
+        assert len([data for event, data in events if event == 'sentence']) == 3
+        assert events[-1][0] == 'done'
+    
+    def test_cancelled_stream_not_cached(self):
+        # Test a stream cancelled by its client leaves no partial translation in the cache
+        # (in-process, run from backend/ where the models are)
+        import threading
+        import app
+        if not os.path.exists(app.MODEL_PATHS['en_hi']):
+            pytest.skip("en_hi model not found from the working directory")
+        data = {
+            'text': f"Please bring your passport and the printed tickets to the airport {time.time()}",
+            'src_lang': 'en', 'tgt_lang': 'hi', 'profile': 'fast',
+        }
+        _, status, events = app.handle_translate_stream(data)
+        assert status == 200
+        cancel = threading.Event()
+        stream = events(cancel)
+        assert next(stream).startswith('event: token')
+        cancel.set()
+        assert not any(event.startswith('event: done') for event in stream)
+        
+        body, status = app.handle_translate(data)
+        assert status == 200
+        assert not body['cached']
+    
+    def test_stream_matches_translate(self, api_client):
+        # Test streamed and regular translations agree
+        text = "The weather is nice."
+        expected = api_client.translate(text, "en", "kn", profile="fast").json()['translation']
+        events = read_events(api_client.translate_stream(text, "en", "kn", profile="fast"))
+        assert events[-1][1]['translation'] == expected
+    
+    def test_stream_validation(self, api_client):
+        # Test invalid requests fail before streaming starts
+        response = api_client.translate_stream("", "en", "hi")
+        assert response.status_code == 400
+        assert 'error' in response.json()
+
+# Metrics Tests
+class TestMetrics:
+    # Test the Prometheus metrics endpoint
+    
+    def test_metrics_format(self, api_client):
+        # Test metrics are served as Prometheus text
+        response = api_client.metrics()
+        assert response.status_code == 200
+        assert response.headers['Content-Type'].startswith('text/plain')
+        assert '# TYPE nmt_process_resident_memory_bytes gauge' in response.text
+    
+    def test_stage_histograms_recorded(self, api_client):
+        # Test a translation shows up in the stage histograms and token counters
+        assert api_client.translate("Metrics check sentence", "en", "kn").status_code == 200
+        text = api_client.metrics().text
+        for stage in ['tokenize', 'generate', 'decode', 'total']:
+            assert f'nmt_stage_seconds_count{{pair="en_kn",stage="{stage}"}}' in text
+        assert 'nmt_output_tokens_total{pair="en_kn"}' in text
+        assert 'nmt_requests_total{endpoint="translate",pair="en_kn",status="200"}' in text
+        assert 'nmt_encoding_cache_lookups_total{result="miss"}' in text
+    
+    def test_encoding_cache_hit(self, api_client):
+        # Test a text translated again with another profile reuses its encoding
+        def encoding_hits():
+            for line in api_client.metrics().text.splitlines():
+                if line.startswith('nmt_encoding_cache_lookups_total{result="hit"}'):
+                    return float(line.split()[-1])
+            return 0.0
+        
+        text = f"Encoding cache check {time.time()}"
+        assert api_client.translate(text, "en", "hi", profile="fast").status_code == 200
+        hits = encoding_hits()
+        assert api_client.translate(text, "en", "hi", profile="quality").status_code == 200
+        assert encoding_hits() > hits
+
 # Performance Tests
 class TestPerformance:
     # Test API performance characteristics
@@ -312,6 +721,46 @@ class TestRealWorldUsage:
         # Basic sanity check - translation should be different from input
         assert data['translation'] != text
     
+    def test_repeated_phrase_cached(self, api_client):
+        # Test a repeated phrase is served from the result cache
+        first = api_client.translate("Good evening, welcome", "en", "hi")
+        second = api_client.translate("Good  evening, welcome ", "en", "hi")
+        assert first.status_code == 200
+        assert second.status_code == 200
+        assert second.json()['cached']
+        assert second.json()['translation'] == first.json()['translation']
+        
+        stats = api_client.health_check().json()['result_cache']
+        assert stats['hits'] >= 1
+
+    def test_translation_memory_records_per_profile(self, api_client, api_health_check):
+        # Test a recorded translation is not served for another profile
+        if not (api_health_check.get('translation_memory') or {}).get('record'):
+            pytest.skip("Translation memory recording not enabled (NMT_MEMORY_DB, NMT_MEMORY_RECORD)")
+        text = f"Your profile has been updated {time.time()}"
+        added = api_client.health_check().json()['translation_memory']['added']
+        first = api_client.translate(text, "en", "hi", profile="fast")
+        assert first.status_code == 200
+        assert api_client.health_check().json()['translation_memory']['added'] == added + 1
+        
+        second = api_client.translate(text, "en", "hi", profile="quality")
+        assert second.status_code == 200
+        assert (second.json()['memory'] or {}).get('match') != 'exact'
+
+    def test_translation_memory_hint(self, api_client, api_health_check):
+        # Test a near match comes back as a hint beside the model's translation
+        if not (api_health_check.get('translation_memory') or {}).get('record'):
+            pytest.skip("Translation memory recording not enabled (NMT_MEMORY_DB, NMT_MEMORY_RECORD)")
+        api_client.translate("Please confirm the booking for Alice", "en", "hi")
+        response = api_client.translate("Please confirm the booking for Alina", "en", "hi")
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['memory']['match'] == 'hint'
+        assert data['memory']['source'] == "Please confirm the booking for Alice"
+        assert data['memory']['score'] >= 0.85
+        assert len(data['translation']) > 0
+
     def test_formal_language(self, api_client):
         # Test formal language translation
         formal_text = "I would like to request your assistance with this matter."
@@ -351,6 +800,67 @@ class TestLanguagePairs:
             assert 'translation' in data
             assert len(data['translation']) > 0
 
+    @pytest.mark.parametrize("src,tgt", [
+        ("hi", "kn"),
+        ("kn", "hi"),
+    ])
+    def test_pivot_through_english(self, api_client, src, tgt):
+        # Test pairs without a direct model are translated through English
+        response = api_client.translate("Hello", src, tgt)
+        assert response.status_code == 200
+
+        data = response.json()
+        assert data['route'] == [src, 'en', tgt]
+        assert [hop['pair'] for hop in data['hops']] == [f"{src}_en", f"en_{tgt}"]
+        assert all(hop['processing_time'] >= 0 for hop in data['hops'])
+        assert len(data['translation']) > 0
+
+    def test_pivot_intermediate_cached(self, api_client):
+        # Test a repeated pivot source reuses the cached English
+        texts = ["Pivot caching check", "Another pivot sentence"]
+        first = api_client.translate_batch(texts, "hi", "kn")
+        second = api_client.translate_batch(texts, "hi", "kn")
+        assert first.status_code == 200 and second.status_code == 200
+        assert second.json()['route'] == ['hi', 'en', 'kn']
+        assert all(hop['cached'] for hop in second.json()['hops'])
+        assert [t['translation'] for t in second.json()['translations']] == \
+            [t['translation'] for t in first.json()['translations']]
+
+# Batch Translation Tests
+class TestBatchTranslation:
+    # Test the batch translation endpoint
+    
+    def test_batch_translation_order(self, api_client):
+        # Test batch results come back in input order
+        texts = ["This is a longer test sentence.", "Hello", "Good morning", "A"]
+        response = api_client.translate_batch(texts, "en", "hi")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data['total_count'] == len(texts)
+        assert data['success_count'] == len(texts)
+        for text, item in zip(texts, data['translations']):
+            assert item['source'] == text
+            assert item['success']
+            assert len(item['translation']) > 0
+            assert 'processing_time' in item
+    
+    def test_batch_invalid_items(self, api_client):
+        # Test invalid items are reported without failing the batch
+        response = api_client.translate_batch(["Hello", "   ", 42], "en", "hi")
+        assert response.status_code == 200
+        
+        data = response.json()
+        assert data['success_count'] == 1
+        assert [item['success'] for item in data['translations']] == [True, False, False]
+    
+    @pytest.mark.parametrize("texts", [[], "Hello", None])
+    def test_batch_missing_texts(self, api_client, texts):
+        # Test missing or non-list texts return error
+        response = api_client.translate_batch(texts, "en", "hi")
+        assert response.status_code == 400
+        assert 'texts' in response.json()['error'].lower()
+
 # Stress Tests
 class TestStressScenarios:
     # Stress testing scenarios
@@ -379,6 +889,52 @@ class TestStressScenarios:
             response = api_client.translate(text, src, tgt)
             # Some pairs might not be supported
             assert response.status_code in [200, 400, 503]
+    
+    def test_parallel_requests_batched(self, api_client):
+        # Test concurrent requests for one pair are all answered
+        texts = ["Hello", "Thank you", "Good morning", "How are you?", "Goodbye", "I need help"]
+        
+        def send(text):
+            return APIClient().translate(text, "en", "hi")
+        
+        with ThreadPoolExecutor(max_workers=len(texts)) as executor:
+            responses = list(executor.map(send, texts))
+        
+        for text, response in zip(texts, responses):
+            assert response.status_code == 200
+            assert response.json()['source_text'] == text
+        
+        health = api_client.health_check().json()
+        assert 'batching' in health
+
+    def test_identical_requests_coalesced(self, api_client):
+        # Test concurrent identical requests share one translation
+        text = f"Coalescing check {time.time()}"
+
+        def send(_):
+            return APIClient().translate(text, "en", "hi")
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            responses = list(executor.map(send, range(8)))
+
+        assert all(response.status_code == 200 for response in responses)
+        assert len({response.json()['translation'] for response in responses}) == 1
+
+    def test_batch_duplicates_coalesced(self, api_client):
+        # Test duplicate texts in a batch are translated once and counted as coalesced
+        def coalesced():
+            for line in api_client.metrics().text.splitlines():
+                if line.startswith('nmt_coalesced_translations_total{pair="en_hi"}'):
+                    return float(line.split()[-1])
+            return 0.0
+
+        before = coalesced()
+        text = f"Duplicate batch text {time.time()}"
+        response = api_client.translate_batch([text, "Another text", text, text], "en", "hi")
+        assert response.status_code == 200
+        translations = [item['translation'] for item in response.json()['translations']]
+        assert translations[0] == translations[2] == translations[3]
+        assert coalesced() >= before + 2
 
 # Error Recovery Tests
 class TestErrorRecovery: